@@ -0,0 +1,94 @@
+"""
+Long-lived HTTP clients. A service keeps one client per service it talks to, opened in its
+lifespan, so requests reuse kept-alive connections instead of each setting up a new connection and
+connection pool.
+"""
+
+from typing import Any
+
+import httpx
+
+
+class PooledClient:
+    """
+    A shared `httpx.AsyncClient` with a bounded connection pool. Timeouts can be given per request,
+    `timeout_sec` only applies to requests that don't
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_connections: int,
+        max_keepalive_connections: int,
+        keepalive_expiry_sec: float,
+        timeout_sec: float,
+        http2: bool = False,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.name = name
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry_sec,
+        )
+        self._timeout_sec = timeout_sec
+        self._http2 = http2
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._requests = 0
+
+    async def _count_request(self, _request: httpx.Request) -> None:
+        self._requests += 1
+
+    def open(self) -> None:
+        """
+        Creates the client. HTTP/2 needs the `h2` package (`httpx[http2]`)
+        """
+        if self._client is not None:
+            return
+        self._client = httpx.AsyncClient(
+            limits=self._limits,
+            timeout=self._timeout_sec,
+            http2=self._http2,
+            transport=self._transport,
+            event_hooks={"request": [self._count_request]},
+        )
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        The shared client, opened on first use outside of the lifespan (scripts, tests)
+        """
+        if self._client is None:
+            self.open()
+        assert self._client is not None
+        return self._client
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Connections in the pool and requests sent, to size the limits
+        """
+        connections: list[Any] = []
+        if self._client is not None:
+            # httpx doesn't expose its pool, the httpcore pool underneath does list its connections
+            transport = self._client._transport  # pylint: disable=protected-access
+            pool = getattr(transport, "_pool", None)
+            if pool is not None:
+                connections = pool.connections
+
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return {
+            "open": self._client is not None,
+            "http2": self._http2,
+            "max_connections": self._limits.max_connections,
+            "max_keepalive_connections": self._limits.max_keepalive_connections,
+            "connections": len(connections),
+            "active": len(connections) - idle,
+            "idle": idle,
+            "requests": self._requests,
+        }
@@ -6,6 +6,7 @@ class LanguageInfo:
     name: str
     image: str
     file_extension: str
+    build_artifact: str | None  # File produced by compiling, None for interpreted languages
 
 
 class Language(str, Enum):
@@ -24,6 +25,7 @@ class C(LanguageInfo):
     name = "c"
     image = "c_runner"
     file_extension = "c"
+    build_artifact = "main"
 
 
 @dataclass(frozen=True)
@@ -31,6 +33,7 @@ class Python(LanguageInfo):
     name = "python"
     image = "python_runner"
     file_extension = "py"
+    build_artifact = None
 
 
 language_info: dict[Language, LanguageInfo] = {
@@ -145,6 +145,24 @@ class SubmissionMetadata(BaseModel):
     error_reason: ErrorReason | None
 
 
+class PhaseTiming(BaseModel):
+    """Wall-clock and CPU time spent in one phase of executing a submission."""
+
+    wall_ms: float = Field()
+    cpu_ms: float = Field()
+
+
+class TestCaseResult(BaseModel):
+    """Outcome and CPU time of one test case in the correctness run of a submission."""
+
+    __test__ = False  # Let pytest know that this is not a test class
+
+    index: int = Field()
+    # None if the test case was not graded on its own; the output was then graded as a whole
+    passed: bool | None = Field()
+    cpu_ms: float = Field()
+
+
 class SubmissionResult(BaseModel):
     """Schema to communicate submission result from engine to DB handler."""
 
@@ -152,9 +170,34 @@ class SubmissionResult(BaseModel):
     runtime_ms: float = Field()
     emissions_kg: float = Field()
     energy_usage_kwh: float = Field()
+    # Spread of the runtime over the measured samples; None if it was not sampled
+    runtime_stddev_ms: float | None = Field(default=None)
+    sample_count: int | None = Field(default=None)
+    # User and system CPU time per run, and peak memory; None if they were not measured
+    cpu_time_ms: float | None = Field(default=None)
+    memory_peak_mb: float | None = Field(default=None)
     successful: bool = Field()
     error_reason: ErrorReason | None = Field()
     error_msg: str | None = Field()
+    # Time spent per phase (setup, compile, correctness, measurement, teardown) for profiling the
+    # engine; phases that were not reached are missing
+    phase_timings: dict[str, PhaseTiming] = Field(default_factory=dict)
+    # Per test case, in the order of the input; cases after a failed one did not run
+    test_cases: list[TestCaseResult] = Field(default_factory=list)
+
+
+class SubmissionResultBatch(BaseModel):
+    """Schema to write the results of several submissions from engine to DB handler at once."""
+
+    results: list[SubmissionResult] = Field()
+
+
+class SubmissionResultBatchResponse(BaseModel):
+    """Schema to tell the engine how many results of a batch were written, and which submissions
+    did not exist."""
+
+    written: int = Field()
+    missing: list[UUID] = Field()
 
 
 class SubmissionFull(BaseModel):
@@ -167,6 +210,10 @@ class SubmissionFull(BaseModel):
     runtime_ms: float
     emissions_kg: float
     energy_usage_kwh: float
+    runtime_stddev_ms: float | None = None
+    sample_count: int | None = None
+    cpu_time_ms: float | None = None
+    memory_peak_mb: float | None = None
     timestamp: float
     executed: bool
     successful: bool
@@ -184,6 +231,24 @@ class SubmissionCreate(BaseModel):
     language: Language = Field()
     timestamp: float = Field()
     code: str = Field()
+    # Higher runs first, the server raises it for submissions of admins (ADMIN_SUBMISSION_PRIORITY)
+    priority: int = Field(default=0)
+
+
+class FrameworkFile(BaseModel):
+    """A stored file of the framework of a problem and language."""
+
+    name: str = Field()  # Path in the job directory
+    path: str = Field()  # Path relative to the DB handler's storage root
+    size: int = Field()
+    sha256: str = Field()
+
+
+class FrameworkManifest(BaseModel):
+    """Schema to tell the engine which stored files make up the framework of a submission."""
+
+    etag: str = Field()
+    files: list[FrameworkFile] = Field()
 
 
 class SubmissionIdentifier(BaseModel):
@@ -64,6 +64,8 @@ class HTTPErrorTypeDescription(tuple[int, str, str], Enum):
         "Title is required\nDifficulty must be one of: easy, medium, hard",
     )
     ERROR_INTERNAL_SERVER_ERROR = (500, "server_error", "An internal server error occurred")
+    ERROR_ENGINE_BUSY = (503, "engine_busy", "Execution engine is busy, try again later")
+    ERROR_ENGINE_UNREACHABLE = (503, "engine_unreachable", "Execution engine is unreachable")
 
     ERROR_INVALID_PERMISSION = (
         400,
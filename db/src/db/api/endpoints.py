@@ -9,11 +9,12 @@ Module containing API endpoints and routing logic.
 from uuid import UUID
 
 from fastapi import APIRouter, Header
-from starlette.responses import StreamingResponse
+from starlette.responses import FileResponse, Response
 
 from common.schemas import (
     AddProblemRequest,
     ChangePermissionRequest,
+    FrameworkManifest,
     LeaderboardRequest,
     LeaderboardResponse,
     LoginRequest,
@@ -28,6 +29,8 @@ from common.schemas import (
     SubmissionFull,
     SubmissionIdentifier,
     SubmissionResult,
+    SubmissionResultBatch,
+    SubmissionResultBatchResponse,
     TokenResponse,
     UserGet,
     UserProfileResponse,
@@ -135,24 +138,53 @@ async def get_user_information(
 
 
 @router.post("/framework")
-async def engine_request_framework(submission: SubmissionCreate) -> StreamingResponse:
+async def engine_request_framework(
+    submission: SubmissionCreate,
+    if_none_match: str | None = Header(default=None, alias="If-None-Match"),
+) -> Response:
     """POST endpoint to get framework from disk.
 
     Args:
         submission (SubmissionCreate): submission which was created
+        if_none_match (str | None): ETag of the framework the engine has cached, if any
 
     Returns:
-        StreamingResponse: framework
+        Response: 304 if the cached framework is still current, otherwise FileResponse with the
+            framework
     """
-    filename = f"framework_{submission.language.name}"
+    bundle = await actions.get_framework_bundle(submission)
+    if if_none_match == bundle.etag:
+        return Response(status_code=304, headers={"ETag": bundle.etag})
+
+    return FileResponse(
+        bundle.path,
+        media_type=bundle.media_type,
+        filename=f"framework_{submission.language.name}",
+        headers={"ETag": bundle.etag},
+    )
+
+
+@router.post("/framework/manifest", response_model=FrameworkManifest)
+async def engine_request_framework_manifest(
+    submission: SubmissionCreate,
+    if_none_match: str | None = Header(default=None, alias="If-None-Match"),
+) -> Response | FrameworkManifest:
+    """POST endpoint to get the stored paths and hashes of the framework files, for an engine that
+    mounts the storage volume and reads them from there.
+
+    Args:
+        submission (SubmissionCreate): submission which was created
+        if_none_match (str | None): ETag of the framework the engine has cached, if any
 
-    streamer, cleanup_task = await actions.get_framework_streamer(submission)
+    Returns:
+        Response | FrameworkManifest: 304 if the cached framework is still current, otherwise the
+            manifest of the framework
+    """
+    manifest = await actions.get_framework_manifest(submission)
+    if if_none_match == manifest.etag:
+        return Response(status_code=304, headers={"ETag": manifest.etag})
 
-    headers = {
-        "Content-Disposition": f'attachment; filename="{filename}"',
-        "Content-Type": "application/gzip",
-    }
-    return StreamingResponse(streamer, headers=headers, background=cleanup_task)
+    return manifest
 
 
 @router.post("/leaderboard")
@@ -286,6 +318,28 @@ async def write_submission_results(
     actions.update_submission(session, submission_result)
 
 
+@router.post("/write-submission-results", status_code=201)
+async def write_submission_results_batch(
+    session: SessionDep, batch: SubmissionResultBatch
+) -> SubmissionResultBatchResponse:
+    """POST endpoint to append the results of many submissions to their entries in a single
+    transaction. This is used by the engine to write back results in batches.
+
+    Args:
+        session (SessionDep): session to communicate with the database
+        batch (SubmissionResultBatch): results to be appended
+
+    Raises:
+        HTTPException: 500 if the results could not be written, then none of them are
+
+    Returns:
+        SubmissionResultBatchResponse: number of written results and the uuids of submissions that
+            were not found
+    """
+
+    return actions.update_submissions(session, batch)
+
+
 @router.post("/submission-result")
 async def get_submission_result(
     session: SessionDep,
@@ -14,12 +14,12 @@ import jwt
 from fastapi import HTTPException
 from loguru import logger
 from sqlmodel import Session
-from starlette.background import BackgroundTask
 from starlette.concurrency import run_in_threadpool
 
 from common.auth import check_email, check_username, data_to_jwt, jwt_to_data
 from common.schemas import (
     AddProblemRequest,
+    FrameworkManifest,
     LeaderboardRequest,
     LeaderboardResponse,
     LoginRequest,
@@ -33,6 +33,8 @@ from common.schemas import (
     SubmissionIdentifier,
     SubmissionMetadata,
     SubmissionResult,
+    SubmissionResultBatch,
+    SubmissionResultBatchResponse,
     TokenResponse,
     UserGet,
     UserProfileResponse,
@@ -208,6 +210,23 @@ def update_submission(s: Session, submission_result: SubmissionResult) -> Submis
     return ops.update_submission(s, submission_result)
 
 
+def update_submissions(s: Session, batch: SubmissionResultBatch) -> SubmissionResultBatchResponse:
+    """Update many submissions with results from execution engine at once.
+
+    Args:
+        s (Session): session to communicate to the database
+        batch (SubmissionResultBatch): results from execution engine
+
+    Raises:
+        HTTPException: 500 if the results could not be written (from downstream)
+
+    Returns:
+        SubmissionResultBatchResponse: number of written results and the uuids of submissions that
+            were not found
+    """
+    return ops.update_submissions(s, batch)
+
+
 def get_submission(s: Session, problem_id: int, user_uuid: UUID) -> SubmissionFull:
     """Get submission from disk using the id of the problem to which the submission belongs and the
     uuid of the author of the submission.
@@ -296,16 +315,23 @@ def get_leaderboard(s: Session, board_request: LeaderboardRequest) -> Leaderboar
     return result
 
 
-async def get_framework_streamer(submission: SubmissionCreate):
+async def get_framework_bundle(submission: SubmissionCreate) -> storage.FrameworkBundle:
     """
-    Creates a framework archive in a non-blocking way.
-    Returns a tuple containing:
-    1. An async generator that yields chunks of the archive
-    2. A background task to clean up resources
+    Stored framework archive of the submission's problem and language, built first if it is
+    missing or out of date
     """
+    return await run_in_threadpool(
+        storage.get_framework_bundle, str(submission.problem_id), submission.language
+    )
+
 
-    buff = await run_in_threadpool(storage.tar_full_framework, submission)
-    return buff, BackgroundTask(buff.close)
+async def get_framework_manifest(submission: SubmissionCreate) -> FrameworkManifest:
+    """
+    Manifest of the stored framework files of the submission's problem and language
+    """
+    return await run_in_threadpool(
+        storage.get_framework_manifest, str(submission.problem_id), submission.language
+    )
 
 
 def login_user(s: Session, login: LoginRequest) -> TokenResponse:
@@ -25,6 +25,10 @@ class Settings(BaseSettings):
     FRAMEWORK_DIR: str = "frameworks"
     TEMPLATE_DIR: str = "templates"
     WRAPPER_DIR: str = "wrappers"
+    # Framework archives for the execution engine, built per problem and language
+    FRAMEWORK_BUNDLE_DIR: str = "framework_bundles"
+    # gzip level 1-9 of these archives, 0 for a plain tar (best when the engine is on a local link)
+    FRAMEWORK_BUNDLE_COMPRESSION_LEVEL: int = 6
 
     # Postgres settings
     POSTGRES_HOST: str = "postgres"
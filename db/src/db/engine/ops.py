@@ -31,6 +31,8 @@ from common.schemas import (
     SubmissionIdentifier,
     SubmissionMetadata,
     SubmissionResult,
+    SubmissionResultBatch,
+    SubmissionResultBatchResponse,
     SubmissionRetrieveRequest,
     UserGet,
 )
@@ -73,7 +75,8 @@ def _commit_or_500(session, entry: DBEntry):
 
 
 def create_problem(s: Session, problem: AddProblemRequest) -> ProblemDetailsResponse:
-    """Create problem in the database and store the wrappers and inputs in storage.
+    """Create problem in the database, store the wrappers and inputs in storage and build its
+    framework archive.
 
     Args:
         s (Session): session to communicate with the database
@@ -96,6 +99,11 @@ def create_problem(s: Session, problem: AddProblemRequest) -> ProblemDetailsResp
     problem_get.wrappers = problem.wrappers
     storage.store_template_code(problem_get)
     storage.store_wrapper_code(problem_get)
+    try:
+        storage.store_framework_bundle(problem_get)
+    except OSError as e:
+        # Not fatal, the archive is built when the engine first asks for it
+        logger.warning(f"Could not build framework archive of problem {problem_id}: {e}")
 
     return problem_get
 
@@ -164,6 +172,40 @@ def update_submission(s: Session, submission_result: SubmissionResult) -> Submis
     return db_submission_to_submission_metadata(submission_entry)
 
 
+def update_submissions(s: Session, batch: SubmissionResultBatch) -> SubmissionResultBatchResponse:
+    """Update many submissions with results coming from the execution engine, with one query and
+    in a single transaction.
+
+    Args:
+        s (Session): session to communicate with the database
+        batch (SubmissionResultBatch): results from the execution engine
+
+    Raises:
+        HTTPException: 500 if the results could not be committed, then none of them are written
+
+    Returns:
+        SubmissionResultBatchResponse: number of written results and the uuids of submissions that
+            were not found
+    """
+    # A result reported twice (e.g. a job replayed after a restart) is written once, the last wins
+    results = {result.submission_uuid: result for result in batch.results}
+    entries = queries.get_submissions_by_sub_uuids(s, list(results))
+
+    for entry in entries:
+        append_submission_results(entry, results[entry.submission_uuid])
+
+    try:
+        queries.commit_entries(s, entries)
+    except DBCommitError as e:
+        logger.error(f"DB commit error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error") from e
+
+    found = {entry.submission_uuid for entry in entries}
+    return SubmissionResultBatchResponse(
+        written=len(found), missing=[uuid for uuid in results if uuid not in found]
+    )
+
+
 def get_submission_from_retrieve_request(
     s: Session, request: SubmissionRetrieveRequest
 ) -> SubmissionFull:
@@ -235,6 +277,10 @@ def get_submission_result(s: Session, submission_uuid: UUID, user_uuid: UUID) ->
         runtime_ms=result.runtime_ms,
         emissions_kg=result.emissions_kg,
         energy_usage_kwh=result.energy_usage_kwh,
+        runtime_stddev_ms=result.runtime_stddev_ms,
+        sample_count=result.sample_count,
+        cpu_time_ms=result.cpu_time_ms,
+        memory_peak_mb=result.memory_peak_mb,
         successful=bool(result.successful),
         error_reason=result.error_reason,
         error_msg=result.error_msg,
@@ -7,7 +7,7 @@ Module for all low-level operations that act directly on the database engine
 from typing import Sequence
 from uuid import UUID
 
-from sqlmodel import Session, desc, distinct, func, select
+from sqlmodel import Session, col, desc, distinct, func, select
 
 from common.languages import Language
 from common.schemas import LeaderboardRequest, LeaderboardResponse, UserScore
@@ -44,6 +44,22 @@ def commit_entry(session: Session, entry: DBEntry):
         raise DBCommitError() from e
 
 
+def commit_entries(session: Session, entries: Sequence[DBEntry]):
+    """
+    Commits several entries to the database in a single transaction. Performs a rollback in case
+    of error, so either all or none of the entries are committed.
+    :raises DBCommitError: If commit fails
+    """
+
+    session.add_all(entries)
+    try:
+        session.commit()
+    except Exception as e:
+        # Make sure an exception doesn't contaminate the DB
+        session.rollback()
+        raise DBCommitError() from e
+
+
 def delete_entry(session: Session, entry: DBEntry) -> None:
     """Delete entry from database.
 
@@ -170,6 +186,22 @@ def get_submission_by_sub_uuid(s: Session, uuid: UUID) -> SubmissionEntry:
     return res
 
 
+def get_submissions_by_sub_uuids(s: Session, uuids: Sequence[UUID]) -> Sequence[SubmissionEntry]:
+    """Get the submissions with any of the submission uuids, in a single query.
+
+    Args:
+        s (Session): session to communicate with the database
+        uuids (Sequence[UUID]): uuids of the submissions
+
+    Returns:
+        Sequence[SubmissionEntry]: entries from the database, uuids without a submission are
+            left out
+    """
+    return s.exec(
+        select(SubmissionEntry).where(col(SubmissionEntry.submission_uuid).in_(uuids))
+    ).all()
+
+
 def get_submission_from_problem_user_ids(
     s: Session, problem_id: int, user_uuid: UUID
 ) -> SubmissionEntry:
@@ -55,6 +55,10 @@ def append_submission_results(submission: SubmissionEntry, result: SubmissionRes
     submission.runtime_ms = result.runtime_ms
     submission.emissions_kg = result.emissions_kg
     submission.energy_usage_kwh = result.energy_usage_kwh
+    submission.runtime_stddev_ms = result.runtime_stddev_ms
+    submission.sample_count = result.sample_count
+    submission.cpu_time_ms = result.cpu_time_ms
+    submission.memory_peak_mb = result.memory_peak_mb
     submission.successful = result.successful
     submission.error_reason = result.error_reason
     submission.error_msg = result.error_msg
@@ -103,6 +107,10 @@ def db_submission_to_submission_full(submission: SubmissionEntry) -> SubmissionF
         runtime_ms=submission.runtime_ms,
         emissions_kg=submission.emissions_kg,
         energy_usage_kwh=submission.energy_usage_kwh,
+        runtime_stddev_ms=submission.runtime_stddev_ms,
+        sample_count=submission.sample_count,
+        cpu_time_ms=submission.cpu_time_ms,
+        memory_peak_mb=submission.memory_peak_mb,
         timestamp=submission.timestamp,
         executed=submission.executed,
         successful=submission.successful if submission.successful else False,  # Catch None
@@ -84,6 +84,10 @@ class SubmissionEntry(SQLModel, table=True):
     runtime_ms: float = Field()
     emissions_kg: float = Field()
     energy_usage_kwh: float = Field()
+    runtime_stddev_ms: float | None = Field(default=None)
+    sample_count: int | None = Field(default=None)
+    cpu_time_ms: float | None = Field(default=None)
+    memory_peak_mb: float | None = Field(default=None)
     timestamp: float = Field()
     executed: bool = Field()
     successful: bool | None = Field()
@@ -4,21 +4,23 @@ This module will include storage handling, for saving user submitted code.
 
 import os.path
 
+from .bundles import FrameworkBundle, get_framework_bundle, get_framework_manifest
 from .storage import (
     load_last_submission_code,
     load_template_code,
     store_code,
+    store_framework_bundle,
     store_template_code,
-    tar_full_framework,
 )
-from .storage_async import tar_stream_generator
 
 __all__ = [
+    "FrameworkBundle",
+    "get_framework_bundle",
+    "get_framework_manifest",
     "store_code",
     "load_last_submission_code",
     "load_template_code",
-    "tar_stream_generator",
-    "tar_full_framework",
+    "store_framework_bundle",
     "store_template_code",
 ]
 
@@ -36,3 +38,7 @@ if not os.path.exists(wrappers_dir):
 submissions_dir = os.path.join(settings.DB_HANDLER_STORAGE_PATH, settings.CODE_SUBMISSION_DIR)
 if not os.path.exists(submissions_dir):
     os.makedirs(submissions_dir)
+
+bundles_dir = os.path.join(settings.DB_HANDLER_STORAGE_PATH, settings.FRAMEWORK_BUNDLE_DIR)
+if not os.path.exists(bundles_dir):
+    os.makedirs(bundles_dir)
@@ -0,0 +1,261 @@
+"""
+Precomputed framework archives.
+The archive with the framework and wrapper files of a problem and language is built once, when the
+problem is stored, and kept on disk together with the SHA-256 of its content, which is served as
+its ETag. Archives are reproducible: the same files always give the same bytes, so the ETag only
+changes when a file does.
+
+An archive is rebuilt when it is missing, when its source files changed since it was built (for
+example when a framework is updated on disk), or when FRAMEWORK_BUNDLE_COMPRESSION_LEVEL changed.
+Checking that only reads file metadata. Archives are written to disk as the files are read, so
+memory use does not depend on the size of the test inputs and outputs.
+
+With compression level 0 the archive is a plain tar, which costs no CPU on either side and is the
+better choice when the engine is on the same host or a fast local network.
+
+Each problem and language also has a manifest: the stored path, size and SHA-256 of every file
+the archive would hold. An engine that mounts the storage volume reads the files from there and
+needs no archive at all, so the manifest is built straight from the source files, without an
+archive, and kept next to it until a source file changes. The manifest's ETag is the hash of the
+file names and hashes, so it does not depend on the archive format.
+"""
+
+import dataclasses
+import gzip
+import hashlib
+import json
+import os
+import tarfile
+import tempfile
+import threading
+from typing import BinaryIO
+
+from common.languages import Language
+from common.schemas import FrameworkFile, FrameworkManifest
+from db.config import settings
+from db.storage.paths import framework_path, wrapper_path
+
+
+@dataclasses.dataclass(frozen=True)
+class FrameworkBundle:
+    path: str
+    etag: str
+
+    @property
+    def media_type(self) -> str:
+        return "application/gzip" if self.path.endswith(".gz") else "application/x-tar"
+
+
+# One lock per archive or manifest, so requests that find it out of date build it only once
+_build_locks: dict[str, threading.Lock] = {}
+_build_locks_lock = threading.Lock()
+
+
+def _build_lock(path: str) -> threading.Lock:
+    with _build_locks_lock:
+        return _build_locks.setdefault(path, threading.Lock())
+
+
+def _bundle_dir(problem_id: str) -> str:
+    return os.path.join(settings.DB_HANDLER_STORAGE_PATH, settings.FRAMEWORK_BUNDLE_DIR, problem_id)
+
+
+def _sources(problem_id: str, language: Language) -> list[str]:
+    # Wrapper files come last, so they replace framework files with the same name on extraction
+    return [framework_path(language), wrapper_path(problem_id, language.info.name)]
+
+
+def _source_signature(problem_id: str, language: Language) -> str:
+    """
+    Changes whenever a framework or wrapper file of the archive changes
+    """
+    h = hashlib.sha256()
+    for source in _sources(problem_id, language):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                st = os.stat(os.path.join(root, name))
+                h.update(f"{root}\0{name}\0{st.st_size}\0{st.st_mtime_ns}\0".encode())
+    return h.hexdigest()
+
+
+def _normalise(info: tarfile.TarInfo) -> tarfile.TarInfo:
+    info.mtime = 0
+    info.uid = info.gid = 0
+    info.uname = info.gname = ""
+    return info
+
+
+def _write_tar(fileobj: BinaryIO, problem_id: str, language: Language) -> None:
+    with tarfile.open(fileobj=fileobj, mode="w", format=tarfile.PAX_FORMAT) as tar:
+        for source in _sources(problem_id, language):
+            for filename in sorted(os.listdir(source)):
+                tar.add(os.path.join(source, filename), arcname=filename, filter=_normalise)
+
+
+def _write_archive(fileobj: BinaryIO, problem_id: str, language: Language, level: int) -> None:
+    if level == 0:
+        _write_tar(fileobj, problem_id, language)
+        return
+
+    with gzip.GzipFile(fileobj=fileobj, mode="wb", compresslevel=level, filename="", mtime=0) as gz:
+        _write_tar(gz, problem_id, language)  # type: ignore[arg-type]
+
+
+def _archive_name(language: Language, level: int) -> str:
+    return f"{language.info.name}.tar" if level == 0 else f"{language.info.name}.tar.gz"
+
+
+def _file_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def _manifest(problem_id: str, language: Language) -> FrameworkManifest:
+    files: dict[str, FrameworkFile] = {}
+    for source in _sources(problem_id, language):
+        for root, dirs, names in os.walk(source):
+            dirs.sort()
+            for filename in names:
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, source)
+                # Same as in the archive, a wrapper file replaces the framework file
+                files[name] = FrameworkFile(
+                    name=name,
+                    path=os.path.relpath(path, settings.DB_HANDLER_STORAGE_PATH),
+                    size=os.path.getsize(path),
+                    sha256=_file_digest(path),
+                )
+
+    h = hashlib.sha256()
+    for name in sorted(files):
+        h.update(f"{name}\0{files[name].sha256}\0".encode())
+    return FrameworkManifest(etag=f'"{h.hexdigest()}"', files=[files[n] for n in sorted(files)])
+
+
+def _manifest_name(language: Language) -> str:
+    return f"{language.info.name}.manifest.json"
+
+
+def _build_manifest(problem_id: str, language: Language) -> FrameworkManifest:
+    directory = _bundle_dir(problem_id)
+    os.makedirs(directory, exist_ok=True)
+
+    signature = _source_signature(problem_id, language)
+    manifest = _manifest(problem_id, language)
+
+    meta = json.dumps({"source": signature, "manifest": manifest.model_dump()}).encode()
+    _write_atomically(directory, _manifest_name(language), lambda f: f.write(meta))
+    return manifest
+
+
+def _stored_manifest(problem_id: str, language: Language) -> FrameworkManifest | None:
+    """
+    :returns: the stored manifest, or None if it is missing or out of date
+    """
+    try:
+        with open(os.path.join(_bundle_dir(problem_id), _manifest_name(language)), "rb") as f:
+            meta = json.load(f)
+        if meta["source"] == _source_signature(problem_id, language):
+            return FrameworkManifest.model_validate(meta["manifest"])
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+
+def _write_atomically(directory: str, name: str, write) -> str:
+    """
+    Writes next to the target first, so a partially written file is never served
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp_path, os.path.join(directory, name))
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return os.path.join(directory, name)
+
+
+def _build(problem_id: str, language: Language, level: int) -> FrameworkBundle:
+    directory = _bundle_dir(problem_id)
+    os.makedirs(directory, exist_ok=True)
+
+    signature = _source_signature(problem_id, language)
+    path = _write_atomically(
+        directory,
+        _archive_name(language, level),
+        lambda f: _write_archive(f, problem_id, language, level),
+    )
+    etag = f'"{_file_digest(path)}"'
+
+    meta = json.dumps({"etag": etag, "source": signature, "level": level}).encode()
+    _write_atomically(directory, f"{language.info.name}.json", lambda f: f.write(meta))
+
+    # Left behind if the compression level was changed
+    stale = os.path.join(directory, _archive_name(language, 0 if level else 1))
+    if os.path.exists(stale):
+        os.remove(stale)
+    return FrameworkBundle(path=path, etag=etag)
+
+
+def _stored(problem_id: str, language: Language, level: int) -> FrameworkBundle | None:
+    """
+    :returns: the stored archive, or None if it is missing or out of date
+    """
+    directory = _bundle_dir(problem_id)
+    path = os.path.join(directory, _archive_name(language, level))
+    try:
+        with open(os.path.join(directory, f"{language.info.name}.json"), "rb") as f:
+            meta = json.load(f)
+        if (
+            meta["level"] == level
+            and os.path.isfile(path)
+            and meta["source"] == _source_signature(problem_id, language)
+        ):
+            return FrameworkBundle(path=path, etag=meta["etag"])
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+
+def build_framework_bundle(problem_id: str, language: Language) -> FrameworkBundle:
+    """
+    Builds the archive of a problem and language and stores it with its ETag.
+    This function is SYNCHRONOUS and should be run in a thread pool.
+    """
+    level = settings.FRAMEWORK_BUNDLE_COMPRESSION_LEVEL
+    with _build_lock(os.path.join(_bundle_dir(problem_id), language.info.name)):
+        return _build(problem_id, language, level)
+
+
+def get_framework_bundle(problem_id: str, language: Language) -> FrameworkBundle:
+    """
+    Returns the stored archive of a problem and language, building it if it is missing or out of
+    date.
+    This function is SYNCHRONOUS and should be run in a thread pool.
+    """
+    level = settings.FRAMEWORK_BUNDLE_COMPRESSION_LEVEL
+    bundle = _stored(problem_id, language, level)
+    if bundle is not None:
+        return bundle
+
+    with _build_lock(os.path.join(_bundle_dir(problem_id), language.info.name)):
+        # Another request may have built it while we waited
+        return _stored(problem_id, language, level) or _build(problem_id, language, level)
+
+
+def get_framework_manifest(problem_id: str, language: Language) -> FrameworkManifest:
+    """
+    Returns the manifest of the stored framework files of a problem and language, hashing the
+    files again if it is missing or out of date. Never builds the archive.
+    This function is SYNCHRONOUS and should be run in a thread pool.
+    """
+    manifest = _stored_manifest(problem_id, language)
+    if manifest is not None:
+        return manifest
+
+    with _build_lock(os.path.join(_bundle_dir(problem_id), _manifest_name(language))):
+        # Another request may have built it while we waited
+        return _stored_manifest(problem_id, language) or _build_manifest(problem_id, language)
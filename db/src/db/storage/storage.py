@@ -1,6 +1,4 @@
-import io
 import os
-import tarfile
 from tarfile import TarFile
 
 from common.languages import Language
@@ -10,22 +8,15 @@ from common.schemas import (
     SubmissionMetadata,
     SubmissionRetrieveRequest,
 )
-from db.storage.io import read_file, read_file_to_tar, read_folder_to_tar, write_file
-from db.storage.paths import framework_path, submission_code_path, template_path, wrapper_path
-
-
-def _add_framework_to_tar(tar: TarFile, language: Language) -> None:
-    read_folder_to_tar(tar, framework_path(language))
+from db.storage.bundles import build_framework_bundle
+from db.storage.io import read_file, read_file_to_tar, write_file
+from db.storage.paths import submission_code_path, template_path, wrapper_path
 
 
 def _add_submission_to_tar(tar: TarFile, sub: SubmissionCreate | SubmissionMetadata) -> None:
     read_file_to_tar(tar, submission_code_path(sub))
 
 
-def _add_wrapper_to_tar(tar: TarFile, sub: SubmissionCreate | SubmissionMetadata) -> None:
-    read_folder_to_tar(tar, wrapper_path(str(sub.problem_id), sub.language.info.name))
-
-
 def load_last_submission_code(submission: SubmissionMetadata | SubmissionRetrieveRequest) -> str:
     path = submission_code_path(submission)
 
@@ -56,20 +47,6 @@ def load_wrapper_code(problem: ProblemDetailsResponse) -> list[list[str]]:
     return wrappers
 
 
-def tar_full_framework(submission: SubmissionCreate) -> io.BytesIO:
-    """
-    Creates a gzipped tar archive in an in-memory buffer.
-    This function is SYNCHRONOUS and should be run in a thread pool.
-    """
-    buff = io.BytesIO()
-    with tarfile.open(fileobj=buff, mode="w:gz") as tar:
-        _add_framework_to_tar(tar, submission.language)
-        _add_wrapper_to_tar(tar, submission)
-
-    buff.seek(0)
-    return buff
-
-
 def store_code(submission: SubmissionCreate) -> None:
     path = submission_code_path(submission)
 
@@ -89,3 +66,10 @@ def store_wrapper_code(problem: ProblemDetailsResponse):
         filename = wrapper[0]
         content = wrapper[1]
         write_file(content, path, filename)
+
+
+def store_framework_bundle(problem: ProblemDetailsResponse) -> None:
+    """
+    Builds the framework archive the execution engine downloads for this problem
+    """
+    build_framework_bundle(str(problem.problem_id), problem.language)
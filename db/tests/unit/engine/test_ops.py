@@ -19,6 +19,7 @@ from common.schemas import (
     SubmissionIdentifier,
     SubmissionMetadata,
     SubmissionResult,
+    SubmissionResultBatch,
     UserGet,
 )
 from common.typing import Difficulty
@@ -39,6 +40,7 @@ from db.engine.ops import (
     register_new_user,
     try_login_user,
     update_submission,
+    update_submissions,
     update_user_avatar,
     update_user_private,
     update_user_username,
@@ -514,6 +516,54 @@ def test_get_submission_result(
     assert submission_result == result
 
 
+def test_get_submission_result_statistics(
+    session,
+    submission_create: SubmissionCreate,
+    submission_result: SubmissionResult,
+    user_1_register: RegisterRequest,
+    problem_post: AddProblemRequest,
+):
+    """Test runtime statistics of a sampled measurement are stored and retrieved"""
+    user_get = register_new_user(session, user_1_register)
+    problem_entry = create_problem(session, problem_post)
+    submission_create.user_uuid = user_get.uuid
+    submission_create.problem_id = problem_entry.problem_id
+    submission_result.runtime_stddev_ms = 3.1
+    submission_result.sample_count = 42
+
+    submission_response = create_submission(session, submission_create)
+    update_submission(session, submission_result)
+
+    result = get_submission_result(session, submission_response.submission_uuid, user_get.uuid)
+
+    assert result.runtime_stddev_ms == 3.1
+    assert result.sample_count == 42
+
+
+def test_get_submission_result_resources(
+    session,
+    submission_create: SubmissionCreate,
+    submission_result: SubmissionResult,
+    user_1_register: RegisterRequest,
+    problem_post: AddProblemRequest,
+):
+    """Test CPU time and peak memory are stored and retrieved"""
+    user_get = register_new_user(session, user_1_register)
+    problem_entry = create_problem(session, problem_post)
+    submission_create.user_uuid = user_get.uuid
+    submission_create.problem_id = problem_entry.problem_id
+    submission_result.cpu_time_ms = 12.5
+    submission_result.memory_peak_mb = 1.75
+
+    submission_response = create_submission(session, submission_create)
+    update_submission(session, submission_result)
+
+    result = get_submission_result(session, submission_response.submission_uuid, user_get.uuid)
+
+    assert result.cpu_time_ms == 12.5
+    assert result.memory_peak_mb == 1.75
+
+
 def test_read_problem_result(session, problem_post: AddProblemRequest):
     """Test retrieved problem with problem_id is correct problem"""
     problem_input = create_problem(session, problem_post)
@@ -695,6 +745,39 @@ def test_get_leaderboard_success(session):
     assert energies == [pytest.approx(5.0), pytest.approx(20.0)]
 
 
+def test_update_submissions_result(
+    session,
+    submission_create: SubmissionCreate,
+    submission_create_recent: SubmissionCreate,
+    submission_result: SubmissionResult,
+    submission_result_recent: SubmissionResult,
+    user_1_register: RegisterRequest,
+    problem_post: AddProblemRequest,
+):
+    """Test that a batch writes all results of existing submissions and reports the missing ones"""
+    user_get = register_new_user(session, user_1_register)
+    problem_entry = create_problem(session, problem_post)
+    for submission in (submission_create, submission_create_recent):
+        submission.user_uuid = user_get.uuid
+        submission.problem_id = problem_entry.problem_id
+        create_submission(session, submission)
+
+    unknown = submission_result.model_copy(update={"submission_uuid": uuid4()})
+    response = update_submissions(
+        session,
+        SubmissionResultBatch(results=[submission_result, submission_result_recent, unknown]),
+    )
+
+    assert response.written == 2
+    assert response.missing == [unknown.submission_uuid]
+    for submission, result in (
+        (submission_create, submission_result),
+        (submission_create_recent, submission_result_recent),
+    ):
+        stored = get_submission_result(session, submission.submission_uuid, user_get.uuid)
+        assert stored == result
+
+
 def test_get_submission_from_retrieve_request_result(
     session: Session,
     user_1_register: RegisterRequest,
@@ -0,0 +1,127 @@
+import hashlib
+import os
+import shutil
+import tarfile
+from uuid import uuid4
+
+import pytest
+
+from common.languages import Language
+from common.schemas import SubmissionCreate
+from db import settings, storage
+from db.storage.paths import wrapper_path
+
+
+@pytest.fixture(name="submission")
+def submission_fixture() -> SubmissionCreate:
+    return SubmissionCreate(
+        submission_uuid=uuid4(),
+        problem_id=10000,
+        user_uuid=uuid4(),
+        language=Language.C,
+        timestamp=0.0,
+        code="int main() {}",
+    )
+
+
+def _bundle(submission: SubmissionCreate) -> storage.FrameworkBundle:
+    return storage.get_framework_bundle(str(submission.problem_id), submission.language)
+
+
+def test_framework_bundle_reused(submission: SubmissionCreate):
+    """Test that the stored archive is served again as long as no file changes"""
+    bundle = _bundle(submission)
+    mtime = os.stat(bundle.path).st_mtime_ns
+
+    assert _bundle(submission) == bundle
+    assert os.stat(bundle.path).st_mtime_ns == mtime
+
+
+def test_framework_bundle_reproducible(submission: SubmissionCreate):
+    """Test that rebuilding an archive from the same files gives the same bytes and ETag"""
+    bundle = _bundle(submission)
+    with open(bundle.path, "rb") as f:
+        content = f.read()
+
+    os.remove(bundle.path)
+    rebuilt = _bundle(submission)
+
+    assert rebuilt.etag == bundle.etag
+    with open(rebuilt.path, "rb") as f:
+        assert f.read() == content
+
+
+def test_framework_bundle_rebuilt_on_change(submission: SubmissionCreate):
+    """Test that changing a wrapper file rebuilds the archive with a new ETag"""
+    before = _bundle(submission)
+
+    path = os.path.join(wrapper_path("10000", "c"), "input.txt")
+    with open(path, "a") as f:
+        f.write("\n")
+
+    after = _bundle(submission)
+    assert after.etag != before.etag
+    with tarfile.open(after.path) as tar:
+        assert "input.txt" in tar.getnames()
+        extracted = tar.extractfile("input.txt")
+        assert extracted is not None
+        with open(path, "rb") as f:
+            assert extracted.read() == f.read()
+
+
+def test_framework_bundle_uncompressed(submission: SubmissionCreate, monkeypatch):
+    """Test that compression level 0 rebuilds the archive as a plain tar"""
+    compressed = _bundle(submission)
+    assert compressed.media_type == "application/gzip"
+
+    monkeypatch.setattr(settings, "FRAMEWORK_BUNDLE_COMPRESSION_LEVEL", 0)
+    plain = _bundle(submission)
+
+    assert plain.media_type == "application/x-tar"
+    assert plain.etag != compressed.etag
+    assert not os.path.exists(compressed.path)
+    with tarfile.open(plain.path, mode="r:") as tar:
+        assert "input.txt" in tar.getnames()
+
+
+def test_framework_manifest(submission: SubmissionCreate):
+    """Test that the manifest lists the archived files with their stored path and hash"""
+    bundle = _bundle(submission)
+    manifest = storage.get_framework_manifest(str(submission.problem_id), submission.language)
+    files = {file.name: file for file in manifest.files}
+
+    with tarfile.open(bundle.path) as tar:
+        assert set(files) == {member.name for member in tar if member.isfile()}
+
+    stored = os.path.join(settings.DB_HANDLER_STORAGE_PATH, files["input.txt"].path)
+    assert os.path.samefile(stored, os.path.join(wrapper_path("10000", "c"), "input.txt"))
+    with open(stored, "rb") as f:
+        assert files["input.txt"].sha256 == hashlib.sha256(f.read()).hexdigest()
+
+
+def test_framework_manifest_without_archive(submission: SubmissionCreate):
+    """Test that the manifest is built from the source files, without building an archive"""
+    directory = os.path.join(
+        settings.DB_HANDLER_STORAGE_PATH, settings.FRAMEWORK_BUNDLE_DIR, "10000"
+    )
+    shutil.rmtree(directory, ignore_errors=True)
+
+    manifest = storage.get_framework_manifest(str(submission.problem_id), submission.language)
+
+    assert {file.name for file in manifest.files} >= {"input.txt", "run.sh"}
+    assert not any(name.endswith((".tar", ".tar.gz")) for name in os.listdir(directory))
+
+
+def test_framework_manifest_rebuilt_on_change(submission: SubmissionCreate):
+    """Test that changing a wrapper file gives a manifest with its new hash and a new ETag"""
+    before = storage.get_framework_manifest(str(submission.problem_id), submission.language)
+
+    path = os.path.join(wrapper_path("10000", "c"), "input.txt")
+    with open(path, "a") as f:
+        f.write("\n")
+
+    after = storage.get_framework_manifest(str(submission.problem_id), submission.language)
+    assert after.etag != before.etag
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    assert {file.name: file.sha256 for file in after.files}["input.txt"] == digest
@@ -1,9 +1,23 @@
-import asyncio
+import dataclasses
+import sqlite3
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, status
+from loguru import logger
 
 from common.schemas import SubmissionCreate
-from execution_engine import executor
+from execution_engine import blocking
+from execution_engine.cluster.coordinator import coordinator
+from execution_engine.config import settings
+from execution_engine.docker_handler import images
+from execution_engine.docker_handler.state import container_events
+from execution_engine.executor import scheduler
+from execution_engine.http_clients import db_client
+from execution_engine.jobs.dispatcher import dispatcher
+from execution_engine.jobs.result_writer import result_writer
+from execution_engine.jobs.store import QueueFullError
+from execution_engine.measurement.calibration import calibrator
+from execution_engine.metrics.loop_lag import loop_lag_monitor
+from execution_engine.scheduling.topology import detect_layout
 
 router = APIRouter()
 
@@ -11,12 +25,97 @@ router = APIRouter()
 @router.post("/execute", status_code=201)
 async def execute(request: SubmissionCreate):
     """
-    Requests the executor to schedule execution
+    Stores the submission in the job queue, it is executed as soon as there is capacity.
+    Returns immediately so frontend can show "Submission posted"
     """
-    # Create task so we can immediate return success so frontend can show "Submission posted"
-    asyncio.create_task(executor.entry(request))
+    try:
+        await dispatcher.submit(request)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Job queue is full",
+            headers={"Retry-After": str(settings.JOB_QUEUE_RETRY_AFTER_SEC)},
+        ) from e
+    except sqlite3.Error as e:
+        logger.error(f"Could not store job: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Job queue unavailable",
+            headers={"Retry-After": str(settings.JOB_QUEUE_RETRY_AFTER_SEC)},
+        ) from e
 
 
 @router.get("/health", status_code=200)
 async def health_check():
     return {"status": "ok", "message": "Engine service is running"}
+
+
+@router.get("/images", status_code=200)
+async def image_status():
+    """
+    Lists the runner images and whether they are built and up to date
+    """
+    return [dataclasses.asdict(status) for status in images.image_statuses()]
+
+
+@router.get("/metrics", status_code=200)
+async def metrics():
+    """
+    Job queue depth and wait times, pending result write-back, containers waited for, event loop
+    lag, load of the blocking pool and connections of the HTTP client
+    """
+    return {
+        "job_queue": await dispatcher.snapshot(),
+        "result_writer": await result_writer.snapshot(),
+        "containers": container_events.stats(),
+        "event_loop_lag": loop_lag_monitor.snapshot(),
+        "blocking_pool": blocking.stats(),
+        "http_clients": {db_client.name: db_client.stats()},
+    }
+
+
+@router.get("/cpu-layout", status_code=200)
+async def cpu_layout():
+    """
+    Which CPUs run jobs, which are kept idle and which are reserved for other services
+    """
+    return dataclasses.asdict(detect_layout())
+
+
+@router.get("/calibration", status_code=200)
+async def calibration():
+    """
+    Speed and noise of every worker CPU relative to the others, and which are excluded from jobs
+    """
+    return {
+        "enabled": settings.CALIBRATION_ENABLED,
+        "normalize": settings.CALIBRATION_NORMALIZE,
+        "max_noise": settings.CALIBRATION_MAX_NOISE,
+        "epoch": calibrator.epoch(),
+        "cpus": calibrator.snapshot(),
+    }
+
+
+@router.get("/capacity", status_code=200)
+async def capacity():
+    """
+    Free CPU slots of this engine, polled by a coordinator to pick the least-loaded worker
+    """
+    pending, running = await dispatcher.depth()
+    # CPUs excluded by the calibration don't take jobs
+    worker_cpus = len(scheduler.usable_cpus())
+    return {
+        "worker_cpus": worker_cpus,
+        "free_cpus": scheduler.free_cpus(),
+        "free_slots": max(0, worker_cpus - pending - running),
+        "pending": pending,
+        "running": running,
+    }
+
+
+@router.get("/cluster", status_code=200)
+async def cluster():
+    """
+    Worker engines known to this coordinator, with their last reported capacity
+    """
+    return {"role": settings.ENGINE_ROLE, "workers": coordinator.snapshot()}
@@ -1,15 +1,35 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from loguru import logger
 
+from execution_engine import blocking
+from execution_engine.cache.result_store import result_store
+from execution_engine.cluster.coordinator import coordinator
 from execution_engine.config import settings
-from execution_engine.docker_handler.state import shutdown
-from execution_engine.executor import scheduler
+from execution_engine.docker_handler import images
+from execution_engine.docker_handler.pool import container_pool
+from execution_engine.docker_handler.state import container_events, shutdown
+from execution_engine.executor import calibration, scheduler
+from execution_engine.http_clients import db_client
+from execution_engine.jobs.dispatcher import dispatcher
+from execution_engine.jobs.result_writer import result_writer
+from execution_engine.metrics.loop_lag import loop_lag_monitor
+from execution_engine.parsers.grader import comparator
+
+
+async def _maintain_container_pool():
+    while True:
+        await asyncio.sleep(settings.CONTAINER_POOL_MAINTENANCE_INTERVAL_SEC)
+        try:
+            await asyncio.to_thread(container_pool.maintain, scheduler.usable_cpus())
+        except Exception as e:  # pylint: disable=W0718
+            logger.error(f"Container pool maintenance failed: {e}")
 
 
 @asynccontextmanager
-async def _lifespan(_app: FastAPI):
+async def _lifespan(_app: FastAPI):  # pylint: disable=too-many-statements
     """
     Lifespan context manager
     Anything before `yield` runs on startup, anything after on exit
@@ -18,10 +38,73 @@ async def _lifespan(_app: FastAPI):
     logger.info(
         f"Server started on {settings.EXECUTION_ENGINE_HOST}:{settings.EXECUTION_ENGINE_PORT}"
     )
+    if settings.ENGINE_ROLE not in ("standalone", "coordinator"):
+        raise ValueError(f"Unknown engine role: {settings.ENGINE_ROLE}")
+    is_coordinator = settings.ENGINE_ROLE == "coordinator"
+    if is_coordinator and not settings.CLUSTER_WORKER_URLS:
+        raise ValueError("A coordinator needs CLUSTER_WORKER_URLS")
+    if settings.FRAMEWORK_TRANSFER_MODE not in ("archive", "shared"):
+        raise ValueError(f"Unknown framework transfer mode: {settings.FRAMEWORK_TRANSFER_MODE}")
+    comparator(settings.GRADER_COMPARISON_MODE)  # Raises on an unknown mode
+
     scheduler.init()
+    db_client.open()
+    loop_lag_task = asyncio.create_task(loop_lag_monitor.run())
+    result_writer_task = asyncio.create_task(result_writer.run())
+
+    # A coordinator doesn't run containers itself
+    if settings.PREBUILD_IMAGES_ON_STARTUP and not is_coordinator:
+        # Building can take a while on a cold cache, don't block the event loop while doing so
+        await asyncio.to_thread(images.build_all)
+
+    if not is_coordinator:
+        # Before any job starts a container, so no exit is missed
+        container_events.start()
+
+    calibration_task = None
+    if settings.CALIBRATION_ENABLED and not is_coordinator:
+        calibration_task = await calibration.start()
+
+    pool_task = None
+    if settings.CONTAINER_POOL_ENABLED and not is_coordinator:
+        # After the calibration, so no containers are created on excluded CPUs
+        await asyncio.to_thread(container_pool.warm_up, scheduler.usable_cpus())
+        pool_task = asyncio.create_task(_maintain_container_pool())
+
+    coordinator_task = None
+    if is_coordinator:
+        coordinator_task = asyncio.create_task(coordinator.run())
+
+    # After building images and warming up, so replayed jobs don't wait for that
+    dispatcher_task = asyncio.create_task(dispatcher.run())
 
     yield
 
+    # Jobs still in flight stay in the queue and are replayed on the next start
+    dispatcher_task.cancel()
+    if pool_task is not None:
+        pool_task.cancel()
+        await asyncio.to_thread(container_pool.shutdown)
+
+    if coordinator_task is not None:
+        coordinator_task.cancel()
+
+    if calibration_task is not None:
+        calibration_task.cancel()
+
+    loop_lag_task.cancel()
+    dispatcher.close()
+    # Whatever is still spooled afterwards is written on the next start
+    result_writer_task.cancel()
+    try:
+        await result_writer.flush()
+    except Exception as e:  # pylint: disable=W0718
+        logger.warning(f"Could not write spooled results on shutdown: {e}")
+    result_writer.close()
+    await coordinator.close()
+    await db_client.close()
+    result_store.close()
+    blocking.shutdown()
     shutdown()
 
     logger.info("Server stopped")
@@ -0,0 +1,59 @@
+"""
+Bounded thread pool for blocking work (file I/O, short Docker calls) that has to happen while
+handling a job, so it never runs on the event loop.
+Waiting for containers is not done here: those waits take as long as the job itself and would
+exhaust the pool.
+"""
+
+import asyncio
+import collections
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from execution_engine.config import settings
+
+T = TypeVar("T")
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.BLOCKING_POOL_THREADS, thread_name_prefix="blocking"
+)
+
+_stats_lock = threading.Lock()
+_counts: collections.Counter[str] = collections.Counter()
+
+
+def _tracked(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    with _stats_lock:
+        _counts["running"] += 1
+    try:
+        return func(*args, **kwargs)
+    finally:
+        with _stats_lock:
+            _counts["running"] -= 1
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Runs `func` in the blocking pool and waits for it without blocking the event loop
+    """
+    with _stats_lock:
+        _counts["submitted"] += 1
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(_tracked, func, *args, **kwargs))
+
+
+def stats() -> dict[str, int]:
+    with _stats_lock:
+        return {
+            "threads": settings.BLOCKING_POOL_THREADS,
+            "running": _counts["running"],
+            "queued": _executor._work_queue.qsize(),  # pylint: disable=protected-access
+            "submitted": _counts["submitted"],
+        }
+
+
+def shutdown() -> None:
+    _executor.shutdown(wait=True, cancel_futures=True)
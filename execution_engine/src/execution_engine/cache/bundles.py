@@ -0,0 +1,63 @@
+"""
+Index of the framework bundles (framework and wrapper files of a problem and language) the engine
+has cached as a framework layer, with the version (ETag) the DB handler served them under.
+A cached bundle is revalidated with a conditional request, unless it was validated less than
+FRAMEWORK_BUNDLE_MAX_AGE_SEC ago.
+"""
+
+import dataclasses
+import threading
+import time
+
+from execution_engine.config import settings
+
+
+@dataclasses.dataclass
+class Bundle:
+    etag: str
+    layer: str
+    validated_at: float  # Monotonic
+
+
+class BundleIndex:
+    """
+    Thread-safe
+    """
+
+    def __init__(self, max_age_sec: float):
+        self._max_age_sec = max_age_sec
+        self._lock = threading.Lock()
+        self._bundles: dict[tuple[int, str], Bundle] = {}
+
+    def get(self, problem_id: int, language: str) -> Bundle | None:
+        with self._lock:
+            return self._bundles.get((problem_id, language))
+
+    def is_fresh(self, bundle: Bundle) -> bool:
+        """
+        Whether the bundle can be used without asking the DB handler
+        """
+        return time.monotonic() - bundle.validated_at < self._max_age_sec
+
+    def put(self, problem_id: int, language: str, etag: str | None, layer: str) -> None:
+        """
+        Records the layer a bundle was extracted to. Without an ETag it can't be revalidated
+        """
+        with self._lock:
+            if etag is None:
+                self._bundles.pop((problem_id, language), None)
+                return
+            self._bundles[(problem_id, language)] = Bundle(etag, layer, time.monotonic())
+
+    def revalidated(self, problem_id: int, language: str) -> None:
+        with self._lock:
+            bundle = self._bundles.get((problem_id, language))
+            if bundle is not None:
+                bundle.validated_at = time.monotonic()
+
+    def discard(self, problem_id: int, language: str) -> None:
+        with self._lock:
+            self._bundles.pop((problem_id, language), None)
+
+
+bundle_index = BundleIndex(max_age_sec=settings.FRAMEWORK_BUNDLE_MAX_AGE_SEC)
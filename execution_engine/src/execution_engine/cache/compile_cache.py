@@ -0,0 +1,152 @@
+"""
+Content-addressed cache of build artifacts.
+The key is a hash of the language, the toolchain (runner image) and every file in the job
+directory except the test data, which covers the framework, wrapper, Makefile flags and the
+submission itself. Identical submissions are therefore compiled only once.
+
+The cache directory is on the runtimes volume, which is writable from inside the containers. To
+make sure a job can't tamper with a cached artifact, the digest of every artifact is kept in
+memory and checked on every hit. Since that index does not survive a restart, the directory is
+cleared on first use.
+"""
+
+import collections
+import os
+import shutil
+import stat
+import threading
+
+from loguru import logger
+
+from common.languages import LanguageInfo
+from execution_engine.cache.hashing import file_digest, hash_job_dir
+from execution_engine.config import settings
+
+# Files that don't influence the build
+_DATA_FILES = {settings.INPUTS_FILE_NAME, settings.EXPECTED_STDOUT_FILE_NAME}
+
+
+class CompileCache:
+    """
+    Thread-safe, LRU evicted once the artifacts take up more than `max_bytes`
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> (artifact digest, size in bytes), least recently used first
+        self._index: collections.OrderedDict[str, tuple[str, int]] = collections.OrderedDict()
+        self._size = 0
+        self._initialised = False
+
+    def _init_directory(self) -> None:
+        if not self._initialised:
+            shutil.rmtree(self._directory, ignore_errors=True)
+            os.makedirs(self._directory)
+            self._initialised = True
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._directory, key)
+
+    @staticmethod
+    def key(tmp_dir: str, language: LanguageInfo, toolchain: str, lower: str | None = None) -> str:
+        """
+        Hashes everything that determines the build output
+        """
+        return hash_job_dir(
+            tmp_dir, prefix=(language.name, toolchain), exclude=_DATA_FILES, lower=lower
+        )
+
+    def restore(self, key: str, artifact_name: str, tmp_dir: str) -> bool:
+        """
+        Copies the cached artifact into the job directory as `artifact_name` and drops the marker
+        that makes the run script skip compilation
+        :returns: whether the artifact was in the cache
+        """
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return False
+            self._index.move_to_end(key)
+
+        digest, _ = entry
+        artifact = os.path.join(tmp_dir, artifact_name)
+        try:
+            shutil.copyfile(self._path(key), artifact)
+            if file_digest(artifact) != digest:
+                logger.warning(f"Compile cache : Entry {key} was modified, discarding it")
+                os.remove(artifact)
+                self._discard(key)
+                return False
+            os.chmod(artifact, stat.S_IRWXU | stat.S_IRGRP | stat.S_IXGRP)
+        except OSError as e:
+            logger.warning(f"Compile cache : Could not restore entry {key}: {e}")
+            self._discard(key)
+            return False
+
+        with open(os.path.join(tmp_dir, settings.COMPILE_CACHED_MARKER_FILE_NAME), "w"):
+            pass
+        return True
+
+    def store(self, key: str, artifact_name: str, tmp_dir: str) -> None:
+        """
+        Adds the artifact `artifact_name` in the job directory to the cache, if the build produced
+        one
+        """
+        artifact = os.path.join(tmp_dir, artifact_name)
+        if not os.path.isfile(artifact):
+            return
+
+        with self._lock:
+            if key in self._index:
+                return
+
+        try:
+            with self._lock:
+                self._init_directory()
+
+            # Copy under a temporary name first, so a half-written file never has a valid key
+            tmp_path = f"{self._path(key)}.tmp"
+            shutil.copyfile(artifact, tmp_path)
+            digest = file_digest(tmp_path)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logger.warning(f"Compile cache : Could not store entry {key}: {e}")
+            return
+
+        with self._lock:
+            self._index[key] = (digest, size)
+            self._size += size
+            evicted = self._evict()
+
+        for evicted_key in evicted:
+            self._remove_file(evicted_key)
+
+    def _evict(self) -> list[str]:
+        """
+        Drops least recently used entries until the cache fits. Requires the lock
+        """
+        evicted = []
+        while self._size > self._max_bytes and self._index:
+            evicted_key, (_, size) = self._index.popitem(last=False)
+            self._size -= size
+            evicted.append(evicted_key)
+        return evicted
+
+    def _discard(self, key: str) -> None:
+        with self._lock:
+            entry = self._index.pop(key, None)
+            if entry is not None:
+                self._size -= entry[1]
+        self._remove_file(key)
+
+    def _remove_file(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+compile_cache = CompileCache(settings.COMPILE_CACHE_DIR, settings.COMPILE_CACHE_MAX_MB * 1024**2)
@@ -0,0 +1,322 @@
+"""
+Shared, read-only copies of the framework files.
+The framework tarball is extracted once per distinct set of files into a layer directory. With
+tmpfs work directories, every job with the same framework copies the layer into its tmpfs work
+area, and the job directory on disk only holds the submission and the result files. Otherwise the
+layer is copied into the job directory, which is cheaper than extracting it again.
+
+With FRAMEWORK_TRANSFER_MODE "shared", a layer is filled from the DB handler's storage volume,
+mounted read-only, using the manifest of the framework files instead of a tarball. Both ways give a
+layer the same digest, the hash of the file names and contents.
+
+Layers are on their own volume, and containers only get them mounted read-only. On top of that,
+the size and change time of every file in a layer are recorded when it is extracted, and checked
+before the layer is handed out; the change time can't be set from user space, so a layer that was
+modified anyway is detected and extracted again. Since that record does not survive a restart,
+the directory is cleared on first use. Before a job is graded against the test data of a layer,
+the layer is checked again along with the hashes of the test data files.
+"""
+
+import collections
+import hashlib
+import os
+import shutil
+import stat
+import tarfile
+import tempfile
+import threading
+from typing import Callable
+
+from loguru import logger
+
+from common.schemas import FrameworkFile
+from execution_engine.config import settings
+
+# Relative path -> (size, change time in ns)
+_Snapshot = dict[str, tuple[int, int]]
+
+
+def _snapshot(directory: str) -> _Snapshot:
+    snapshot: _Snapshot = {}
+    for root, dirs, files in os.walk(directory):
+        for name in dirs + files:
+            path = os.path.join(root, name)
+            st = os.lstat(path)
+            snapshot[os.path.relpath(path, directory)] = (st.st_size, st.st_ctime_ns)
+    return snapshot
+
+
+def _file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(65536):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _file_digests(directory: str) -> dict[str, str]:
+    """
+    :returns: relative path -> SHA-256 of every file in the directory
+    """
+    digests: dict[str, str] = {}
+    for root, _, files in os.walk(directory):
+        for filename in files:
+            path = os.path.join(root, filename)
+            digests[os.path.relpath(path, directory)] = _file_digest(path)
+    return digests
+
+
+def _digest(file_digests: dict[str, str]) -> str:
+    """
+    :param file_digests: file name -> SHA-256 of the file
+    """
+    h = hashlib.sha256()
+    for name in sorted(file_digests):
+        h.update(f"{name}\0{file_digests[name]}\0".encode())
+    return h.hexdigest()
+
+
+def _content_digest(tarball: str) -> str:
+    """
+    Hashes the files in the tarball rather than the tarball itself, since every download of the
+    same framework has its own timestamps
+    """
+    digests: dict[str, str] = {}
+    with tarfile.open(tarball) as tar:
+        for member in tar:
+            extracted = tar.extractfile(member) if member.isfile() else None
+            if extracted is None:
+                continue
+            h = hashlib.sha256()
+            while chunk := extracted.read(65536):
+                h.update(chunk)
+            digests[member.name] = h.hexdigest()
+    return _digest(digests)
+
+
+def _make_scripts_executable(directory: str) -> None:
+    for root, _, files in os.walk(directory):
+        for filename in files:
+            if filename.endswith(".sh"):
+                path = os.path.join(root, filename)
+                mode = os.stat(path).st_mode
+                os.chmod(path, mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+
+def _copy_file(src: str, dst: str) -> None:
+    """
+    Copies in the kernel, which shares the data blocks on copy-on-write filesystems
+    """
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        remaining = os.fstat(fsrc.fileno()).st_size
+        try:
+            while remaining > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        except OSError:
+            # Not supported between these filesystems, copy what is left in user space
+            shutil.copyfileobj(fsrc, fdst)
+    shutil.copymode(src, dst)
+
+
+def _inside(base: str, relative: str) -> str:
+    """
+    :raises ValueError: if the relative path leaves the base directory
+    """
+    normalised = os.path.normpath(relative)
+    if os.path.isabs(normalised) or normalised.split(os.sep)[0] == os.pardir:
+        raise ValueError(f"Path {relative} is outside of {base}")
+    return os.path.join(base, normalised)
+
+
+def _extract_tarball(tarball: str, staging: str) -> None:
+    with tarfile.open(tarball) as tar:
+        tar.extractall(staging, filter="data")
+
+
+def _copy_stored_files(files: list[FrameworkFile], storage: str, staging: str) -> None:
+    """
+    Copies the files of a manifest from the storage volume, checking them against their hash. The
+    DB handler can update a file after it made the manifest, and the layer must match its digest
+    """
+    for file in files:
+        dst = _inside(staging, file.name)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        _copy_file(_inside(storage, file.path), dst)
+
+        with open(dst, "rb") as f:
+            if (
+                os.fstat(f.fileno()).st_size != file.size
+                or hashlib.file_digest(f, "sha256").hexdigest() != file.sha256
+            ):
+                raise ValueError(f"Stored file {file.path} does not match the manifest")
+
+
+def copy_layer(layer: str, dst: str) -> None:
+    """
+    Copies the files of a layer into a job directory. Hardlinks would be cheaper, but a job could
+    then write to the shared files, and linking alone already changes the change times the layer
+    is checked with
+    """
+    for root, _, files in os.walk(layer):
+        target = os.path.join(dst, os.path.relpath(root, layer))
+        os.makedirs(target, exist_ok=True)
+        for filename in files:
+            _copy_file(os.path.join(root, filename), os.path.join(target, filename))
+
+
+class FrameworkLayers:
+    """
+    Thread-safe. Layers in use are never evicted; of the unused layers, the least recently used
+    are removed once there are more than `max_layers`
+    """
+
+    def __init__(self, directory: str, max_layers: int):
+        self._directory = directory
+        self._max_layers = max_layers
+        self._lock = threading.Lock()
+        # digest -> snapshot of the layer, least recently used first
+        self._index: collections.OrderedDict[str, _Snapshot] = collections.OrderedDict()
+        # digest -> hashes of the files of the layer
+        self._file_digests: dict[str, dict[str, str]] = {}
+        self._in_use: collections.Counter[str] = collections.Counter()
+        self._initialised = False
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self._directory, digest)
+
+    def _install(self, digest: str, fill: Callable[[str], None]) -> None:
+        """
+        Fills a directory next to the layer first, so a half-filled layer is never handed out.
+        Requires the lock
+        """
+        if not self._initialised:
+            shutil.rmtree(self._directory, ignore_errors=True)
+            os.makedirs(self._directory, exist_ok=True)  # Might be the mountpoint of the volume
+            self._initialised = True
+
+        staging = tempfile.mkdtemp(dir=self._directory, prefix=".extract_")
+        try:
+            fill(staging)
+            _make_scripts_executable(staging)
+            shutil.rmtree(self._path(digest), ignore_errors=True)
+            os.rename(staging, self._path(digest))
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        self._index[digest] = _snapshot(self._path(digest))
+        self._file_digests[digest] = _file_digests(self._path(digest))
+
+    def _intact(self, digest: str) -> bool:
+        """
+        Requires the lock
+        """
+        try:
+            return _snapshot(self._path(digest)) == self._index[digest]
+        except OSError:
+            return False
+
+    def _acquire(self, digest: str, fill: Callable[[str], None]) -> str:
+        with self._lock:
+            if digest not in self._index:
+                self._install(digest, fill)
+            elif not self._intact(digest):
+                logger.warning(f"Framework layers : Layer {digest} was modified, replacing it")
+                self._install(digest, fill)
+
+            self._index.move_to_end(digest)
+            self._in_use[digest] += 1
+            evicted = self._evict()
+
+        for evicted_digest in evicted:
+            shutil.rmtree(self._path(evicted_digest), ignore_errors=True)
+
+        return self._path(digest)
+
+    def acquire(self, tarball: str) -> str:
+        """
+        Returns the layer holding the files of the framework tarball, extracting them if there is
+        no layer with the same files yet. The tarball is removed. Every acquired layer must be
+        released
+        :raises tarfile.TarError: if the tarball can't be extracted
+        :raises OSError: if the layer could not be written
+        """
+        try:
+            digest = _content_digest(tarball)
+            return self._acquire(digest, lambda staging: _extract_tarball(tarball, staging))
+        finally:
+            os.remove(tarball)
+
+    def acquire_files(self, files: list[FrameworkFile], storage: str) -> str:
+        """
+        Returns the layer holding the files of a manifest, copying them from the storage volume if
+        there is no layer with the same files yet. Every acquired layer must be released
+        :param storage: where the DB handler's storage volume is mounted
+        :raises ValueError: if a file does not match the manifest, or is outside of the storage
+        :raises OSError: if a file could not be read or the layer could not be written
+        """
+        digest = _digest({file.name: file.sha256 for file in files})
+        return self._acquire(digest, lambda staging: _copy_stored_files(files, storage, staging))
+
+    def acquire_existing(self, layer: str) -> bool:
+        """
+        Acquires a layer that was handed out before, if it still exists and was not modified
+        :returns: whether the layer was acquired, if not it has to be acquired from its tarball
+        """
+        digest = os.path.basename(layer)
+        with self._lock:
+            if digest not in self._index:
+                return False
+            if not self._intact(digest):
+                logger.warning(f"Framework layers : Layer {digest} was modified, discarding it")
+                del self._index[digest]
+                del self._file_digests[digest]
+                return False
+
+            self._index.move_to_end(digest)
+            self._in_use[digest] += 1
+            return True
+
+    def verify(self, layer: str, names: list[str]) -> bool:
+        """
+        Checks that an acquired layer was not modified, and that the named files still have the
+        content they were extracted with; to be called before they are trusted, e.g. for grading
+        """
+        digest = os.path.basename(layer)
+        with self._lock:
+            if digest not in self._index or not self._intact(digest):
+                return False
+            recorded = self._file_digests[digest]
+
+        try:
+            return all(
+                _file_digest(os.path.join(layer, name)) == recorded.get(name) for name in names
+            )
+        except OSError:
+            return False
+
+    def release(self, layer: str) -> None:
+        digest = os.path.basename(layer)
+        with self._lock:
+            self._in_use[digest] -= 1
+            if self._in_use[digest] <= 0:
+                del self._in_use[digest]
+
+    def _evict(self) -> list[str]:
+        """
+        Requires the lock
+        """
+        unused = [digest for digest in self._index if digest not in self._in_use]
+        evicted = unused[: max(0, len(self._index) - self._max_layers)]
+        for digest in evicted:
+            del self._index[digest]
+            del self._file_digests[digest]
+        return evicted
+
+
+framework_layers = FrameworkLayers(
+    settings.FRAMEWORK_LAYERS_DIR, max_layers=settings.FRAMEWORK_LAYERS_MAX
+)
@@ -0,0 +1,44 @@
+import hashlib
+import os
+from typing import Iterable
+
+
+def file_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def _files(directory: str) -> dict[str, str]:
+    """
+    Maps the relative path of every file in `directory` to its full path
+    """
+    files: dict[str, str] = {}
+    for root, _, filenames in os.walk(directory):
+        for filename in filenames:
+            path = os.path.join(root, filename)
+            files[os.path.relpath(path, directory)] = path
+    return files
+
+
+def hash_job_dir(
+    tmp_dir: str, prefix: Iterable[str], exclude: Iterable[str] = (), lower: str | None = None
+) -> str:
+    """
+    Hashes the `prefix` strings and the name and content of every file in the job directory,
+    except the relative paths in `exclude`. If the framework files are in a separate `lower`
+    directory, the job directory is hashed as if it were laid over it
+    """
+    excluded = set(exclude)
+    h = hashlib.sha256()
+    for part in prefix:
+        h.update(f"{part}\0".encode())
+
+    files = _files(lower) if lower is not None else {}
+    files.update(_files(tmp_dir))
+
+    for rel_path in sorted(files):
+        if rel_path in excluded:
+            continue
+        h.update(f"{rel_path}\0{file_digest(files[rel_path])}\0".encode())
+
+    return h.hexdigest()
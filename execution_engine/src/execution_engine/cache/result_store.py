@@ -0,0 +1,101 @@
+"""
+Memoization of measured results.
+A result is stored under a hash of everything that determines it: the language, the toolchain,
+the measurement settings and every file of the job, including the framework, wrapper, test data
+and submission. When a problem's wrappers or test data change, the key changes with them, so
+results of an old version of a problem are never reused.
+
+The store lives outside the runtimes volume, since containers can write to that volume.
+"""
+
+import sqlite3
+import time
+
+from loguru import logger
+
+from common.languages import LanguageInfo
+from common.schemas import SubmissionResult
+from execution_engine.cache.hashing import hash_job_dir
+from execution_engine.config import settings
+from execution_engine.sqlite_store import SqliteStore
+
+
+def _measurement_settings() -> tuple[str, ...]:
+    """
+    Settings that change the measured values, results measured under other settings are not
+    reused
+    """
+    return (
+        settings.MEASUREMENT_MODE,
+        str(settings.CPU_TDP_WATTS),
+        str(settings.CPU_PHYSICAL_CORES),
+        str(settings.CARBON_INTENSITY_KG_PER_KWH),
+    )
+
+
+class ResultStore(SqliteStore):
+    """
+    SQLite store of successful results
+    """
+
+    def _create_tables(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, result TEXT NOT NULL, stored_at REAL NOT NULL)"
+        )
+
+    @staticmethod
+    def key(tmp_dir: str, language: LanguageInfo, toolchain: str, lower: str | None = None) -> str:
+        return hash_job_dir(
+            tmp_dir, prefix=(language.name, toolchain, *_measurement_settings()), lower=lower
+        )
+
+    def get(self, key: str) -> SubmissionResult | None:
+        with self._lock:
+            row = (
+                self._connection()
+                .execute("SELECT result FROM results WHERE key = ?", (key,))
+                .fetchone()
+            )
+
+        if row is None:
+            return None
+        return SubmissionResult.model_validate_json(row[0])
+
+    def put(self, key: str, result: SubmissionResult) -> None:
+        """
+        Stores a successful result, failed results are always re-executed
+        """
+        if not result.successful:
+            return
+
+        stored = result.model_copy(update={"phase_timings": {}})
+        with self._lock, self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, result, stored_at) VALUES (?, ?, ?)",
+                (key, stored.model_dump_json(), time.time()),
+            )
+
+    def discard(self, key: str) -> None:
+        with self._lock, self._connection() as conn:
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+
+
+def confirms(stored: SubmissionResult, sampled: SubmissionResult) -> bool:
+    """
+    Whether a quick re-measurement agrees with the stored result
+    """
+    if not sampled.successful:
+        return False
+
+    difference = abs(sampled.runtime_ms - stored.runtime_ms)
+    agrees = difference <= settings.RESULT_MEMOIZATION_TOLERANCE * stored.runtime_ms
+    if not agrees:
+        logger.warning(
+            f"Re-measured runtime {sampled.runtime_ms:.3f}ms does not confirm stored runtime "
+            f"{stored.runtime_ms:.3f}ms"
+        )
+    return agrees
+
+
+result_store = ResultStore(settings.RESULT_STORE_PATH)
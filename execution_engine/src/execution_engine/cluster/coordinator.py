@@ -0,0 +1,125 @@
+"""
+Coordinator mode: instead of executing jobs, the engine forwards them from its job queue to the
+least-loaded worker engine. Workers are regular (standalone) engines that advertise their free
+CPU slots on `/api/capacity`. Jobs wait in the coordinator's queue while every worker is busy, and
+move on to another worker if the chosen one fails.
+
+Delivery is at-least-once: if a worker stored a job but its response was lost, the job can also
+be sent to a second worker.
+"""
+
+import asyncio
+import dataclasses
+import time
+from typing import Any
+
+import httpx
+from loguru import logger
+
+from common.schemas import SubmissionCreate
+from execution_engine.cluster.nodes import Node, choose_node
+from execution_engine.config import settings
+
+
+class Coordinator:
+    def __init__(
+        self,
+        worker_urls: list[str],
+        poll_interval_sec: float,
+        request_timeout_sec: float,
+        node_backoff_sec: float,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self._nodes = [Node(url=url.rstrip("/")) for url in worker_urls]
+        self._poll_interval_sec = poll_interval_sec
+        self._node_backoff_sec = node_backoff_sec
+        self._client = httpx.AsyncClient(timeout=request_timeout_sec, transport=transport)
+        self._refreshed = asyncio.Event()
+
+    def _mark_down(self, node: Node, error: str) -> None:
+        if node.reachable:
+            logger.warning(f"Worker {node.url} failed, skipping it for a while: {error}")
+        node.mark_down(error, time.monotonic(), self._node_backoff_sec)
+
+    async def _poll(self, node: Node) -> None:
+        try:
+            response = await self._client.get(f"{node.url}/api/capacity")
+            response.raise_for_status()
+            node.update(response.json())
+        except (httpx.HTTPError, ValueError, KeyError) as e:
+            self._mark_down(node, f"capacity: {e!r}")
+
+    async def refresh(self) -> None:
+        """
+        Asks every worker for its capacity, and wakes up jobs waiting for a free slot
+        """
+        await asyncio.gather(*(self._poll(node) for node in self._nodes))
+        self._refreshed.set()
+
+    async def run(self) -> None:
+        """
+        Keeps the capacity of the workers up to date, meant to be started as a task
+        """
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self._poll_interval_sec)
+
+    async def _send(self, node: Node, request: SubmissionCreate) -> bool:
+        """
+        :returns: whether the worker accepted the job
+        :raises httpx.HTTPStatusError: if the worker refused the job itself
+        """
+        try:
+            response = await self._client.post(
+                f"{node.url}/api/execute",
+                content=request.model_dump_json(),
+                headers={"Content-Type": "application/json"},
+            )
+        except httpx.HTTPError as e:
+            self._mark_down(node, f"execute: {e!r}")
+            return False
+
+        if response.status_code == httpx.codes.TOO_MANY_REQUESTS:
+            node.mark_full()  # Healthy, but its queue is full
+            return False
+
+        if response.is_server_error:
+            self._mark_down(node, f"execute: {response.status_code}")
+            return False
+
+        # Any other error is about the request, another worker would refuse it as well
+        response.raise_for_status()
+        return True
+
+    async def forward(self, request: SubmissionCreate) -> None:
+        """
+        Hands the job to the least-loaded worker. Waits for a capacity update while every worker
+        is busy or down
+        :raises httpx.HTTPStatusError: if a worker refused the job itself
+        """
+        while True:
+            node = choose_node(self._nodes, time.monotonic())
+            if node is None:
+                self._refreshed.clear()
+                await self._refreshed.wait()
+                continue
+
+            node.reserve()
+            if await self._send(node, request):
+                node.forwarded += 1
+                logger.info(f"Forwarded submission {request.submission_uuid} to {node.url}")
+                return
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        return [dataclasses.asdict(node) for node in self._nodes]
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+coordinator = Coordinator(
+    [url.strip() for url in settings.CLUSTER_WORKER_URLS.split(",") if url.strip()],
+    poll_interval_sec=settings.CLUSTER_POLL_INTERVAL_SEC,
+    request_timeout_sec=settings.CLUSTER_REQUEST_TIMEOUT_SEC,
+    node_backoff_sec=settings.CLUSTER_NODE_BACKOFF_SEC,
+)
@@ -0,0 +1,68 @@
+"""
+Coordinator's view of the worker engines: how many free CPU slots each one advertised, and
+whether it recently failed.
+"""
+
+import dataclasses
+import math
+from typing import Any
+
+
+@dataclasses.dataclass
+class Node:  # pylint: disable=too-many-instance-attributes
+    url: str
+    worker_cpus: int = 0
+    free_slots: int = 0  # CPUs that would start a job right away
+    pending: int = 0
+    running: int = 0
+    reachable: bool = False
+    down_until: float = 0.0  # Monotonic time before which no jobs are sent to this node
+    last_error: str | None = None
+    forwarded: int = 0
+
+    @property
+    def load(self) -> float:
+        """
+        Jobs on the node per CPU
+        """
+        if self.worker_cpus <= 0:
+            return math.inf
+        return (self.pending + self.running) / self.worker_cpus
+
+    def available(self, now: float) -> bool:
+        return self.reachable and now >= self.down_until and self.free_slots > 0
+
+    def update(self, capacity: dict[str, Any]) -> None:
+        """
+        Takes over the capacity a worker reported on `/api/capacity`
+        """
+        self.worker_cpus = int(capacity["worker_cpus"])
+        self.free_slots = int(capacity["free_slots"])
+        self.pending = int(capacity["pending"])
+        self.running = int(capacity["running"])
+        self.reachable = True
+
+    def reserve(self) -> None:
+        """
+        Counts a job that is being sent to the node, so concurrent jobs don't all pick the same
+        node before its next capacity report
+        """
+        self.free_slots -= 1
+        self.pending += 1
+
+    def mark_down(self, error: str, now: float, backoff_sec: float) -> None:
+        self.reachable = False
+        self.free_slots = 0
+        self.down_until = now + backoff_sec
+        self.last_error = error
+
+    def mark_full(self) -> None:
+        self.free_slots = 0
+
+
+def choose_node(nodes: list[Node], now: float) -> Node | None:
+    """
+    The least-loaded node with a free slot, or None if every node is busy or down
+    """
+    candidates = [node for node in nodes if node.available(now)]
+    return min(candidates, key=lambda node: (node.load, -node.free_slots), default=None)
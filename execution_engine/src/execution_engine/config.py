@@ -35,10 +35,53 @@ class Settings(BaseSettings):
         EXECUTION_ENVIRONMENT_APP_DIR, EXECUTION_ENVIRONMENT_SCRIPT_NAME
     )
     DOCKERFILES_BASE_PATH: str = os.path.join(EXECUTION_ENVIRONMENT_APP_DIR, "dockerfiles")
+    # Build all runner images on startup instead of on the first submission per language
+    PREBUILD_IMAGES_ON_STARTUP: bool = True
     EXECUTION_ENVIRONMENT_TMP_DIR_PREFIX: str = "execution_run_"
 
     TMP_DIR_PATH_BASE: str = "/runtimes"
 
+    # Content-addressed cache of build artifacts, so identical submissions are compiled once
+    COMPILE_CACHE_ENABLED: bool = True
+    COMPILE_CACHE_DIR: str = os.path.join(TMP_DIR_PATH_BASE, "compile_cache")
+    COMPILE_CACHE_MAX_MB: int = 256
+    # Dropped in the working directory on a cache hit, tells run.sh to skip compilation
+    COMPILE_CACHED_MARKER_FILE_NAME: str = "compile_cached"
+
+    # Framework and wrapper files are extracted once per problem and language, and revalidated with
+    # the DB handler by ETag. Within this many seconds of the last check, the DB isn't asked at all
+    FRAMEWORK_BUNDLE_MAX_AGE_SEC: float = 0.0
+    # The layers are on their own volume, mounted at FRAMEWORK_LAYERS_VOLUME_PATH, and not on the
+    # runtimes volume with the job directories. A container only gets the layer of its job mounted,
+    # read-only
+    FRAMEWORK_LAYERS_VOLUME_PATH: str = "/frameworks"
+    FRAMEWORK_LAYERS_DIR: str = FRAMEWORK_LAYERS_VOLUME_PATH
+    FRAMEWORK_LAYERS_MAX: int = 64
+    # How the framework files get from the DB handler to the engine
+    # "archive": download the framework archive over HTTP
+    # "shared": ask the DB handler for the paths and hashes of the files only, and copy them from
+    #           its storage volume, mounted read-only at FRAMEWORK_SHARED_STORAGE_PATH
+    FRAMEWORK_TRANSFER_MODE: str = "archive"
+    FRAMEWORK_SHARED_STORAGE_PATH: str = "/storage"
+
+    # Run jobs in a RAM-backed tmpfs inside the container instead of in their directory on the
+    # runtimes volume. The tmpfs is filled from the shared copy of the framework files, only the
+    # result files are copied back. The tmpfs counts towards MEM_LIMIT_MB
+    TMPFS_WORK_DIRS: bool = False
+    TMPFS_WORK_DIR_SIZE_MB: int = 64
+
+    # Memoization of successful results of identical jobs
+    # "off": always execute
+    # "reuse": return the stored result without executing
+    # "sample": take RESULT_MEMOIZATION_SAMPLES samples only, and return the stored result if
+    #           the runtime is within RESULT_MEMOIZATION_TOLERANCE of it, otherwise measure again
+    #           in full and store that
+    RESULT_MEMOIZATION_MODE: str = "off"
+    RESULT_MEMOIZATION_SAMPLES: int = 3
+    RESULT_MEMOIZATION_TOLERANCE: float = 0.1
+    # Must not be on the runtimes volume, since containers can write there
+    RESULT_STORE_PATH: str = "/engine_data/results.sqlite3"
+
     INPUTS_FILE_NAME: str = "input.txt"
     COMPILE_STDOUT_FILE_NAME: str = "compile_stdout.txt"
     COMPILE_STDERR_FILE_NAME: str = "compile_stderr.txt"
@@ -46,11 +89,143 @@ class Settings(BaseSettings):
     RUN_STDOUT_FILE_NAME: str = "run_stdout.txt"
     RUN_STDERR_FILE_NAME: str = "run_stderr.txt"
     FAILED_FILE_NAME: str = "failed.txt"
-    EMISSIONS_OUTPUT_FILE_NAME: str = "emissions.csv"
+    CGROUP_OUTPUT_FILE_NAME: str = "cgroup.txt"
+    TIME_OUTPUT_FILE_NAME: str = "time.txt"
+    BENCHMARK_OUTPUT_FILE_NAME: str = "benchmark.txt"
+    PHASES_FILE_NAME: str = "phases.txt"
+    TEST_CASES_FILE_NAME: str = "cases.txt"
+
+    # Grading of the program output against the expected output, line by line
+    # "exact": lines must be equal apart from leading and trailing whitespace
+    # "whitespace": lines must have the same words, however they are separated
+    # "float": like "whitespace", but numbers may differ by GRADER_FLOAT_TOLERANCE (relative or
+    #          absolute)
+    GRADER_COMPARISON_MODE: str = "exact"
+    GRADER_FLOAT_TOLERANCE: float = 1e-6
+    # Grading stops at this many failed tests, only those are reported back
+    GRADER_MAX_REPORTED_FAILURES: int = 10
+
+    # The correctness run executes and times every test case on its own. With fail fast, the
+    # framework compares the output of every test case as it runs, and stops at the first wrong
+    # answer before the measurement; only in the "exact" comparison mode, others are graded after
+    TEST_CASE_FAIL_FAST: bool = True
+    # CPU time limit per test case, 0 for none. A problem can give single test cases (e.g. hidden
+    # large ones) their own limit in a limits.txt next to its input.txt, one limit per line
+    TEST_CASE_TIME_LIMIT_MS: int = 5000
+
+    # Measurement
+    # "adaptive": the framework samples the program in a single process until the 95% confidence
+    #             interval of the user CPU time per run is within ADAPTIVE_TARGET_RELATIVE_ERROR of
+    #             the mean, or until ADAPTIVE_TIME_BUDGET_SEC runs out
+    # "benchmark": the framework runs the input BENCHMARK_ITERATIONS times in a single process and
+    #              reports user CPU time per iteration
+    # "cgroup": the framework runs the input BENCHMARK_ITERATIONS times in a single process, and
+    #           the CPU time of the whole container is taken from its cgroup v2 cpu.stat before and
+    #           after; includes the kernel's work on its behalf, and any processes it starts. No
+    #           peak memory, since the cgroup's also covers the build and earlier jobs
+    # "time": the framework runs the input BENCHMARK_ITERATIONS times in a single process under
+    #         GNU `/usr/bin/time -v`, which also reports its peak memory (max RSS)
+    MEASUREMENT_MODE: str = "adaptive"
+    BENCHMARK_ITERATIONS: int = 1000
+    ADAPTIVE_TARGET_RELATIVE_ERROR: float = 0.02
+    ADAPTIVE_TIME_BUDGET_SEC: float = 10.0  # Keep well below TIME_LIMIT_SEC
+    ADAPTIVE_MIN_SAMPLES: int = 10
+    ADAPTIVE_MAX_SAMPLES: int = 1000
+    # Runs are batched until a single sample takes at least this much CPU time
+    ADAPTIVE_MIN_BATCH_MS: int = 10
+
+    # Energy estimate: (CPU TDP / physical cores) * CPU time, see analysis/energy_considerations.md
+    # Defaults match the Xeon E5-2630 v3 of the DAS-5 nodes
+    CPU_TDP_WATTS: float = 85.0
+    CPU_PHYSICAL_CORES: int = 8
+    # Approximate carbon intensity of the Dutch grid
+    CARBON_INTENSITY_KG_PER_KWH: float = 0.33
+
+    # CPU layout: one job per physical core on the CPUs of our cgroup cpuset, except the cores in
+    # RESERVED_CPUS (kernel CPU list format, e.g. "0-1") which are left for the platform services,
+    # unless that leaves no cores
+    CPU_TOPOLOGY_AWARE: bool = True
+    RESERVED_CPUS: str = "0"
+    SMT_SIBLINGS_IDLE: bool = True
+    # Overrides the cgroup cpuset, so several engines on one machine can each get their own CPUs
+    WORKER_CPUS: str = ""
+
+    # Multi-node execution
+    # "standalone": execute jobs on this host, this is also what worker engines run as
+    # "coordinator": forward jobs to the least-loaded engine in CLUSTER_WORKER_URLS (comma
+    #                separated, e.g. "http://node1:8080,http://node2:8080")
+    ENGINE_ROLE: str = "standalone"
+    CLUSTER_WORKER_URLS: str = ""
+    CLUSTER_POLL_INTERVAL_SEC: float = 1.0
+    CLUSTER_REQUEST_TIMEOUT_SEC: float = 5.0
+    # A worker that failed is skipped for this long before jobs are sent to it again
+    CLUSTER_NODE_BACKOFF_SEC: float = 10.0
+
+    # Calibration: a native reference kernel (measurement/kernel.c, built into the image at
+    # CALIBRATION_KERNEL_PATH) is timed on every idle worker CPU on startup and every
+    # CALIBRATION_INTERVAL_SEC. Cores with a coefficient of variation above CALIBRATION_MAX_NOISE
+    # don't get jobs until they are quiet again. With CALIBRATION_NORMALIZE, measurements are also
+    # divided by the speed of their core relative to the reference, if it differs by more than the
+    # noise of the kernel. The reference is the median quiet core of the first calibration with
+    # every worker CPU, and is kept for CALIBRATION_EPOCH_SEC, so recalibrations don't move it
+    CALIBRATION_ENABLED: bool = True
+    CALIBRATION_KERNEL_PATH: str = "/usr/local/bin/calibration_kernel"
+    CALIBRATION_INTERVAL_SEC: float = 600.0
+    CALIBRATION_EPOCH_SEC: float = 86400.0
+    CALIBRATION_SAMPLES: int = 10
+    CALIBRATION_SAMPLE_ITERATIONS: int = 20_000_000  # Some tens of ms per sample
+    CALIBRATION_TIMEOUT_SEC: float = 30.0
+    CALIBRATION_MAX_NOISE: float = 0.05
+    CALIBRATION_NORMALIZE: bool = True
+
+    # Which waiting job gets the next free CPU: "fifo", "fair" (round robin over users) or "sjf"
+    # (shortest expected job first). Higher priority submissions always go first
+    SCHEDULER_POLICY: str = "fair"
+
+    # Durable job queue, jobs beyond JOB_QUEUE_MAX_PENDING are refused with 429
+    # Must not be on the runtimes volume, since containers can write there
+    JOB_QUEUE_PATH: str = "/engine_data/jobs.sqlite3"
+    JOB_QUEUE_MAX_PENDING: int = 1000
+    JOB_QUEUE_MAX_IN_FLIGHT: int = 2 * (os.cpu_count() or 1)
+    JOB_QUEUE_RETRY_AFTER_SEC: int = 10
+
+    # Shared HTTP client for requests to the DB handler, kept open for the lifetime of the engine.
+    # HTTP/2 multiplexes requests over fewer connections, the DB handler must then serve HTTP/2
+    HTTP_MAX_CONNECTIONS: int = 32
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 16
+    HTTP_KEEPALIVE_EXPIRY_SEC: float = 30.0
+    HTTP2_ENABLED: bool = False
+    HTTP_TIMEOUT_SEC: float = 5.0
+    # Per route; the framework download can be large
+    FRAMEWORK_REQUEST_TIMEOUT_SEC: float = 30.0
+    RESULT_WRITE_TIMEOUT_SEC: float = 10.0
+
+    # Results are written to the DB handler in batches of up to RESULT_BATCH_MAX_ITEMS, sent at the
+    # latest RESULT_BATCH_MAX_DELAY_MS after the first result of the batch. Until written, they are
+    # kept in a durable spool; if the DB handler is down, writing is retried with backoff
+    # Must not be on the runtimes volume, since containers can write there
+    RESULT_SPOOL_PATH: str = "/engine_data/result_spool.sqlite3"
+    RESULT_BATCH_MAX_ITEMS: int = 32
+    RESULT_BATCH_MAX_DELAY_MS: int = 200
+    RESULT_RETRY_INTERVAL_SEC: float = 1.0
+    RESULT_RETRY_MAX_INTERVAL_SEC: float = 60.0
+
+    # Threads for blocking file I/O and short Docker calls, keeps them off the event loop
+    BLOCKING_POOL_THREADS: int = 8
+    LOOP_LAG_SAMPLE_INTERVAL_SEC: float = 0.1
 
     TIME_LIMIT_SEC: int = 30
     MEM_LIMIT_MB: int = 512  # Which is very generous, we could lower this
 
+    # Warm container pool: keeps containers per language alive and runs jobs in them with `exec`.
+    # Their mounts can't change per job, so with TMPFS_WORK_DIRS they get all framework layers
+    # mounted (read-only) instead of only the one of the job
+    CONTAINER_POOL_ENABLED: bool = False
+    CONTAINER_POOL_SIZE: int = 4  # Per language
+    CONTAINER_POOL_RECYCLE_AFTER_JOBS: int = 50
+    CONTAINER_POOL_IDLE_TIMEOUT_SEC: int = 300
+    CONTAINER_POOL_MAINTENANCE_INTERVAL_SEC: int = 30
+
 
 settings = Settings()
 
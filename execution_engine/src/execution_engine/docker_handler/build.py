@@ -7,16 +7,21 @@ from execution_engine.config import settings
 from execution_engine.docker_handler.state import client
 
 
-def build_image(language: LanguageInfo):
-    dockerfile_path = os.path.join(settings.DOCKERFILES_BASE_PATH, language.name, "Dockerfile")
-    build_context = os.path.dirname(dockerfile_path)
+def dockerfile_path(language: LanguageInfo) -> str:
+    return os.path.join(settings.DOCKERFILES_BASE_PATH, language.name, "Dockerfile")
+
+
+def build_image(language: LanguageInfo, labels: dict[str, str] | None = None):
+    path = dockerfile_path(language)
+    build_context = os.path.dirname(path)
     image_tag = language.image
 
     logger.info(f"Building docker image {image_tag}")
     client.images.build(
         path=build_context,
-        dockerfile=dockerfile_path,
+        dockerfile=path,
         tag=image_tag,
+        labels=labels,
         rm=True,  # Remove intermediate containers (if we decide to use them)
     )
     logger.info(f"Built docker image {image_tag}")
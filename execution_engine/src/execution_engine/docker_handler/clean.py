@@ -1,7 +1,16 @@
 import shutil
 
+from execution_engine.cache.framework_layers import framework_layers
 from execution_engine.docker_handler.runconfig import RunConfig
 
 
 def clean_env(config: RunConfig):
+    if config.framework_layer is not None:
+        framework_layers.release(config.framework_layer)
+        config.framework_layer = None
+        config.framework_dir = None
+
+    if not config.tmp_dir:
+        return  # Setup failed before the directory was created
+
     shutil.rmtree(config.tmp_dir)
@@ -0,0 +1,150 @@
+"""
+Completion of containers and execs from the Docker event stream.
+A single thread follows the stream and resolves the future of every container or exec a job waits
+for when it exits, so waiting for jobs takes no thread per job. A waiter is registered before the
+container or exec is started, so its exit can't be missed. If the stream breaks, it is
+reconnected from the time of the last event, and the events in between are replayed.
+"""
+
+import asyncio
+import dataclasses
+import threading
+import time
+from typing import Any
+
+from loguru import logger
+
+_RECONNECT_DELAY_SEC = 1.0
+
+
+@dataclasses.dataclass(frozen=True)
+class ContainerExit:
+    exit_code: int
+    oom: bool  # The kernel killed a process of the container for running out of memory
+
+
+@dataclasses.dataclass
+class _Waiter:
+    loop: asyncio.AbstractEventLoop
+    future: asyncio.Future[ContainerExit]
+    container_id: str
+    oom: bool = False
+
+
+def _set_result(future: asyncio.Future[ContainerExit], result: ContainerExit) -> None:
+    if not future.done():
+        future.set_result(result)
+
+
+class ContainerEvents:  # pylint: disable=too-many-instance-attributes
+    """
+    Thread-safe
+    """
+
+    def __init__(self, client: Any):
+        """
+        :param client: Docker client
+        """
+        self._client = client
+        self._lock = threading.Lock()
+        # Container ID for containers, exec ID for execs
+        self._waiters: dict[str, _Waiter] = {}
+        self._thread: threading.Thread | None = None
+        self._stream: Any = None
+        self._stopped = threading.Event()
+        self._since = 0
+        self._reconnects = 0
+
+    def start(self) -> None:
+        """
+        Starts following the event stream, from now on
+        """
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stopped.clear()
+            self._since = int(time.time())
+            self._thread = threading.Thread(target=self._follow, name="docker-events", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        with self._lock:
+            stream, thread = self._stream, self._thread
+            self._thread = None
+        if stream is not None:
+            stream.close()  # Ends the blocking read of the thread
+        if thread is not None:
+            thread.join(timeout=5)
+
+    def expect(self, key: str, container_id: str) -> asyncio.Future[ContainerExit]:
+        """
+        Registers a waiter for a container or exec that is about to be started. Must be called
+        from the event loop, and discarded when no longer waited for
+        :param key: ID of the container, or of the exec
+        :param container_id: ID of the container, for an exec the container it runs in
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[ContainerExit] = loop.create_future()
+        with self._lock:
+            self._waiters[key] = _Waiter(loop=loop, future=future, container_id=container_id)
+        return future
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._waiters.pop(key, None)
+
+    def handle(self, event: dict[str, Any]) -> None:
+        """
+        Processes one event of the stream
+        """
+        actor = event.get("Actor") or {}
+        attributes = actor.get("Attributes") or {}
+        action = event.get("Action") or event.get("status") or ""
+        container_id = actor.get("ID") or event.get("id") or ""
+
+        with self._lock:
+            self._since = max(self._since, int(event.get("time") or 0))
+            if action == "oom":
+                for running in self._waiters.values():
+                    if running.container_id == container_id:
+                        running.oom = True
+                return
+
+            if action not in ("die", "exec_die"):
+                return
+            key = attributes.get("execID", "") if action == "exec_die" else container_id
+            waiter = self._waiters.pop(key, None)
+
+        if waiter is None:
+            return
+        result = ContainerExit(exit_code=int(attributes.get("exitCode", -1)), oom=waiter.oom)
+        waiter.loop.call_soon_threadsafe(_set_result, waiter.future, result)
+
+    def _follow(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                stream = self._client.events(
+                    decode=True,
+                    since=self._since,
+                    filters={"type": "container", "event": ["die", "oom", "exec_die"]},
+                )
+                with self._lock:
+                    self._stream = stream
+                if self._stopped.is_set():
+                    stream.close()
+                    return
+                for event in stream:
+                    self.handle(event)
+            except Exception as e:  # pylint: disable=W0718
+                if self._stopped.is_set():
+                    return
+                logger.warning(f"Docker event stream failed, reconnecting: {e!r}")
+
+            if not self._stopped.wait(_RECONNECT_DELAY_SEC):
+                self._reconnects += 1
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"waiting": len(self._waiters), "reconnects": self._reconnects}
@@ -1,18 +1,24 @@
 import os
-import re
 from typing import cast
 
 from loguru import logger
 
+from common.schemas import PhaseTiming, TestCaseResult
+from execution_engine.cache.framework_layers import framework_layers
 from execution_engine.config import settings
 from execution_engine.docker_handler.runconfig import RunConfig
 from execution_engine.errors.errors import (
     CompileFailedError,
     ParseError,
     RuntimeFailError,
+    TestCaseTimeoutError,
+    TestsFailedError,
     UnknownErrorError,
 )
-from execution_engine.parsers import codecarbon
+from execution_engine.measurement.energy import cpu_seconds_to_kwh, kwh_to_emissions_kg
+from execution_engine.measurement.measurement import Measurement
+from execution_engine.measurement.statistics import summarize
+from execution_engine.parsers import benchmark, cgroup, gnu_time, phases, test_cases
 from execution_engine.parsers.grader import grader
 
 
@@ -28,6 +34,45 @@ def _report_runtime_error(config: RunConfig):
     raise RuntimeFailError(runtime_err)
 
 
+def _grade(config: RunConfig, complete: bool = True):
+    """
+    Grades against the test data in the job's framework layer, since the job could have written
+    to the copy in its job directory
+    :raises UnknownErrorError: if the layer was modified since it was extracted
+    """
+    layer = cast(str, config.framework_layer)
+    data_files = [settings.INPUTS_FILE_NAME, settings.EXPECTED_STDOUT_FILE_NAME]
+    if not framework_layers.verify(layer, data_files):
+        raise UnknownErrorError("The test data was modified during the job")
+
+    grader(
+        os.path.join(layer, settings.INPUTS_FILE_NAME),
+        os.path.join(layer, settings.EXPECTED_STDOUT_FILE_NAME),
+        os.path.join(config.tmp_dir, settings.RUN_STDOUT_FILE_NAME),
+        mode=settings.GRADER_COMPARISON_MODE,
+        tolerance=settings.GRADER_FLOAT_TOLERANCE,
+        max_failures=settings.GRADER_MAX_REPORTED_FAILURES,
+        complete=complete,
+    )
+
+
+def _report_wrong_answer(config: RunConfig):
+    # The framework stopped at the first wrong answer, the output ends with it
+    _grade(config, complete=False)
+
+    raise TestsFailedError("Tests failed")
+
+
+def _report_test_case_timeout(config: RunConfig):
+    cases = gather_test_cases(config)
+    if not cases:
+        raise TestCaseTimeoutError("A test case exceeded its time limit")
+
+    raise TestCaseTimeoutError(
+        f"Test {cases[-1].index} exceeded its time limit of {cases[-1].cpu_ms:.0f} ms"
+    )
+
+
 def _parse_fail_reason(config: RunConfig, reason: str):
     reason = reason.strip()
     match reason:
@@ -37,114 +82,146 @@ def _parse_fail_reason(config: RunConfig, reason: str):
             _report_compile_err(config)
         case "runtime":
             _report_runtime_error(config)
+        case "tests":
+            _report_wrong_answer(config)
+        case "timeout":
+            _report_test_case_timeout(config)
         case _:
             raise UnknownErrorError(f"Unknown fail-reason: {reason}")
 
 
-def _parse_runtime(s: str) -> tuple[float, float, float]:
-    user_time: float | None = None
-    max_ram_kbytes: float | None = None
-    energy_kwh: float | None = None
-
-    # User time: matches "User time (seconds): " followed by a number with optional decimal
-    user_time_pattern = re.compile(r"User time \(seconds\):\s*(\d+\.\d+)")
-    # Max RAM: matches "Maximum resident set size (kbytes): " followed by an integer
-    max_ram_pattern = re.compile(r"Maximum resident set size \(kbytes\):\s*(\d+)")
-
-    for line in s.splitlines():
-        # Try to match user time
-        match_user_time = user_time_pattern.search(line)
-        if match_user_time:
-            try:
-                user_time = float(match_user_time.group(1))
-            except ValueError as e:
-                logger.error(f"Could not parse user time from '{match_user_time.group(1)}'")
-                raise UnknownErrorError from e
-
-        # Try to match max RAM
-        match_max_ram = max_ram_pattern.search(line)
-        if match_max_ram:
-            try:
-                max_ram_kbytes = int(match_max_ram.group(1))
-            except ValueError as e:
-                logger.error(f"Could not parse max RAM from '{match_max_ram.group(1)}'")
-                raise UnknownErrorError from e
-
-    if user_time is None or max_ram_kbytes is None:
-        raise ParseError
-
-    # Make type checker happy now we've established there are no None values
-    user_time = cast(float, user_time)
-    max_ram_kbytes = cast(float, max_ram_kbytes)
-    energy_kwh = cast(float, energy_kwh)
-
-    return user_time, max_ram_kbytes, energy_kwh
-
-
 def _read_file(filename: str) -> str:
     with open(filename) as f:
         return f.read()
 
 
-def _calc_emissions(measurement):
-    duration, emissions, energy = measurement
-
-    # Divide by 1000 since we do 1000 runs
-    return (
-        duration / 1000,
-        energy / 1000,
-        emissions / 1000,
-    )
-
-
-def gather_results(config: RunConfig) -> tuple[float, float, float]:
-    """
-    Retrieves and returns a tuple of
-    - Runtime per run in seconds
-    - Energy usage per run in kwh
-    - Emissions per run in kg CO2
-    """
-    fail_reason: str = _read_file(
+def _benchmark_results(config: RunConfig) -> Measurement:
+    samples = benchmark.parse(
         os.path.join(
             config.tmp_dir,
-            settings.FAILED_FILE_NAME,
+            settings.BENCHMARK_OUTPUT_FILE_NAME,
         )
     )
 
-    _parse_fail_reason(config, fail_reason)
+    stats = summarize(samples)
+    logger.info(
+        f"Measured {stats.count} samples: {stats.mean:.6f}s ± {stats.stddev:.6f}s per run "
+        f"(relative error {stats.relative_error:.2%})"
+    )
 
-    inputs: str = _read_file(
-        os.path.join(
-            config.tmp_dir,
-            settings.INPUTS_FILE_NAME,
-        )
+    energy_kwh = cpu_seconds_to_kwh(stats.mean)
+
+    return Measurement(
+        runtime_s=stats.mean,
+        energy_kwh=energy_kwh,
+        emissions_kg=kwh_to_emissions_kg(energy_kwh),
+        cpu_time_s=(
+            sum(user + system for _, user, system in samples) / sum(runs for runs, _, _ in samples)
+        ),
+        runtime_stddev_s=stats.stddev,
+        sample_count=stats.count,
     )
 
-    actual_output: str = _read_file(
+
+def _cgroup_results(config: RunConfig) -> Measurement:
+    runs, user_s, system_s = cgroup.parse(
         os.path.join(
             config.tmp_dir,
-            settings.RUN_STDOUT_FILE_NAME,
+            settings.CGROUP_OUTPUT_FILE_NAME,
         )
     )
 
-    # TODO: Yes, this absolutely shouldn't be in the container,
-    #       but I just want something working rn
-    expected_output: str = _read_file(
+    # The cgroup measures all runs together
+    runtime_s = (user_s + system_s) / runs
+    energy_kwh = cpu_seconds_to_kwh(runtime_s)
+
+    return Measurement(
+        runtime_s=runtime_s,
+        energy_kwh=energy_kwh,
+        emissions_kg=kwh_to_emissions_kg(energy_kwh),
+        cpu_time_s=runtime_s,
+        # The cgroup's memory.peak isn't limited to the measured runs, see the framework
+        memory_peak_bytes=None,
+    )
+
+
+def _time_results(config: RunConfig) -> Measurement:
+    report = gnu_time.parse(
         os.path.join(
             config.tmp_dir,
-            settings.EXPECTED_STDOUT_FILE_NAME,
+            settings.TIME_OUTPUT_FILE_NAME,
         )
     )
+    logger.info(
+        f"Measured {report.runs} runs: {report.user_s:.6f}s user, {report.system_s:.6f}s system, "
+        f"{report.max_rss_kb} kB max RSS, "
+        f"{report.voluntary_context_switches}/{report.involuntary_context_switches} "
+        f"voluntary/involuntary context switches, "
+        f"{report.major_page_faults}/{report.minor_page_faults} major/minor page faults"
+    )
+
+    # Like the benchmark modes, the runtime and energy are based on user CPU time per run
+    runtime_s = report.user_s / report.runs
+    energy_kwh = cpu_seconds_to_kwh(runtime_s)
+
+    return Measurement(
+        runtime_s=runtime_s,
+        energy_kwh=energy_kwh,
+        emissions_kg=kwh_to_emissions_kg(energy_kwh),
+        cpu_time_s=(report.user_s + report.system_s) / report.runs,
+        memory_peak_bytes=report.max_rss_kb * 1024,
+    )
+
+
+def _measurement_results(config: RunConfig) -> Measurement:
+    match settings.MEASUREMENT_MODE:
+        case "adaptive" | "benchmark":
+            return _benchmark_results(config)
+        case "cgroup":
+            return _cgroup_results(config)
+        case "time":
+            return _time_results(config)
+        case _:
+            raise UnknownErrorError(f"Unknown measurement mode: {settings.MEASUREMENT_MODE}")
+
+
+def gather_phase_timings(config: RunConfig) -> dict[str, PhaseTiming]:
+    """
+    Retrieves the timings of the phases that ran inside the container. Also available when the
+    job failed; missing or broken timings are logged and skipped since they are only diagnostic
+    """
+    try:
+        return phases.parse(os.path.join(config.tmp_dir, settings.PHASES_FILE_NAME))
+    except (OSError, ParseError) as e:
+        logger.warning(f"Could not read phase timings: {e}")
+        return {}
+
+
+def gather_test_cases(config: RunConfig) -> list[TestCaseResult]:
+    """
+    Retrieves the outcome and CPU time of every test case of the correctness run. Also available
+    when the job failed; a missing or broken report is logged and skipped
+    """
+    try:
+        return test_cases.parse(os.path.join(config.tmp_dir, settings.TEST_CASES_FILE_NAME))
+    except (OSError, ParseError) as e:
+        logger.warning(f"Could not read test cases: {e}")
+        return []
 
-    grader(inputs, expected_output, actual_output)
 
-    emissions = codecarbon.parse(
+def gather_results(config: RunConfig) -> Measurement:
+    """
+    Retrieves the measurement of a single run: runtime in seconds, energy usage in kwh and
+    emissions in kg CO2, and the spread of the runtime if it was sampled
+    """
+    fail_reason: str = _read_file(
         os.path.join(
             config.tmp_dir,
-            settings.EMISSIONS_OUTPUT_FILE_NAME,
+            settings.FAILED_FILE_NAME,
         )
     )
 
-    runtime_s, energy_kwh, co2 = _calc_emissions(emissions)
+    _parse_fail_reason(config, fail_reason)
+    _grade(config)
 
-    return runtime_s, energy_kwh, co2
+    return _measurement_results(config)
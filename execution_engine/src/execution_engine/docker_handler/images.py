@@ -0,0 +1,117 @@
+"""
+Registry of runner images.
+Every language image is built once (at startup or on first use) and labelled with the hash of the
+Dockerfile it was built from. Images are only rebuilt when that hash changes.
+"""
+
+import dataclasses
+import hashlib
+import threading
+import time
+
+import docker.errors  # pylint: disable=import-error, no-name-in-module
+from loguru import logger
+
+from common.languages import LanguageInfo, language_info
+from execution_engine.docker_handler.build import build_image, dockerfile_path
+from execution_engine.docker_handler.state import client
+
+DOCKERFILE_HASH_LABEL = "competitive-green-coding.dockerfile-hash"
+
+
+@dataclasses.dataclass
+class ImageStatus:
+    language: str
+    tag: str
+    dockerfile_hash: str | None = None
+    ready: bool = False
+    built_at: float | None = None
+    error: str | None = None
+
+
+_status: dict[str, ImageStatus] = {}
+_locks: dict[str, threading.Lock] = {}
+_registry_lock = threading.Lock()
+
+
+def _lock_for(language: LanguageInfo) -> threading.Lock:
+    with _registry_lock:
+        return _locks.setdefault(language.name, threading.Lock())
+
+
+def _status_for(language: LanguageInfo) -> ImageStatus:
+    with _registry_lock:
+        return _status.setdefault(
+            language.name, ImageStatus(language=language.name, tag=language.image)
+        )
+
+
+def dockerfile_hash(language: LanguageInfo) -> str:
+    with open(dockerfile_path(language), "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _existing_image_hash(language: LanguageInfo) -> str | None:
+    """
+    Returns the Dockerfile hash label of an already existing image, so we don't rebuild images
+    that survived an engine restart
+    """
+    try:
+        image = client.images.get(language.image)
+    except docker.errors.ImageNotFound:
+        return None
+
+    return (image.labels or {}).get(DOCKERFILE_HASH_LABEL)
+
+
+def ensure_image(language: LanguageInfo) -> None:
+    """
+    Makes sure the image for this language exists and matches the current Dockerfile.
+    Cheap when the image is ready: only the Dockerfile is hashed.
+    :raises docker.errors.BuildError: if the image could not be built
+    :raises docker.errors.APIError: if Docker ran into problems
+    """
+    current_hash = dockerfile_hash(language)
+    status = _status_for(language)
+    if status.ready and status.dockerfile_hash == current_hash:
+        return
+
+    with _lock_for(language):
+        # Another thread might have built the image while we were waiting for the lock
+        if status.ready and status.dockerfile_hash == current_hash:
+            return
+
+        status.ready = False
+        try:
+            if _existing_image_hash(language) != current_hash:
+                build_image(language, labels={DOCKERFILE_HASH_LABEL: current_hash})
+                status.built_at = time.time()
+            else:
+                logger.info(f"Docker image {language.image} is up to date")
+        except (docker.errors.BuildError, docker.errors.APIError) as e:
+            status.error = str(e)
+            raise
+
+        status.dockerfile_hash = current_hash
+        status.error = None
+        status.ready = True
+
+
+def build_all() -> None:
+    """
+    Builds images for all languages. Failures are logged and retried lazily on first use
+    """
+    for language in language_info.values():
+        try:
+            ensure_image(language)
+        except (docker.errors.BuildError, docker.errors.APIError, OSError) as e:
+            logger.error(f"Could not build image {language.image}: {e}")
+            _status_for(language).error = str(e)
+
+
+def image_statuses() -> list[ImageStatus]:
+    for language in language_info.values():
+        _status_for(language)
+
+    with _registry_lock:
+        return list(_status.values())
@@ -0,0 +1,222 @@
+"""
+Options shared by every container that runs user code, whether it is started for a single job or
+kept warm in the container pool
+"""
+
+import functools
+import os
+from typing import Any
+
+from docker.types import Ulimit  # pylint: disable=no-name-in-module
+
+from common.languages import LanguageInfo
+from execution_engine.config import settings
+from execution_engine.docker_handler.runconfig import RunConfig
+from execution_engine.docker_handler.state import client, host_gid, host_uid
+
+RUNTIMES_VOLUME_NAME = "competitive-green-coding_runtimes_data"
+FRAMEWORKS_VOLUME_NAME = "competitive-green-coding_frameworks_data"
+CONTAINER_APP_DIR = "/app"
+CONTAINER_FRAMEWORKS_DIR = "/frameworks"
+CONTAINER_TMPFS_WORK_DIR = "/work"
+
+# Fills the tmpfs work directory with the framework layer and the job directory, runs the job and
+# copies the result files back. Arguments: layer, job directory, result files
+_TMPFS_JOB_SCRIPT = """
+layer="$1"
+job="$2"
+shift 2
+
+# Warm containers run one job after another in the same tmpfs
+find . -mindepth 1 -delete
+cp -R "$layer"/. . && cp -R "$job"/. . || exit 1
+
+./run.sh
+status=$?
+
+for file in "$@"; do
+  if [ -f "$file" ]; then cp "$file" "$job"/; fi
+done
+exit $status
+"""
+
+_ulimits = [
+    Ulimit(
+        name="nproc",
+        soft=settings.EXECUTION_ENVIRONMENT_MAX_NPROC,
+        hard=settings.EXECUTION_ENVIRONMENT_MAX_NPROC,
+    ),
+    Ulimit(
+        name="fsize",
+        soft=settings.EXECUTION_ENVIRONMENT_MAX_FSIZE,
+        hard=settings.EXECUTION_ENVIRONMENT_MAX_FSIZE,
+    ),
+]
+
+
+def workdir_in_container(tmp_dir: str) -> str:
+    return os.path.join(CONTAINER_APP_DIR, os.path.basename(tmp_dir))
+
+
+def _layer_in_container(layer: str) -> str:
+    return os.path.join(CONTAINER_FRAMEWORKS_DIR, os.path.basename(layer))
+
+
+@functools.cache
+def _volume_mountpoint(volume_name: str) -> str:
+    return client.volumes.get(volume_name).attrs["Mountpoint"]
+
+
+def _host_path(path: str) -> str:
+    """
+    Path of a directory on one of the engine's volumes as the Docker daemon sees it, so it can be
+    bind-mounted into a container on its own instead of the whole volume
+    """
+    for volume_name, engine_path in (
+        (RUNTIMES_VOLUME_NAME, settings.TMP_DIR_PATH_BASE),
+        (FRAMEWORKS_VOLUME_NAME, settings.FRAMEWORK_LAYERS_VOLUME_PATH),
+    ):
+        relative = os.path.relpath(path, engine_path)
+        if relative.split(os.sep)[0] != os.pardir:
+            return os.path.normpath(os.path.join(_volume_mountpoint(volume_name), relative))
+
+    raise ValueError(f"{path} is not on a volume that can be mounted into containers")
+
+
+def job_volumes(config: RunConfig) -> dict[str, dict[str, str]]:
+    """
+    Mounts of a container started for a single job: its job directory and, with tmpfs work
+    directories, the layer with its framework files, read-only
+    """
+    volumes = {
+        _host_path(config.tmp_dir): {"bind": workdir_in_container(config.tmp_dir), "mode": "rw"}
+    }
+    if config.framework_dir is not None:
+        volumes[_host_path(config.framework_dir)] = {
+            "bind": _layer_in_container(config.framework_dir),
+            "mode": "ro",
+        }
+    return volumes
+
+
+def pool_volumes(slot_dir: str) -> dict[str, dict[str, str]]:
+    """
+    Mounts of a warm container, which can't be changed per job: a directory of its own that jobs
+    are moved into and, with tmpfs work directories, all framework layers, read-only
+    """
+    volumes = {_host_path(slot_dir): {"bind": CONTAINER_APP_DIR, "mode": "rw"}}
+    if settings.TMPFS_WORK_DIRS:
+        volumes[_host_path(settings.FRAMEWORK_LAYERS_DIR)] = {
+            "bind": CONTAINER_FRAMEWORKS_DIR,
+            "mode": "ro",
+        }
+    return volumes
+
+
+def _result_files(language: LanguageInfo) -> list[str]:
+    """
+    Files the engine reads after a job in a tmpfs work directory
+    """
+    files = [
+        settings.FAILED_FILE_NAME,
+        settings.COMPILE_STDOUT_FILE_NAME,
+        settings.COMPILE_STDERR_FILE_NAME,
+        settings.RUN_STDOUT_FILE_NAME,
+        settings.RUN_STDERR_FILE_NAME,
+        settings.CGROUP_OUTPUT_FILE_NAME,
+        settings.TIME_OUTPUT_FILE_NAME,
+        settings.BENCHMARK_OUTPUT_FILE_NAME,
+        settings.PHASES_FILE_NAME,
+        settings.TEST_CASES_FILE_NAME,
+    ]
+    if settings.COMPILE_CACHE_ENABLED and language.build_artifact is not None:
+        files.append(language.build_artifact)
+    return files
+
+
+def job_workdir(config: RunConfig) -> str:
+    if config.framework_dir is None:
+        return workdir_in_container(config.tmp_dir)
+    return CONTAINER_TMPFS_WORK_DIR
+
+
+def job_command(config: RunConfig) -> list[str]:
+    """
+    Command that runs the job in the container, from `job_workdir`
+    """
+    if config.framework_dir is None:
+        return ["./run.sh"]
+
+    return [
+        "/bin/sh",
+        "-c",
+        _TMPFS_JOB_SCRIPT,
+        "sh",
+        _layer_in_container(config.framework_dir),
+        workdir_in_container(config.tmp_dir),
+        *_result_files(config.language),
+    ]
+
+
+def container_user() -> str:
+    return f"{host_uid}:{host_gid}"  # Non-root user
+
+
+def container_environment() -> dict[str, str]:
+    """
+    Environment variables read by the framework's run script
+    """
+    return {
+        "MEASUREMENT_MODE": settings.MEASUREMENT_MODE,
+        "BENCHMARK_ITERATIONS": str(settings.BENCHMARK_ITERATIONS),
+        "ADAPTIVE_TARGET_RELATIVE_ERROR": str(settings.ADAPTIVE_TARGET_RELATIVE_ERROR),
+        "ADAPTIVE_TIME_BUDGET_MS": str(int(settings.ADAPTIVE_TIME_BUDGET_SEC * 1000)),
+        "ADAPTIVE_MIN_SAMPLES": str(settings.ADAPTIVE_MIN_SAMPLES),
+        "ADAPTIVE_MAX_SAMPLES": str(settings.ADAPTIVE_MAX_SAMPLES),
+        "ADAPTIVE_MIN_BATCH_MS": str(settings.ADAPTIVE_MIN_BATCH_MS),
+        "TEST_CASE_FAIL_FAST": str(
+            int(settings.TEST_CASE_FAIL_FAST and settings.GRADER_COMPARISON_MODE == "exact")
+        ),
+        "TEST_CASE_TIME_LIMIT_MS": str(settings.TEST_CASE_TIME_LIMIT_MS),
+    }
+
+
+def sample_environment() -> dict[str, str]:
+    """
+    Overrides that limit the measurement to a few samples, for confirming a memoized result
+    """
+    samples = str(settings.RESULT_MEMOIZATION_SAMPLES)
+    return {
+        "BENCHMARK_ITERATIONS": samples,
+        "ADAPTIVE_MIN_SAMPLES": samples,
+        "ADAPTIVE_MAX_SAMPLES": samples,
+    }
+
+
+def container_options(
+    language: LanguageInfo, cpu: int, volumes: dict[str, dict[str, str]]
+) -> dict[str, Any]:
+    """
+    Keyword arguments for `client.containers.run`/`create` that isolate and limit the container
+    :param volumes: see `job_volumes` and `pool_volumes`
+    """
+    options: dict[str, Any] = {
+        "image": language.image,
+        "volumes": volumes,
+        "network_mode": "none",  # Don't allow network access
+        "mem_limit": f"{settings.MEM_LIMIT_MB}m",
+        "ulimits": _ulimits,
+        "cpuset_cpus": str(cpu),  # Pin to specific CPU core
+        "security_opt": ["no-new-privileges:true"],  # Security
+        "cap_drop": ["ALL"],  # Security
+        "read_only": True,
+        "user": container_user(),
+    }
+
+    if settings.TMPFS_WORK_DIRS:
+        # Docker mounts tmpfs noexec by default, but the job has to run what it compiled
+        options["tmpfs"] = {
+            CONTAINER_TMPFS_WORK_DIR: f"size={settings.TMPFS_WORK_DIR_SIZE_MB}m,exec,mode=1777"
+        }
+
+    return options
@@ -0,0 +1,237 @@
+"""
+Pool of warm containers per language.
+Containers are created ahead of time and kept alive with an idle process, jobs are executed inside
+them with `exec` in their own work directory. Containers are replaced after a configurable number
+of jobs, after anything went wrong during a job, or when they have been idle for too long.
+
+The mounts of a container can't change once it is created, so every container gets a directory of
+its own on the runtimes volume, and a job directory is moved in there for the job and back after.
+"""
+
+import dataclasses
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Any
+
+import docker.errors  # pylint: disable=import-error, no-name-in-module
+from docker.models.containers import Container
+from loguru import logger
+
+from common.languages import LanguageInfo, language_info
+from execution_engine.config import settings
+from execution_engine.docker_handler import state
+from execution_engine.docker_handler.images import ensure_image
+from execution_engine.docker_handler.options import (
+    CONTAINER_APP_DIR,
+    container_options,
+    pool_volumes,
+)
+
+# Label used to find (and clean up) pool containers left behind by a previous engine process
+POOL_LABEL = "competitive-green-coding.pool"
+# Label with the container's own directory, removed along with it
+POOL_SLOT_LABEL = "competitive-green-coding.pool-slot"
+
+
+@dataclasses.dataclass
+class PooledContainer:
+    container: Container
+    language: LanguageInfo
+    cpu: int
+    slot: str  # Mounted as the container's app directory, jobs are moved in here
+    jobs_run: int = 0
+    last_used: float = dataclasses.field(default_factory=time.monotonic)
+
+
+class ContainerPool:
+    """
+    Thread-safe; all methods do blocking Docker calls and should be run off the event loop
+    """
+
+    def __init__(self, client: Any, slots_dir: str):
+        """
+        :param client: Docker client
+        :param slots_dir: where the directories of the containers are created, on the runtimes
+                          volume
+        """
+        self._client = client
+        self._slots_dir = slots_dir
+        self._lock = threading.Lock()
+        self._idle: dict[str, list[PooledContainer]] = {}
+        self._in_use: dict[int, PooledContainer] = {}
+        self._last_demand: dict[str, float] = {}
+
+    def _create(self, language: LanguageInfo, cpu: int) -> PooledContainer:
+        ensure_image(language)
+        os.makedirs(self._slots_dir, exist_ok=True)
+        slot = tempfile.mkdtemp(dir=self._slots_dir, prefix=f"{language.name}_")
+        try:
+            container = self._client.containers.run(
+                **container_options(language, cpu, pool_volumes(slot)),
+                working_dir=CONTAINER_APP_DIR,
+                detach=True,
+                remove=False,
+                labels={POOL_LABEL: language.name, POOL_SLOT_LABEL: slot},
+                entrypoint=["sleep", "infinity"],  # Idle process, jobs are started with exec
+            )
+        except BaseException:
+            shutil.rmtree(slot, ignore_errors=True)
+            raise
+
+        logger.info(f"Pool : Created warm {language.name} container '{container.id}'")
+        return PooledContainer(container=container, language=language, cpu=cpu, slot=slot)
+
+    @staticmethod
+    def _destroy(pooled: PooledContainer) -> None:
+        try:
+            pooled.container.remove(force=True)
+        except docker.errors.APIError as e:
+            logger.warning(f"Pool : Could not remove container '{pooled.container.id}': {e}")
+        shutil.rmtree(pooled.slot, ignore_errors=True)
+
+    @staticmethod
+    def _is_clean(pooled: PooledContainer) -> bool:
+        """
+        A container can only be reused if it is still running and the job left no processes
+        behind, which would otherwise interfere with the next measurement, and no files next to
+        its job directory, which the next job could read
+        """
+        try:
+            if os.listdir(pooled.slot):
+                return False
+            pooled.container.reload()
+            if pooled.container.status != "running":
+                return False
+            return len(pooled.container.top().get("Processes") or []) == 1
+        except (docker.errors.APIError, OSError):
+            return False
+
+    def acquire(self, language: LanguageInfo, cpu: int) -> PooledContainer:
+        """
+        Hands out an idle container pinned to `cpu`, creating one if the pool is empty
+        """
+        with self._lock:
+            self._last_demand[language.name] = time.monotonic()
+            idle = self._idle.setdefault(language.name, [])
+            # Prefer a container that is already pinned to the right CPU
+            idle.sort(key=lambda pooled: pooled.cpu != cpu)
+            pooled = idle.pop(0) if idle else None
+
+        if pooled is None:
+            pooled = self._create(language, cpu)
+        elif pooled.cpu != cpu:
+            pooled.container.update(cpuset_cpus=str(cpu))
+            pooled.cpu = cpu
+
+        with self._lock:
+            self._in_use[cpu] = pooled
+
+        return pooled
+
+    def release(self, pooled: PooledContainer, reusable: bool) -> None:
+        """
+        Returns a container after a job. It is destroyed if it can't or shouldn't be reused
+        """
+        with self._lock:
+            self._in_use.pop(pooled.cpu, None)
+
+        pooled.jobs_run += 1
+        pooled.last_used = time.monotonic()
+
+        recycle = pooled.jobs_run >= settings.CONTAINER_POOL_RECYCLE_AFTER_JOBS
+        if reusable and not recycle and self._is_clean(pooled):
+            with self._lock:
+                idle = self._idle.setdefault(pooled.language.name, [])
+                if len(idle) < settings.CONTAINER_POOL_SIZE:
+                    idle.append(pooled)
+                    return
+
+        self._destroy(pooled)
+
+    def kill(self, cpu: int) -> None:
+        """
+        Kills the container currently running a job on `cpu`, used when a job times out
+        """
+        with self._lock:
+            pooled = self._in_use.get(cpu)
+
+        if pooled is not None:
+            try:
+                pooled.container.kill()
+            except docker.errors.APIError as e:
+                logger.warning(f"Pool : Could not kill container '{pooled.container.id}': {e}")
+
+    def maintain(self, cpus: list[int]) -> None:
+        """
+        Evicts containers that have been idle for too long and tops up the pools of languages
+        that have recently been used
+        :param cpus: CPUs the scheduler hands out, new containers are pinned to them round-robin
+        """
+        now = time.monotonic()
+        evicted: list[PooledContainer] = []
+        to_create: list[LanguageInfo] = []
+
+        with self._lock:
+            for language in language_info.values():
+                idle = self._idle.setdefault(language.name, [])
+                keep: list[PooledContainer] = []
+                for pooled in idle:
+                    if now - pooled.last_used < settings.CONTAINER_POOL_IDLE_TIMEOUT_SEC:
+                        keep.append(pooled)
+                    else:
+                        evicted.append(pooled)
+                self._idle[language.name] = keep
+
+                last_demand = self._last_demand.get(language.name)
+                if (
+                    last_demand is not None
+                    and now - last_demand < settings.CONTAINER_POOL_IDLE_TIMEOUT_SEC
+                ):
+                    to_create.extend([language] * (settings.CONTAINER_POOL_SIZE - len(keep)))
+
+        for pooled in evicted:
+            logger.info(f"Pool : Evicting idle container '{pooled.container.id}'")
+            self._destroy(pooled)
+
+        for i, language in enumerate(to_create):
+            try:
+                pooled = self._create(language, cpu=cpus[i % len(cpus)])
+            except (docker.errors.APIError, docker.errors.BuildError) as e:
+                logger.error(f"Pool : Could not create {language.name} container: {e}")
+                continue
+
+            with self._lock:
+                self._idle.setdefault(language.name, []).append(pooled)
+
+    def warm_up(self, cpus: list[int]) -> None:
+        """
+        Removes pool containers left behind by a previous run and fills all pools
+        :param cpus: See `maintain`
+        """
+        for container in self._client.containers.list(all=True, filters={"label": POOL_LABEL}):
+            container.remove(force=True)
+            if POOL_SLOT_LABEL in container.labels:
+                shutil.rmtree(container.labels[POOL_SLOT_LABEL], ignore_errors=True)
+
+        with self._lock:
+            now = time.monotonic()
+            for language in language_info.values():
+                self._last_demand[language.name] = now
+
+        self.maintain(cpus)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pooled_containers = [p for idle in self._idle.values() for p in idle]
+            pooled_containers.extend(self._in_use.values())
+            self._idle.clear()
+            self._in_use.clear()
+
+        for pooled in pooled_containers:
+            self._destroy(pooled)
+
+
+container_pool = ContainerPool(state.client, os.path.join(settings.TMP_DIR_PATH_BASE, "pool"))
@@ -1,64 +1,169 @@
 import os
 import re
 import stat
-import tarfile
 import tempfile
+from typing import cast
 
 import httpx
 from loguru import logger
 
 from common.languages import Language, language_info
-from common.schemas import SubmissionCreate
+from common.schemas import FrameworkManifest, SubmissionCreate
+from execution_engine.blocking import run_blocking
+from execution_engine.cache.bundles import bundle_index
+from execution_engine.cache.compile_cache import compile_cache
+from execution_engine.cache.framework_layers import copy_layer, framework_layers
+from execution_engine.cache.result_store import result_store
 from execution_engine.config import settings
-from execution_engine.docker_handler.build import build_image
+from execution_engine.docker_handler.images import dockerfile_hash, ensure_image
 from execution_engine.docker_handler.runconfig import RunConfig
+from execution_engine.http_clients import db_client
 
 
 def _ensure_image_pulled(config: RunConfig):
-    build_image(config.language)
+    ensure_image(config.language)
 
 
-def _unpack_tarball(path: str) -> None:
-    dir_path = os.path.dirname(path)
-    with tarfile.open(path) as tar:
-        tar.extractall(dir_path)
+async def _request_framework_files(
+    tmp_dir: str, submission: SubmissionCreate, etag: str | None = None
+) -> tuple[str, str | None] | None:
+    """
+    Downloads the framework tarball into the job directory. If `etag` is given, it is only
+    downloaded if the framework changed since
+    :returns: path and ETag of the tarball, or None if the framework did not change
+    """
+    filename = os.path.join(tmp_dir, "framework.tar.gz")
+    headers = {"Content-Type": "application/json"}
+    if etag is not None:
+        headers["If-None-Match"] = etag
 
+    try:
+        async with db_client.client.stream(
+            "POST",
+            f"{settings.DB_HANDLER_URL}/api/framework",
+            content=submission.model_dump_json(),
+            headers=headers,
+            timeout=settings.FRAMEWORK_REQUEST_TIMEOUT_SEC,
+        ) as response:
+            response.raise_for_status()
+            if response.status_code == httpx.codes.NOT_MODIFIED:
+                return None
 
-async def _request_framework_files(tmp_dir: str, submission: SubmissionCreate):
-    filename = os.path.join(tmp_dir, "framework.tar.gz")
+            content_disposition = response.headers.get("Content-Disposition")
+            if content_disposition:
+                # Find filename in header
+                match = re.search(r'filename="([^"]+)"', content_disposition)
+                if match:
+                    filename = os.path.join(tmp_dir, match.group(1))
+
+            f = await run_blocking(open, filename, "wb")
+            try:
+                async for chunk in response.aiter_bytes(chunk_size=65536):
+                    await run_blocking(f.write, chunk)
+            finally:
+                await run_blocking(f.close)
+
+    except httpx.RequestError as e:
+        logger.error(f"Network error during tarball download: {e}")
+        raise e
+    except httpx.HTTPError as e:
+        logger.error(f"HTTP error during tarball download: {e}")
+        raise e
 
-    async with httpx.AsyncClient() as http_client:
-        try:
-            async with http_client.stream(
-                "POST",
-                f"{settings.DB_HANDLER_URL}/api/framework",
-                content=submission.model_dump_json(),
-                headers={"Content-Type": "application/json"},
-            ) as response:
-                response.raise_for_status()
-
-                content_disposition = response.headers.get("Content-Disposition")
-                if content_disposition:
-                    # Find filename in header
-                    match = re.search(r'filename="([^"]+)"', content_disposition)
-                    if match:
-                        filename = os.path.join(tmp_dir, match.group(1))
-
-                with open(filename, "wb") as f:
-                    async for chunk in response.aiter_bytes(chunk_size=8192):
-                        f.write(chunk)
-
-        except httpx.RequestError as e:
-            logger.error(f"Network error during tarball download: {e}")
-            raise e
-        except httpx.HTTPError as e:
-            logger.error(f"HTTP error during tarball download: {e}")
-            raise e
+    return filename, response.headers.get("ETag")
+
+
+async def _request_framework_manifest(
+    submission: SubmissionCreate, etag: str | None = None
+) -> FrameworkManifest | None:
+    """
+    Requests the paths and hashes of the framework files on the storage volume. If `etag` is
+    given, they are only sent if the framework changed since
+    :returns: the manifest, or None if the framework did not change
+    """
+    headers = {"Content-Type": "application/json"}
+    if etag is not None:
+        headers["If-None-Match"] = etag
 
     try:
-        _unpack_tarball(filename)
-    finally:
-        os.remove(filename)
+        response = await db_client.client.post(
+            f"{settings.DB_HANDLER_URL}/api/framework/manifest",
+            content=submission.model_dump_json(),
+            headers=headers,
+            timeout=settings.FRAMEWORK_REQUEST_TIMEOUT_SEC,
+        )
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        logger.error(f"Error during framework manifest request: {e}")
+        raise e
+
+    if response.status_code == httpx.codes.NOT_MODIFIED:
+        return None
+    return FrameworkManifest.model_validate_json(response.content)
+
+
+async def _copy_shared_layer(config: RunConfig, etag: str | None = None) -> str | None:
+    """
+    Copies the framework files from the shared storage volume into a layer and records it as the
+    current bundle
+    :returns: the acquired layer, or None if the framework did not change since `etag`
+    """
+    manifest = await _request_framework_manifest(config.origin_request, etag)
+    if manifest is None:
+        return None
+
+    layer = await run_blocking(
+        framework_layers.acquire_files, manifest.files, settings.FRAMEWORK_SHARED_STORAGE_PATH
+    )
+    bundle_index.put(config.origin_request.problem_id, config.language.name, manifest.etag, layer)
+    return layer
+
+
+async def _download_layer(config: RunConfig, etag: str | None = None) -> str | None:
+    """
+    Downloads the framework files into a layer and records it as the current bundle
+    :returns: the acquired layer, or None if the framework did not change since `etag`
+    """
+    if settings.FRAMEWORK_TRANSFER_MODE == "shared":
+        return await _copy_shared_layer(config, etag)
+
+    downloaded = await _request_framework_files(config.tmp_dir, config.origin_request, etag)
+    if downloaded is None:
+        return None
+
+    tarball, new_etag = downloaded
+    layer = await run_blocking(framework_layers.acquire, tarball)
+    bundle_index.put(config.origin_request.problem_id, config.language.name, new_etag, layer)
+    return layer
+
+
+async def _framework_layer(config: RunConfig) -> str:
+    """
+    Acquires the layer with the framework files of the job's problem and language. A cached
+    layer is reused if the DB handler confirms it is current, or if it was confirmed recently
+    """
+    problem_id = config.origin_request.problem_id
+    language = config.language.name
+
+    bundle = bundle_index.get(problem_id, language)
+    if bundle is not None:
+        if bundle_index.is_fresh(bundle) and await run_blocking(
+            framework_layers.acquire_existing, bundle.layer
+        ):
+            return bundle.layer
+
+        layer = await _download_layer(config, etag=bundle.etag)
+        if layer is not None:
+            return layer
+
+        if await run_blocking(framework_layers.acquire_existing, bundle.layer):
+            bundle_index.revalidated(problem_id, language)
+            return bundle.layer
+
+        # Current, but the layer was evicted or modified in the meantime
+        bundle_index.discard(problem_id, language)
+
+    return cast(str, await _download_layer(config))  # Unconditional, so always downloaded
 
 
 def _store_submission(tmpdir: str, language: Language, code: str):
@@ -88,13 +193,70 @@ def _chmod_run_script(tmp_dir: str):
     os.chmod(run_sh_path, current_permissions | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
 
 
+def _restore_cached_build(config: RunConfig):
+    """
+    Looks up the build of this exact job in the compile cache and drops it in when found
+    """
+    artifact_name = config.language.build_artifact
+    if not settings.COMPILE_CACHE_ENABLED or artifact_name is None:
+        return
+
+    config.compile_cache_key = compile_cache.key(
+        config.tmp_dir,
+        config.language,
+        toolchain=dockerfile_hash(config.language),
+        lower=config.framework_dir,
+    )
+    config.compile_cache_hit = compile_cache.restore(
+        config.compile_cache_key, artifact_name, config.tmp_dir
+    )
+    if config.compile_cache_hit:
+        logger.info(f"Compile cache hit for {config.origin_request.submission_uuid}")
+
+
+def store_build(config: RunConfig):
+    """
+    Adds the build of a finished job to the compile cache
+    """
+    artifact_name = config.language.build_artifact
+    if config.compile_cache_key is None or config.compile_cache_hit or artifact_name is None:
+        return
+
+    compile_cache.store(config.compile_cache_key, artifact_name, config.tmp_dir)
+
+
+def _prepare_job_dir(config: RunConfig, code: str):
+    """
+    Everything after receiving the framework files, all blocking file I/O
+    """
+    _store_submission(config.tmp_dir, config.origin_request.language, code)
+    if config.framework_dir is None:
+        _chmod_run_script(config.tmp_dir)
+
+    if settings.RESULT_MEMOIZATION_MODE != "off":
+        # Before restoring the build, so the key only depends on what we received
+        config.result_key = result_store.key(
+            config.tmp_dir,
+            config.language,
+            toolchain=dockerfile_hash(config.language),
+            lower=config.framework_dir,
+        )
+
+    _restore_cached_build(config)
+
+
 async def setup_env(config: RunConfig, code):
     """
-    Sets up the environment and stores temp dir in the config
+    Sets up the environment and stores temp dir in the config.
+    Blocking steps run in the blocking pool
     """
-    _ensure_image_pulled(config)
-    tmp_dir = _create_tmp_dir()
-    await _request_framework_files(tmp_dir, config.origin_request)
-    _store_submission(tmp_dir, config.origin_request.language, code)
-    config.tmp_dir = tmp_dir
-    _chmod_run_script(tmp_dir)
+    await run_blocking(_ensure_image_pulled, config)
+    # Stored right away, so the directory is cleaned up if anything below fails
+    config.tmp_dir = await run_blocking(_create_tmp_dir)
+    config.framework_layer = await _framework_layer(config)
+    if settings.TMPFS_WORK_DIRS:
+        # Only the submission goes in the job directory, the framework files are shared
+        config.framework_dir = config.framework_layer
+    else:
+        await run_blocking(copy_layer, config.framework_layer, config.tmp_dir)
+    await run_blocking(_prepare_job_dir, config, code)
@@ -1,32 +1,33 @@
 import asyncio
 import os
+from typing import cast
 
 from docker.models.containers import Container
-from docker.types import Ulimit  # pylint: disable=no-name-in-module
 from loguru import logger
 
+from execution_engine.blocking import run_blocking
 from execution_engine.config import settings
+from execution_engine.docker_handler.events import ContainerExit
+from execution_engine.docker_handler.options import (
+    container_environment,
+    container_options,
+    container_user,
+    job_command,
+    job_volumes,
+    job_workdir,
+    workdir_in_container,
+)
+from execution_engine.docker_handler.pool import PooledContainer, container_pool
 from execution_engine.docker_handler.runconfig import RunConfig
 from execution_engine.errors import CpuOutOfRangeError
 
 from ..errors.errors import ContainerOOMError
-from .state import client, host_gid, host_uid
-
-_ulimits = [
-    Ulimit(
-        name="nproc",
-        soft=settings.EXECUTION_ENVIRONMENT_MAX_NPROC,
-        hard=settings.EXECUTION_ENVIRONMENT_MAX_NPROC,
-    ),
-    Ulimit(
-        name="fsize",
-        soft=settings.EXECUTION_ENVIRONMENT_MAX_FSIZE,
-        hard=settings.EXECUTION_ENVIRONMENT_MAX_FSIZE,
-    ),
-]
+from .state import client, container_events
 
 _cpu_count = os.cpu_count()
 
+_LOGS_FILE_NAME = "container_logs.log"
+
 
 def _validate_cpu(cpu: int) -> None:
     """
@@ -39,67 +40,129 @@ def _validate_cpu(cpu: int) -> None:
         raise CpuOutOfRangeError(f"CPU out of range: {cpu}")
 
 
-def _save_logs(container: Container, path: str) -> None:
-    logs = container.logs().decode()
-    with open(os.path.join(path, "container_logs.log"), "w") as f:
-        f.write(logs)
+def _save_logs(logs: bytes, path: str) -> None:
+    with open(os.path.join(path, _LOGS_FILE_NAME), "w") as f:
+        f.write(logs.decode())
+
+
+def _logged(command: list[str], log_path: str) -> list[str]:
+    """
+    A detached exec has no output stream, so its output goes to the log file in the job directory
+    """
+    return ["/bin/sh", "-c", 'log="$1"; shift; exec "$@" > "$log" 2>&1', "sh", log_path, *command]
+
+
+async def _wait(key: str, exited: asyncio.Future[ContainerExit]) -> ContainerExit:
+    """
+    Waits for the exit of a started container or exec
+    :raises TimeoutError: if it took longer than the time limit, it is then still running
+    """
+    try:
+        async with asyncio.timeout(settings.TIME_LIMIT_SEC):
+            return await exited
+    finally:
+        container_events.discard(key)
 
 
-def _run_and_wait_container(config: RunConfig):
-    basename = os.path.basename(config.tmp_dir)
-    workdir_in_container = os.path.join("/app", basename)
+async def _run_container(config: RunConfig) -> ContainerExit:
+    workdir = job_workdir(config)
 
-    volumes = {
-        "competitive-green-coding_runtimes_data": {
-            "bind": "/app",
-            "mode": "rw",
-            "subpath": os.path.basename(config.tmp_dir),
-        }
-    }
     logger.info(
         f"Worker {config.cpu} : Starting container with working directory {config.tmp_dir}\n"
-        f"Path in container: {workdir_in_container}"
+        f"Path in container: {workdir}"
     )
 
-    container = client.containers.run(
-        image=config.language.image,
-        volumes=volumes,
-        working_dir=workdir_in_container,
-        remove=False,  # Don't remove container on exit (we want to acces logs)
-        detach=True,  # Don't wait for container to finish
-        network_mode=None,  # Don't allow network access
-        mem_limit=f"{settings.MEM_LIMIT_MB}m",
-        ulimits=_ulimits,
-        cpuset_cpus=str(config.cpu),  # Pin to specific CPU core
-        security_opt=["no-new-privileges:true"],  # Security
-        cap_drop=["ALL"],  # Security
-        read_only=True,
-        user=f"{host_uid}:{host_gid}",  # Non-root user
-        entrypoint="./run.sh",
+    container: Container = await run_blocking(
+        client.containers.create,
+        **container_options(config.language, config.cpu, job_volumes(config)),
+        working_dir=workdir,
+        environment={**container_environment(), **config.environment_overrides},
+        entrypoint=job_command(config),
     )
-    logger.info(f"Worker {config.cpu} : Container '{container.id}' started")
-
+    container_id = cast(str, container.id)
     try:
-        res = container.wait()
+        # Before starting, so the exit can't be missed
+        exited = container_events.expect(container_id, container_id)
+        await run_blocking(container.start)
+        logger.info(f"Worker {config.cpu} : Container '{container_id}' started")
+
+        result = await _wait(container_id, exited)
         logger.info(f"Worker {config.cpu} : Container '{container.id}' finished")
-        _save_logs(container, config.tmp_dir)
+        await run_blocking(_save_logs, await run_blocking(container.logs), config.tmp_dir)
     finally:
-        container.remove(force=True)
+        # Also kills the container if it timed out
+        await run_blocking(container.remove, force=True)
+
+    return result
+
+
+async def _exec_job(config: RunConfig, pooled: PooledContainer, workdir: str) -> ContainerExit:
+    exec_id = (
+        await run_blocking(
+            client.api.exec_create,
+            pooled.container.id,
+            cmd=_logged(
+                job_command(config),
+                os.path.join(workdir_in_container(config.tmp_dir), _LOGS_FILE_NAME),
+            ),
+            workdir=workdir,
+            user=container_user(),
+            environment={**container_environment(), **config.environment_overrides},
+        )
+    )["Id"]
+    exited = container_events.expect(exec_id, cast(str, pooled.container.id))
+    await run_blocking(client.api.exec_start, exec_id, detach=True)
 
-    # Catch OOM and raise
-    if res["StatusCode"] == 137:
-        raise ContainerOOMError
+    try:
+        result = await _wait(exec_id, exited)
+    except TimeoutError:
+        # Killing the container stops the job and makes sure it is not reused
+        await run_blocking(container_pool.kill, config.cpu)
+        raise
+
+    logger.info(f"Worker {config.cpu} : Job in container '{pooled.container.id}' finished")
+    return result
+
+
+async def _run_in_pooled_container(config: RunConfig) -> ContainerExit:
+    pooled = await run_blocking(container_pool.acquire, config.language, config.cpu)
+    workdir = job_workdir(config)
+    logger.info(
+        f"Worker {config.cpu} : Running job in warm container '{pooled.container.id}'\n"
+        f"Path in container: {workdir}"
+    )
+
+    reusable = False
+    # The container only has its own directory mounted, the job directory is moved in there
+    job_dir = os.path.join(pooled.slot, os.path.basename(config.tmp_dir))
+    try:
+        await run_blocking(os.rename, config.tmp_dir, job_dir)
+        try:
+            result = await _exec_job(config, pooled, workdir)
+        finally:
+            await run_blocking(os.rename, job_dir, config.tmp_dir)
+        reusable = not result.oom and result.exit_code != 137
+    finally:
+        await run_blocking(container_pool.release, pooled, reusable)
+
+    return result
 
 
 async def run(config: RunConfig) -> None:
     """
-    Runs the Docker container. On function exit, the container will either have finished running
-    or will have crashed.
-    :returns: Container
+    Runs the job in a Docker container. On function exit, the job will either have finished
+    running or will have crashed; a job that takes too long is killed.
+    Waiting takes no thread, the exit comes from the Docker event stream
     :raises CpuOutOfRangeError: if CPU number does not exist on host system
     :raises asyncio.TimeoutError: if container took too long
     :raises docker.APIError: if Docker ran into problems
     :raises ContainerOOMError: if container out of maximum allowed memory
     """
-    async with asyncio.timeout(settings.TIME_LIMIT_SEC):
-        return await asyncio.to_thread(_run_and_wait_container, config)
+    if settings.CONTAINER_POOL_ENABLED:
+        result = await _run_in_pooled_container(config)
+    else:
+        result = await _run_container(config)
+
+    # Catch OOM and raise
+    if result.oom or result.exit_code == 137:
+        raise ContainerOOMError
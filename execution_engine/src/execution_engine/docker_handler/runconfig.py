@@ -5,8 +5,18 @@ from common.schemas import SubmissionCreate
 
 
 @dataclasses.dataclass
-class RunConfig:
+class RunConfig:  # pylint: disable=too-many-instance-attributes
     tmp_dir: str
     cpu: int
     language: LanguageInfo
     origin_request: SubmissionCreate
+    compile_cache_key: str | None = None  # None if the build can't be cached
+    compile_cache_hit: bool = False
+    result_key: str | None = None  # None if result memoization is off
+    # Layer with the framework files, held until clean-up since the job is graded against its
+    # test data and not the copy in the job directory
+    framework_layer: str | None = None
+    # Shared copy of the framework files, None unless jobs run in a tmpfs work directory
+    framework_dir: str | None = None
+    # Overrides of the environment variables read by the run script
+    environment_overrides: dict[str, str] = dataclasses.field(default_factory=dict)
@@ -2,12 +2,16 @@ import os
 
 import docker
 
+from execution_engine.docker_handler.events import ContainerEvents
+
 
 def shutdown():
+    container_events.stop()
     client.close()
 
 
 client = docker.from_env()  # pylint: disable=c-extension-no-member
+container_events = ContainerEvents(client)
 
 host_uid = os.getuid()
 host_gid = os.getgid()
@@ -35,6 +35,14 @@ class TestsFailedError(BaseEngineException):
     __test__ = False  # Let pytest know that this is not a test class
 
 
+class TestCaseTimeoutError(BaseEngineException):
+    """
+    A test case used more than its CPU time limit
+    """
+
+    __test__ = False  # Let pytest know that this is not a test class
+
+
 class ParseError(BaseEngineException):
     """
     Parsing timing output failed
@@ -0,0 +1,72 @@
+"""
+Runs the calibration of the worker CPUs, see `measurement.calibration`. A CPU is only calibrated
+while no job runs on it: it is taken out of the scheduler pool for the duration, and busy CPUs are
+left for the next round.
+"""
+
+import asyncio
+
+from loguru import logger
+
+from execution_engine.config import settings
+from execution_engine.executor import scheduler
+from execution_engine.measurement.calibration import calibrator, run_kernel
+from execution_engine.scheduling.topology import detect_layout
+
+
+async def _calibrate(cpu: int) -> list[float]:
+    """
+    The samples of the kernel on the CPU, none if it failed
+    """
+    try:
+        return await run_kernel(
+            settings.CALIBRATION_KERNEL_PATH,
+            cpu,
+            settings.CALIBRATION_SAMPLES,
+            settings.CALIBRATION_SAMPLE_ITERATIONS,
+            settings.CALIBRATION_TIMEOUT_SEC,
+        )
+    except (OSError, RuntimeError, TimeoutError, ValueError) as e:
+        # The previous baseline, if any, stays in use
+        logger.warning(f"Could not calibrate CPU {cpu}: {e!r}")
+        return []
+
+
+async def calibrate_idle_cpus() -> None:
+    """
+    Calibrates all worker CPUs that are idle at the same time, like they are loaded when every
+    CPU runs a job, and applies the resulting exclusions
+    """
+    worker_cpus = detect_layout().worker_cpus
+    cpus = [cpu for cpu in worker_cpus if scheduler.take_idle_cpu(cpu)]
+    try:
+        results = await asyncio.gather(*(_calibrate(cpu) for cpu in cpus))
+        samples = {cpu: cpu_samples for cpu, cpu_samples in zip(cpus, results) if cpu_samples}
+        # Only a round with every worker CPU can start a new epoch
+        calibrator.record(samples, complete=len(samples) == len(worker_cpus))
+    finally:
+        # Excluded first, so a noisy CPU isn't handed to a waiting job
+        excluded = calibrator.excluded()
+        scheduler.exclude(excluded)
+        for cpu in cpus:
+            scheduler.release_cpu(cpu)
+
+    logger.info(
+        f"Calibrated CPUs {cpus}"
+        + (f", excluded noisy CPUs {sorted(excluded)}" if excluded else "")
+    )
+
+
+async def _recalibrate() -> None:
+    while True:
+        await asyncio.sleep(settings.CALIBRATION_INTERVAL_SEC)
+        await calibrate_idle_cpus()
+
+
+async def start() -> asyncio.Task[None]:
+    """
+    Calibrates all CPUs, to be called before jobs start so they are all idle, and returns the task
+    that recalibrates every CALIBRATION_INTERVAL_SEC
+    """
+    await calibrate_idle_cpus()
+    return asyncio.create_task(_recalibrate())
@@ -1,18 +1,9 @@
-import httpx
 from loguru import logger
 
 from common.schemas import SubmissionResult
-from execution_engine.config import settings
+from execution_engine.jobs.result_writer import result_writer
 
 
 async def result_to_db(res: SubmissionResult):
     logger.info(f"Task finished, result:\n{res}")
-
-    async with httpx.AsyncClient() as client:
-        send_result = await client.post(
-            f"{settings.DB_HANDLER_URL}/api/write-submission-result",
-            content=res.model_dump_json(),
-            headers={"Content-Type": "application/json"},
-        )
-
-        send_result.raise_for_status()
+    await result_writer.submit(res)
@@ -10,23 +10,58 @@ import docker.errors  # pylint: disable=import-error, no-name-in-module
 from loguru import logger
 
 from common.languages import language_info
-from common.schemas import SubmissionCreate, SubmissionResult
+from common.schemas import SubmissionCreate, SubmissionResult, TestCaseResult
 from common.typing import ErrorReason
+from execution_engine.blocking import run_blocking
+from execution_engine.config import settings
 from execution_engine.docker_handler.clean import clean_env
-from execution_engine.docker_handler.gather import gather_results
-from execution_engine.docker_handler.prepare import setup_env
+from execution_engine.docker_handler.gather import (
+    gather_phase_timings,
+    gather_results,
+    gather_test_cases,
+)
+from execution_engine.docker_handler.prepare import setup_env, store_build
 from execution_engine.docker_handler.runconfig import RunConfig
 from execution_engine.errors.errors import (
     CompileFailedError,
     ContainerOOMError,
     RuntimeFailError,
+    TestCaseTimeoutError,
     TestsFailedError,
 )
+from execution_engine.executor import memoization
 from execution_engine.executor.communication import result_to_db
 from execution_engine.executor.scheduler import schedule_run
+from execution_engine.measurement.calibration import calibrator
+from execution_engine.measurement.measurement import Measurement
+from execution_engine.measurement.phases import PhaseTimer
 
 
-async def entry(request: SubmissionCreate):
+def _successful_result(request: SubmissionCreate, measurement: Measurement) -> SubmissionResult:
+    return SubmissionResult(
+        submission_uuid=request.submission_uuid,
+        runtime_ms=measurement.runtime_s * 1000,
+        emissions_kg=measurement.emissions_kg,
+        energy_usage_kwh=measurement.energy_kwh,
+        runtime_stddev_ms=(
+            measurement.runtime_stddev_s * 1000
+            if measurement.runtime_stddev_s is not None
+            else None
+        ),
+        sample_count=measurement.sample_count,
+        cpu_time_ms=measurement.cpu_time_s * 1000 if measurement.cpu_time_s is not None else None,
+        memory_peak_mb=(
+            measurement.memory_peak_bytes / 2**20
+            if measurement.memory_peak_bytes is not None
+            else None
+        ),
+        successful=True,
+        error_reason=None,
+        error_msg="",
+    )
+
+
+async def entry(request: SubmissionCreate):  # pylint: disable=too-many-branches,too-many-statements
     try:
         # If any error occurs here, we log and do nothing
 
@@ -53,22 +88,45 @@ async def entry(request: SubmissionCreate):
         error_msg="",
     )
 
-    try:
-        await setup_env(config, request.code)
-        await schedule_run(config)
+    timer = PhaseTimer()
+    cases: list[TestCaseResult] = []
+    cancelled = False
 
-        # Disable pylint until we actually use emissons_co2 variable
-        runtime_s, energy_kwh, emissions_co2 = gather_results(config)  # pylint: disable=W0612
-
-        res = SubmissionResult(
-            submission_uuid=request.submission_uuid,
-            runtime_ms=runtime_s * 1000,
-            emissions_kg=emissions_co2,
-            energy_usage_kwh=energy_kwh,
-            successful=True,
-            error_reason=None,
-            error_msg="",
-        )
+    try:
+        with timer.phase("setup"):
+            await setup_env(config, request.code)
+
+        stored = await run_blocking(memoization.lookup, config)
+        if stored is not None and settings.RESULT_MEMOIZATION_MODE == "reuse":
+            res = stored
+            return  # Result is reported in `finally`
+
+        try:
+            await schedule_run(config)
+        finally:
+            timer.timings.update(await run_blocking(gather_phase_timings, config))
+            cases = await run_blocking(gather_test_cases, config)
+
+        await run_blocking(store_build, config)
+
+        measurement = calibrator.normalize(config.cpu, await run_blocking(gather_results, config))
+        # The output was graded as a whole and passed, so every test case did
+        cases = [case.model_copy(update={"passed": True}) for case in cases]
+
+        res = _successful_result(request, measurement)
+        resolved = await run_blocking(memoization.resolve, config, stored, res)
+        if resolved is not None:
+            res = resolved
+        else:
+            # The sample didn't confirm the stored result, so the job is measured again in full
+            await run_blocking(memoization.measure_fully, config)
+            await schedule_run(config)
+            timer.timings.update(await run_blocking(gather_phase_timings, config))
+            measurement = calibrator.normalize(
+                config.cpu, await run_blocking(gather_results, config)
+            )
+            res = _successful_result(request, measurement)
+            await run_blocking(memoization.resolve, config, None, res)  # Stores it
 
     except TestsFailedError as e:
         res = SubmissionResult(
@@ -103,6 +161,17 @@ async def entry(request: SubmissionCreate):
             error_msg=e.msg,
         )
 
+    except TestCaseTimeoutError as e:
+        res = SubmissionResult(
+            submission_uuid=request.submission_uuid,
+            runtime_ms=0.00,
+            emissions_kg=0.0,
+            energy_usage_kwh=0.0,
+            successful=False,
+            error_reason=ErrorReason.TIMEOUT,
+            error_msg=e.msg,
+        )
+
     except asyncio.TimeoutError:
         res = SubmissionResult(
             submission_uuid=request.submission_uuid,
@@ -125,6 +194,11 @@ async def entry(request: SubmissionCreate):
             error_msg="",  # Can be parsed front-end
         )
 
+    except asyncio.CancelledError:
+        # Shutdown or the dispatcher cancelled the job, the job queue replays it later
+        cancelled = True
+        raise
+
     except (docker.errors.APIError, Exception) as e:  # pylint: disable=W0718, I1101
         logger.error(f"Exception during execution: {e}", exc_info=True)
         logger.error(f"Traceback: {traceback.format_exc()}")
@@ -140,6 +214,24 @@ async def entry(request: SubmissionCreate):
         )
 
     finally:
-        await result_to_db(res)
-
-        clean_env(config)
+        # Clean up before reporting so the teardown can be reported as well
+        with timer.phase("teardown"):
+            try:
+                await run_blocking(clean_env, config)
+            except OSError as e:
+                logger.error(f"Could not clean up {config.tmp_dir}: {e}")
+
+        # Nothing is reported for a cancelled job, since it will run again
+        if not cancelled:
+            res.phase_timings = timer.timings
+            if cases:
+                res.test_cases = cases
+            logger.info(
+                f"Phase timings for {request.submission_uuid}: "
+                + ", ".join(
+                    f"{name} {timing.wall_ms:.0f}ms wall / {timing.cpu_ms:.0f}ms cpu"
+                    for name, timing in timer.timings.items()
+                )
+            )
+
+            await result_to_db(res)
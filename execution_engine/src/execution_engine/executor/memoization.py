@@ -0,0 +1,69 @@
+"""
+Glue between the executor and the result store, see `cache/result_store.py`
+"""
+
+import os
+
+from loguru import logger
+
+from common.schemas import SubmissionResult
+from execution_engine.cache.result_store import confirms, result_store
+from execution_engine.config import settings
+from execution_engine.docker_handler.options import sample_environment
+from execution_engine.docker_handler.runconfig import RunConfig
+
+
+def lookup(config: RunConfig) -> SubmissionResult | None:
+    """
+    Returns the stored result of an identical job, if any. In sample mode, the job is set up to
+    only take a few samples to confirm it
+    """
+    if config.result_key is None:
+        return None
+
+    stored = result_store.get(config.result_key)
+    if stored is None:
+        return None
+
+    logger.info(f"Found memoized result for {config.origin_request.submission_uuid}")
+    if settings.RESULT_MEMOIZATION_MODE == "sample":
+        config.environment_overrides.update(sample_environment())
+
+    return stored.model_copy(update={"submission_uuid": config.origin_request.submission_uuid})
+
+
+def resolve(
+    config: RunConfig, stored: SubmissionResult | None, measured: SubmissionResult
+) -> SubmissionResult | None:
+    """
+    Decides which result to report after a job was measured. A full measurement is stored, a
+    sampled one only confirms the stored result or invalidates it
+    :returns: The result to report, or None if the sample did not confirm the stored result; the
+        job then has to be measured in full, see `measure_fully`
+    """
+    if config.result_key is None:
+        return measured
+
+    if stored is None:
+        result_store.put(config.result_key, measured)
+        return measured
+
+    if confirms(stored, measured):
+        return stored
+
+    logger.info(f"Memoized result of {config.origin_request.submission_uuid} not confirmed")
+    result_store.discard(config.result_key)
+    return None
+
+
+def measure_fully(config: RunConfig) -> None:
+    """
+    Sets up a sampled job to be run again with a full measurement
+    """
+    for name in sample_environment():
+        config.environment_overrides.pop(name, None)
+
+    # The run script appends to it, the timings of the full run replace those of the sample
+    phases_file = os.path.join(config.tmp_dir, settings.PHASES_FILE_NAME)
+    if os.path.exists(phases_file):
+        os.remove(phases_file)
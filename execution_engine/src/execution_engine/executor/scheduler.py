@@ -1,25 +1,127 @@
 import asyncio
-import os
+import time
 
+from execution_engine.config import settings
 from execution_engine.docker_handler import run
 from execution_engine.docker_handler.runconfig import RunConfig
+from execution_engine.scheduling.policies import JobKind, PriorityLanes, RuntimeHistory, Waiter
+from execution_engine.scheduling.topology import detect_layout
 
-_N_WORKERS = os.cpu_count()
-_WORKER_QUEUE: asyncio.Queue[int] = asyncio.Queue()
+_FREE_CPUS: list[int] = []
+# Too noisy to measure on according to the calibration, held back from jobs
+_EXCLUDED_CPUS: set[int] = set()
+_PARKED_CPUS: list[int] = []
+
+_history = RuntimeHistory()
+_waiting = PriorityLanes(settings.SCHEDULER_POLICY, _history)
 
 
 def init():
-    for worker_id in range(_N_WORKERS):
-        _WORKER_QUEUE.put_nowait(worker_id)
+    # Fail on startup instead of on the first job that has to wait
+    if settings.SCHEDULER_POLICY not in ("fifo", "fair", "sjf"):
+        raise ValueError(f"Unknown scheduler policy: {settings.SCHEDULER_POLICY}")
+
+    _FREE_CPUS.extend(detect_layout().worker_cpus)
+
+
+def free_cpus() -> int:
+    return len(_FREE_CPUS)
+
+
+def usable_cpus() -> list[int]:
+    """
+    Worker CPUs that are not excluded
+    """
+    return [cpu for cpu in detect_layout().worker_cpus if cpu not in _EXCLUDED_CPUS]
+
+
+def take_idle_cpu(cpu_id: int) -> bool:
+    """
+    Takes the CPU out of the pool if no job runs on it, give it back with `release_cpu`
+    """
+    for idle in (_FREE_CPUS, _PARKED_CPUS):
+        if cpu_id in idle:
+            idle.remove(cpu_id)
+            return True
+    return False
+
+
+def exclude(cpu_ids: set[int]):
+    """
+    Holds the CPUs back from jobs from now on, and returns the previously excluded others to the
+    pool. CPUs that are busy are held back once their job is done
+    """
+    _EXCLUDED_CPUS.clear()
+    _EXCLUDED_CPUS.update(cpu_ids)
+
+    for cpu_id in [cpu for cpu in _FREE_CPUS if cpu in _EXCLUDED_CPUS]:
+        _FREE_CPUS.remove(cpu_id)
+        _PARKED_CPUS.append(cpu_id)
+
+    for cpu_id in [cpu for cpu in _PARKED_CPUS if cpu not in _EXCLUDED_CPUS]:
+        _PARKED_CPUS.remove(cpu_id)
+        _release(cpu_id)
+
+
+def _kind(config: RunConfig) -> JobKind:
+    return config.origin_request.problem_id, config.language.name
+
+
+def _release(cpu_id: int):
+    """
+    Hands the CPU to the next waiting job chosen by the policy, or marks it free
+    """
+    if cpu_id in _EXCLUDED_CPUS:
+        _PARKED_CPUS.append(cpu_id)
+        return
+
+    while _waiting:
+        waiter = _waiting.pop()
+        if not waiter.future.done():  # Skip jobs that were cancelled while waiting
+            waiter.future.set_result(cpu_id)
+            return
+
+    _FREE_CPUS.append(cpu_id)
+
+
+def release_cpu(cpu_id: int):
+    _release(cpu_id)
+
+
+async def _acquire(config: RunConfig) -> int:
+    """
+    Get available worker or wait for one
+    """
+    if _FREE_CPUS and not _waiting:
+        return _FREE_CPUS.pop()
+
+    future: asyncio.Future[int] = asyncio.get_running_loop().create_future()
+    _waiting.push(
+        Waiter(
+            user_uuid=config.origin_request.user_uuid,
+            priority=config.origin_request.priority,
+            kind=_kind(config),
+            future=future,
+        )
+    )
+
+    try:
+        return await future
+    except asyncio.CancelledError:
+        # Don't lose the CPU if it was handed to us right before we were cancelled
+        if future.done() and not future.cancelled():
+            _release(future.result())
+        raise
 
 
 async def schedule_run(config: RunConfig):
-    # Get available worker or wait for one
-    cpu_id = await _WORKER_QUEUE.get()
+    cpu_id = await _acquire(config)
     config.cpu = cpu_id
 
     # Run task and ensure worker return
+    start = time.monotonic()
     try:
         return await run(config)
     finally:
-        _WORKER_QUEUE.put_nowait(cpu_id)
+        _history.record(_kind(config), time.monotonic() - start)
+        _release(cpu_id)
@@ -0,0 +1,15 @@
+"""
+Shared HTTP clients of the engine, opened and closed in the app's lifespan
+"""
+
+from common.http import PooledClient
+from execution_engine.config import settings
+
+db_client = PooledClient(
+    "db_handler",
+    max_connections=settings.HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry_sec=settings.HTTP_KEEPALIVE_EXPIRY_SEC,
+    timeout_sec=settings.HTTP_TIMEOUT_SEC,
+    http2=settings.HTTP2_ENABLED,
+)
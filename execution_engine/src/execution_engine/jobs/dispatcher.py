@@ -0,0 +1,121 @@
+"""
+Takes jobs from the durable queue and hands them to the executor, with a bounded number of jobs in
+flight. Jobs in flight are set up (framework download etc.) while they wait for a CPU, the
+scheduler decides which of them gets a CPU first. On a coordinator, jobs are handed to a worker
+engine instead.
+"""
+
+import asyncio
+import collections
+import time
+from collections.abc import Awaitable, Callable
+
+from loguru import logger
+
+from common.schemas import SubmissionCreate
+from execution_engine import executor
+from execution_engine.blocking import run_blocking
+from execution_engine.cluster.coordinator import coordinator
+from execution_engine.config import settings
+from execution_engine.jobs.store import Job, JobStore
+
+# Number of recent jobs the wait time statistics are computed over
+_WAIT_WINDOW = 100
+
+
+class Dispatcher:
+    def __init__(
+        self,
+        store: JobStore,
+        max_in_flight: int,
+        execute: Callable[[SubmissionCreate], Awaitable[None]],
+    ):
+        self._store = store
+        self._execute = execute
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._wakeup = asyncio.Event()
+        self._tasks: set[asyncio.Task] = set()
+        self._waits_sec: collections.deque[float] = collections.deque(maxlen=_WAIT_WINDOW)
+        self._dispatched = 0
+
+    async def submit(self, request: SubmissionCreate) -> None:
+        """
+        Durably stores a job
+        :raises QueueFullError: if the queue is full
+        :raises sqlite3.Error: if the queue could not be written
+        """
+        await run_blocking(self._store.enqueue, request)
+        self._wakeup.set()
+
+    async def _run_job(self, job: Job) -> None:
+        self._waits_sec.append(time.time() - job.enqueued_at)
+        try:
+            await self._execute(job.request)
+        except asyncio.CancelledError:
+            # Engine is shutting down, the job stays in the queue and is replayed on startup
+            self._slots.release()
+            raise
+        except Exception as e:  # pylint: disable=W0718
+            logger.error(f"Job {job.request.submission_uuid} failed: {e}")
+
+        try:
+            await run_blocking(self._store.complete, job.job_id)
+        finally:
+            self._slots.release()
+
+    async def run(self) -> None:
+        """
+        Dispatches jobs forever, meant to be started as a task. Starts by replaying the jobs that
+        were running when the engine last stopped
+        """
+        requeued = await run_blocking(self._store.requeue_running)
+        if requeued:
+            logger.info(f"Replaying {requeued} jobs that were interrupted")
+
+        while True:
+            await self._slots.acquire()
+
+            # Cleared before claiming, so a job submitted in between still wakes us up
+            self._wakeup.clear()
+            job = await run_blocking(self._store.claim, fair=settings.SCHEDULER_POLICY == "fair")
+            if job is None:
+                self._slots.release()
+                await self._wakeup.wait()
+                continue
+
+            self._dispatched += 1
+            task = asyncio.create_task(self._run_job(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def depth(self) -> tuple[int, int]:
+        """
+        :returns: number of pending and running jobs
+        """
+        return await run_blocking(self._store.depth)
+
+    async def snapshot(self) -> dict[str, float]:
+        pending, running = await self.depth()
+        waits = self._waits_sec
+        return {
+            "pending": pending,
+            "running": running,
+            "max_pending": settings.JOB_QUEUE_MAX_PENDING,
+            "max_in_flight": settings.JOB_QUEUE_MAX_IN_FLIGHT,
+            "dispatched": self._dispatched,
+            "mean_wait_sec": sum(waits) / len(waits) if waits else 0.0,
+            "max_wait_sec": max(waits, default=0.0),
+        }
+
+    def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        self._store.close()
+
+
+dispatcher = Dispatcher(
+    JobStore(settings.JOB_QUEUE_PATH, max_pending=settings.JOB_QUEUE_MAX_PENDING),
+    max_in_flight=settings.JOB_QUEUE_MAX_IN_FLIGHT,
+    # A coordinator forwards its jobs to the worker engines instead of executing them
+    execute=coordinator.forward if settings.ENGINE_ROLE == "coordinator" else executor.entry,
+)
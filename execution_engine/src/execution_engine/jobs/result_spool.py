@@ -0,0 +1,54 @@
+"""
+Durable spool of results that still have to be written to the DB handler.
+A result is stored here before its job is removed from the job queue, and only removed once the DB
+handler has written it, so results survive both a restart of the engine and an outage of the DB.
+"""
+
+import sqlite3
+
+from common.schemas import SubmissionResult
+from execution_engine.sqlite_store import SqliteStore
+
+
+class ResultSpool(SqliteStore):
+    def _create_tables(self, conn: sqlite3.Connection) -> None:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "result_id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "result TEXT NOT NULL)"
+        )
+
+    def add(self, result: SubmissionResult) -> int:
+        """
+        :returns: number of spooled results, including this one
+        """
+        with self._lock, self._connection() as conn:
+            conn.execute("INSERT INTO results (result) VALUES (?)", (result.model_dump_json(),))
+            (pending,) = conn.execute("SELECT COUNT(*) FROM results").fetchone()
+        return pending
+
+    def peek(self, limit: int) -> list[tuple[int, SubmissionResult]]:
+        """
+        :returns: up to `limit` of the oldest results with their ids, they stay in the spool until
+            removed
+        """
+        with self._lock, self._connection() as conn:
+            rows = conn.execute(
+                "SELECT result_id, result FROM results ORDER BY result_id LIMIT ?", (limit,)
+            ).fetchall()
+        return [
+            (result_id, SubmissionResult.model_validate_json(result)) for result_id, result in rows
+        ]
+
+    def remove(self, result_ids: list[int]) -> None:
+        with self._lock, self._connection() as conn:
+            conn.executemany(
+                "DELETE FROM results WHERE result_id = ?",
+                [(result_id,) for result_id in result_ids],
+            )
+
+    def depth(self) -> int:
+        with self._lock, self._connection() as conn:
+            (pending,) = conn.execute("SELECT COUNT(*) FROM results").fetchone()
+        return pending
@@ -0,0 +1,150 @@
+"""
+Writes results back to the DB handler in batches. Results are spooled durably first, and sent once
+RESULT_BATCH_MAX_ITEMS are waiting or the oldest has waited RESULT_BATCH_MAX_DELAY_MS, in one
+request that the DB handler writes in one transaction. If the DB handler can't be reached, the
+batch stays in the spool and is retried with exponential backoff.
+"""
+
+import asyncio
+import contextlib
+from collections.abc import Awaitable, Callable
+from uuid import UUID
+
+import httpx
+from loguru import logger
+
+from common.schemas import SubmissionResult, SubmissionResultBatch, SubmissionResultBatchResponse
+from execution_engine.blocking import run_blocking
+from execution_engine.config import settings
+from execution_engine.http_clients import db_client
+from execution_engine.jobs.result_spool import ResultSpool
+
+
+async def _post_results(results: list[SubmissionResult]) -> list[UUID]:
+    """
+    :returns: the submissions of the results that don't exist in the DB
+    """
+    response = await db_client.client.post(
+        f"{settings.DB_HANDLER_URL}/api/write-submission-results",
+        content=SubmissionResultBatch(results=results).model_dump_json(),
+        headers={"Content-Type": "application/json"},
+        timeout=settings.RESULT_WRITE_TIMEOUT_SEC,
+    )
+    response.raise_for_status()
+    return SubmissionResultBatchResponse.model_validate_json(response.content).missing
+
+
+def _is_permanent(e: httpx.HTTPError) -> bool:
+    """
+    Whether sending the same batch again would fail the same way
+    """
+    return isinstance(e, httpx.HTTPStatusError) and e.response.status_code in (
+        httpx.codes.BAD_REQUEST,
+        httpx.codes.UNPROCESSABLE_ENTITY,
+    )
+
+
+class ResultWriter:  # pylint: disable=too-many-instance-attributes
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        spool: ResultSpool,
+        max_items: int,
+        max_delay_sec: float,
+        retry_interval_sec: float,
+        max_retry_interval_sec: float,
+        send: Callable[[list[SubmissionResult]], Awaitable[list[UUID]]] = _post_results,
+    ):
+        self._spool = spool
+        self._max_items = max_items
+        self._max_delay_sec = max_delay_sec
+        self._retry_interval_sec = retry_interval_sec
+        self._max_retry_interval_sec = max_retry_interval_sec
+        self._send = send
+        self._wakeup = asyncio.Event()
+        self._full = asyncio.Event()
+        self._batches = 0
+        self._written = 0
+        self._failed_flushes = 0
+
+    async def submit(self, res: SubmissionResult) -> None:
+        """
+        Durably spools a result, it is written to the DB with the next batch
+        :raises sqlite3.Error: if the spool could not be written
+        """
+        pending = await run_blocking(self._spool.add, res)
+        self._wakeup.set()
+        if pending >= self._max_items:
+            self._full.set()
+
+    async def flush(self) -> bool:
+        """
+        Sends one batch of the oldest spooled results
+        :returns: False if the DB handler could not be reached, the results are kept
+        """
+        entries = await run_blocking(self._spool.peek, self._max_items)
+        if not entries:
+            return True
+
+        try:
+            missing = await self._send([result for _, result in entries])
+        except httpx.HTTPError as e:
+            if not _is_permanent(e):
+                logger.warning(f"Could not write {len(entries)} results, retrying later: {e!r}")
+                self._failed_flushes += 1
+                return False
+            logger.error(f"DB handler refused {len(entries)} results, dropping them: {e!r}")
+            missing = [result.submission_uuid for _, result in entries]
+
+        if missing:
+            logger.warning(f"Dropping results of unknown submissions: {missing}")
+
+        await run_blocking(self._spool.remove, [result_id for result_id, _ in entries])
+        self._batches += 1
+        self._written += len(entries) - len(missing)
+        return True
+
+    async def run(self) -> None:
+        """
+        Writes batches forever, meant to be started as a task. Results spooled before the engine
+        last stopped are written first
+        """
+        retry_sec = self._retry_interval_sec
+        while True:
+            # Cleared before looking at the spool, so a result spooled in between still wakes us
+            self._wakeup.clear()
+            self._full.clear()
+            pending = await run_blocking(self._spool.depth)
+            if pending == 0:
+                await self._wakeup.wait()
+                continue
+
+            if pending < self._max_items:
+                # Give the batch until the delay runs out to fill up
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._full.wait(), self._max_delay_sec)
+
+            if await self.flush():
+                retry_sec = self._retry_interval_sec
+            else:
+                await asyncio.sleep(retry_sec)
+                retry_sec = min(retry_sec * 2, self._max_retry_interval_sec)
+
+    async def snapshot(self) -> dict[str, int]:
+        return {
+            "pending": await run_blocking(self._spool.depth),
+            "batches": self._batches,
+            "written": self._written,
+            "failed_flushes": self._failed_flushes,
+        }
+
+    def close(self) -> None:
+        self._spool.close()
+
+
+result_writer = ResultWriter(
+    ResultSpool(settings.RESULT_SPOOL_PATH),
+    max_items=settings.RESULT_BATCH_MAX_ITEMS,
+    max_delay_sec=settings.RESULT_BATCH_MAX_DELAY_MS / 1000,
+    retry_interval_sec=settings.RESULT_RETRY_INTERVAL_SEC,
+    max_retry_interval_sec=settings.RESULT_RETRY_MAX_INTERVAL_SEC,
+)
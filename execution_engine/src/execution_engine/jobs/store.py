@@ -0,0 +1,120 @@
+"""
+Durable job queue.
+Accepted submissions are stored in SQLite before the engine acknowledges them, and only removed
+once their result has been reported. Jobs that were running when the engine stopped are picked up
+again on startup.
+"""
+
+import dataclasses
+import sqlite3
+import time
+
+from common.schemas import SubmissionCreate
+from execution_engine.sqlite_store import SqliteStore
+
+
+class QueueFullError(Exception):
+    """
+    The queue holds the maximum number of pending jobs
+    """
+
+
+@dataclasses.dataclass
+class Job:
+    job_id: int
+    request: SubmissionCreate
+    enqueued_at: float
+
+
+class JobStore(SqliteStore):
+    def __init__(self, path: str, max_pending: int):
+        super().__init__(path)
+        self._max_pending = max_pending
+
+    def _create_tables(self, conn: sqlite3.Connection) -> None:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "submission_uuid TEXT NOT NULL UNIQUE, "
+            "user_uuid TEXT NOT NULL, "
+            "priority INTEGER NOT NULL, "
+            "request TEXT NOT NULL, "
+            "enqueued_at REAL NOT NULL, "
+            "running INTEGER NOT NULL DEFAULT 0)"
+        )
+
+    def enqueue(self, request: SubmissionCreate) -> None:
+        """
+        Stores a new job. A job for a submission that is already queued is ignored
+        :raises QueueFullError: if the maximum number of pending jobs is reached
+        """
+        with self._lock, self._connection() as conn:
+            (pending,) = conn.execute("SELECT COUNT(*) FROM jobs WHERE running = 0").fetchone()
+            if pending >= self._max_pending:
+                raise QueueFullError
+
+            conn.execute(
+                "INSERT OR IGNORE INTO jobs "
+                "(submission_uuid, user_uuid, priority, request, enqueued_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    str(request.submission_uuid),
+                    str(request.user_uuid),
+                    request.priority,
+                    request.model_dump_json(),
+                    time.time(),
+                ),
+            )
+
+    def claim(self, fair: bool = False) -> Job | None:
+        """
+        Marks the next pending job as running and returns it. Jobs with the highest priority go
+        first, then the oldest job. If `fair`, the job of the user with the fewest running jobs
+        goes before the oldest job
+        """
+        fair_order = (
+            "(SELECT COUNT(*) FROM jobs AS r WHERE r.user_uuid = j.user_uuid AND r.running = 1), "
+            if fair
+            else ""
+        )
+        with self._lock, self._connection() as conn:
+            row = conn.execute(
+                "SELECT job_id, request, enqueued_at FROM jobs AS j WHERE running = 0 "
+                f"ORDER BY priority DESC, {fair_order}job_id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+
+            job_id, request, enqueued_at = row
+            conn.execute("UPDATE jobs SET running = 1 WHERE job_id = ?", (job_id,))
+
+        return Job(
+            job_id=job_id,
+            request=SubmissionCreate.model_validate_json(request),
+            enqueued_at=enqueued_at,
+        )
+
+    def complete(self, job_id: int) -> None:
+        with self._lock, self._connection() as conn:
+            conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+    def requeue_running(self) -> int:
+        """
+        Makes jobs that were running when the engine stopped pending again
+        :returns: number of requeued jobs
+        """
+        with self._lock, self._connection() as conn:
+            return conn.execute("UPDATE jobs SET running = 0 WHERE running = 1").rowcount
+
+    def depth(self) -> tuple[int, int]:
+        """
+        :returns: number of pending and running jobs
+        """
+        with self._lock:
+            rows = dict(
+                self._connection()
+                .execute("SELECT running, COUNT(*) FROM jobs GROUP BY running")
+                .fetchall()
+            )
+        return rows.get(0, 0), rows.get(1, 0)
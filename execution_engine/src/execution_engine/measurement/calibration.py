@@ -0,0 +1,196 @@
+"""
+Calibration of the worker CPUs. A fixed native reference kernel (kernel.c) is timed on every worker
+CPU; the mean CPU time gives the speed of the core relative to a reference, the spread how noisy it
+is. Measurements are divided by the factor of the core they ran on, so a job is not ranked higher
+or lower for landing on a faster or slower core, and cores that are too noisy are kept out of the
+scheduler pool until a later calibration finds them quiet again.
+
+The reference is the median of the quiet cores of the first complete calibration of an epoch, and
+stays fixed until the next epoch, so the factors of a core don't move with the others.
+"""
+
+import asyncio
+import dataclasses
+import statistics
+import time
+
+from loguru import logger
+
+from execution_engine.config import settings
+from execution_engine.measurement.measurement import Measurement
+
+
+@dataclasses.dataclass
+class CoreBaseline:
+    cpu: int
+    mean_s: float  # CPU time of one sample of the kernel
+    stddev_s: float
+    samples: int
+    calibrated_at: float
+    # Relative to the reference of the epoch, >1 is slower
+    factor: float = 1.0
+    excluded: bool = False
+
+    @property
+    def noise(self) -> float:
+        """
+        Coefficient of variation of the samples
+        """
+        return self.stddev_s / self.mean_s if self.mean_s > 0 else float("inf")
+
+
+def baseline(cpu: int, samples: list[float]) -> CoreBaseline:
+    """
+    :raises ValueError: without samples
+    """
+    if not samples:
+        raise ValueError(f"No calibration samples for CPU {cpu}")
+    return CoreBaseline(
+        cpu=cpu,
+        mean_s=statistics.fmean(samples),
+        stddev_s=statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        samples=len(samples),
+        calibrated_at=time.time(),
+    )
+
+
+def _quiet(baselines: dict[int, CoreBaseline], max_noise: float) -> list[CoreBaseline]:
+    """
+    The cores at most `max_noise` noisy, or all of them if every core is noisy, so there is always a
+    core to run jobs on
+    """
+    quiet = [b for b in baselines.values() if b.noise <= max_noise]
+    if not quiet:
+        logger.warning("All CPUs are noisier than the calibration threshold, excluding none")
+        return list(baselines.values())
+    return quiet
+
+
+def reference(baselines: dict[int, CoreBaseline], max_noise: float) -> float:
+    """
+    The median CPU time of the kernel on the quiet cores
+    """
+    return statistics.median(b.mean_s for b in _quiet(baselines, max_noise))
+
+
+def plan(baselines: dict[int, CoreBaseline], max_noise: float, reference_s: float) -> None:
+    """
+    Sets the factor of every core relative to the reference, and excludes the noisy ones
+    """
+    quiet_cpus = {b.cpu for b in _quiet(baselines, max_noise)}
+    for b in baselines.values():
+        b.factor = b.mean_s / reference_s if reference_s > 0 else 1.0
+        b.excluded = b.cpu not in quiet_cpus
+
+
+async def run_kernel(
+    kernel: str, cpu: int, samples: int, iterations: int, timeout_sec: float
+) -> list[float]:
+    """
+    Times the reference kernel on the CPU, in a process of its own
+    :param kernel: Path of the binary built from kernel.c
+    :raises OSError: if the kernel can't be started
+    :raises RuntimeError: if the kernel failed
+    :raises TimeoutError: if it took longer than `timeout_sec`
+    """
+    process = await asyncio.create_subprocess_exec(
+        kernel,
+        str(cpu),
+        str(samples),
+        str(iterations),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        async with asyncio.timeout(timeout_sec):
+            stdout, stderr = await process.communicate()
+    except TimeoutError:
+        process.kill()
+        await process.wait()
+        raise
+
+    if process.returncode != 0:
+        raise RuntimeError(f"Calibration kernel failed on CPU {cpu}: {stderr.decode().strip()}")
+    # The first sample warms up
+    return [float(line) for line in stdout.decode().split()[1:]]
+
+
+class Calibrator:
+    def __init__(self, max_noise: float, normalize: bool, epoch_sec: float):
+        """
+        :param max_noise: Cores with a higher coefficient of variation are excluded
+        :param normalize: Whether measurements are divided by the factor of their core
+        :param epoch_sec: How long the reference is kept before the next complete calibration
+            replaces it
+        """
+        self._max_noise = max_noise
+        self._normalize = normalize
+        self._epoch_sec = epoch_sec
+        self._baselines: dict[int, CoreBaseline] = {}
+        self._reference_s: float | None = None
+        self._epoch_started_at = 0.0
+
+    def record(self, samples: dict[int, list[float]], complete: bool) -> None:
+        """
+        Stores new baselines of the CPUs calibrated in one round, and updates the factors and
+        exclusions of all cores. A complete round, with every worker CPU, starts a new epoch if
+        there is no reference yet or the epoch is over; otherwise the reference stays
+        :raises ValueError: if a CPU has no samples, nothing is recorded then
+        """
+        baselines = {cpu: baseline(cpu, cpu_samples) for cpu, cpu_samples in samples.items()}
+        self._baselines.update(baselines)
+        if not self._baselines:
+            return
+
+        now = time.time()
+        if self._reference_s is None or (
+            complete and now - self._epoch_started_at >= self._epoch_sec
+        ):
+            self._reference_s = reference(self._baselines, self._max_noise)
+            self._epoch_started_at = now
+            logger.info(f"New calibration epoch, reference {self._reference_s:.6f}s")
+        plan(self._baselines, self._max_noise, self._reference_s)
+
+    def excluded(self) -> set[int]:
+        return {cpu for cpu, b in self._baselines.items() if b.excluded}
+
+    def normalize(self, cpu: int, measurement: Measurement) -> Measurement:
+        """
+        Divides the time based parts of a measurement on the CPU by its factor. A factor within the
+        noise of the reference kernel on the core is no real difference in speed, and the
+        measurement is left as it is
+        """
+        b = self._baselines.get(cpu)
+        if not self._normalize or b is None or abs(b.factor - 1.0) <= b.noise:
+            return measurement
+
+        factor = b.factor
+        return dataclasses.replace(
+            measurement,
+            runtime_s=measurement.runtime_s / factor,
+            energy_kwh=measurement.energy_kwh / factor,
+            emissions_kg=measurement.emissions_kg / factor,
+            cpu_time_s=(
+                measurement.cpu_time_s / factor if measurement.cpu_time_s is not None else None
+            ),
+            runtime_stddev_s=(
+                measurement.runtime_stddev_s / factor
+                if measurement.runtime_stddev_s is not None
+                else None
+            ),
+        )
+
+    def epoch(self) -> dict[str, float | None]:
+        return {"reference_s": self._reference_s, "started_at": self._epoch_started_at}
+
+    def snapshot(self) -> list[dict[str, float | int | bool]]:
+        return [
+            {**dataclasses.asdict(b), "noise": b.noise} for _, b in sorted(self._baselines.items())
+        ]
+
+
+calibrator = Calibrator(
+    max_noise=settings.CALIBRATION_MAX_NOISE,
+    normalize=settings.CALIBRATION_NORMALIZE,
+    epoch_sec=settings.CALIBRATION_EPOCH_SEC,
+)
@@ -0,0 +1,18 @@
+"""
+Converts measured CPU time into an energy and emissions estimate.
+See analysis/energy_considerations.md: since every job runs on a dedicated core, we estimate
+energy as (CPU TDP / number of physical cores) * CPU time
+"""
+
+from execution_engine.config import settings
+
+_JOULES_PER_KWH = 3.6e6
+
+
+def cpu_seconds_to_kwh(cpu_seconds: float) -> float:
+    watts_per_core = settings.CPU_TDP_WATTS / settings.CPU_PHYSICAL_CORES
+    return watts_per_core * cpu_seconds / _JOULES_PER_KWH
+
+
+def kwh_to_emissions_kg(energy_kwh: float) -> float:
+    return energy_kwh * settings.CARBON_INTENSITY_KG_PER_KWH
@@ -0,0 +1,60 @@
+/*
+ * Reference kernel of the CPU calibration, see calibration.py. Pins itself to the CPU, then prints
+ * the CPU time in seconds of every sample of a fixed integer workload, one per line. The first
+ * sample warms up and is printed as well.
+ *
+ * Usage: calibration_kernel <cpu> <samples> <iterations per sample>
+ * Built with: gcc -O2 -o calibration_kernel kernel.c
+ */
+
+#define _GNU_SOURCE
+#include <sched.h>
+#include <stdint.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <time.h>
+
+/* Written on every sample, so the workload can't be optimized away */
+static volatile uint64_t sink;
+
+static double cpu_time(void) {
+    struct timespec ts;
+    clock_gettime(CLOCK_THREAD_CPUTIME_ID, &ts);
+    return (double)ts.tv_sec + (double)ts.tv_nsec / 1e9;
+}
+
+int main(int argc, char **argv) {
+    if (argc != 4) {
+        fprintf(stderr, "usage: %s <cpu> <samples> <iterations>\n", argv[0]);
+        return 2;
+    }
+    int cpu = atoi(argv[1]);
+    long samples = atol(argv[2]);
+    long iterations = atol(argv[3]);
+
+    if (cpu < 0 || cpu >= CPU_SETSIZE) {
+        fprintf(stderr, "invalid CPU %d\n", cpu);
+        return 1;
+    }
+    cpu_set_t set;
+    CPU_ZERO(&set);
+    CPU_SET(cpu, &set);
+    if (sched_setaffinity(0, sizeof(set), &set) != 0) {
+        perror("sched_setaffinity");
+        return 1;
+    }
+
+    for (long sample = 0; sample <= samples; sample++) {
+        double start = cpu_time();
+        /* xorshift, a dependency chain of integer operations without memory accesses */
+        uint64_t x = 88172645463325252ULL;
+        for (long i = 0; i < iterations; i++) {
+            x ^= x << 13;
+            x ^= x >> 7;
+            x ^= x << 17;
+        }
+        sink = x;
+        printf("%.9f\n", cpu_time() - start);
+    }
+    return 0;
+}
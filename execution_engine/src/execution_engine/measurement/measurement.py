@@ -0,0 +1,19 @@
+import dataclasses
+
+
+@dataclasses.dataclass
+class Measurement:
+    """
+    Measured cost of a single run of a submission
+    """
+
+    runtime_s: float
+    energy_kwh: float
+    emissions_kg: float
+    # User and system CPU time per run
+    cpu_time_s: float | None = None
+    # Only known when the runtime was sampled repeatedly
+    runtime_stddev_s: float | None = None
+    sample_count: int | None = None
+    # Of the container in cgroup mode, of the measured process in time mode
+    memory_peak_bytes: int | None = None
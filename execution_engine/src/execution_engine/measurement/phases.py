@@ -0,0 +1,27 @@
+import contextlib
+import time
+from typing import Iterator
+
+from common.schemas import PhaseTiming
+
+
+class PhaseTimer:
+    """
+    Times the phases of a job that run inside the engine itself.
+    CPU time is that of the whole engine process, so it includes work for concurrent jobs
+    """
+
+    def __init__(self):
+        self.timings: dict[str, PhaseTiming] = {}
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            self.timings[name] = PhaseTiming(
+                wall_ms=(time.perf_counter() - wall_start) * 1000,
+                cpu_ms=(time.process_time() - cpu_start) * 1000,
+            )
@@ -0,0 +1,29 @@
+import dataclasses
+import math
+import statistics
+
+
+@dataclasses.dataclass
+class SampleStats:
+    mean: float
+    stddev: float
+    count: int
+
+    @property
+    def relative_error(self) -> float:
+        """
+        Half width of the 95% confidence interval of the mean, relative to the mean
+        """
+        if self.count < 2 or self.mean == 0:
+            return math.inf
+        return 1.96 * self.stddev / math.sqrt(self.count) / self.mean
+
+
+def summarize(samples: list[tuple[int, float, float]]) -> SampleStats:
+    """
+    Mean and sample standard deviation of the user CPU time per run, in seconds.
+    Every sample weighs the same, regardless of how many runs it was batched over
+    """
+    per_run = [user / runs for runs, user, _ in samples]
+    stddev = statistics.stdev(per_run) if len(per_run) > 1 else 0.0
+    return SampleStats(mean=statistics.fmean(per_run), stddev=stddev, count=len(per_run))
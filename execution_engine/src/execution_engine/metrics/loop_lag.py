@@ -0,0 +1,45 @@
+"""
+Measures how late the event loop wakes up a sleeping task. Any blocking call on the loop shows up
+directly as lag, and with it as latency of every request the engine serves.
+"""
+
+import asyncio
+import time
+
+from execution_engine.config import settings
+
+
+class LoopLagMonitor:
+    def __init__(self, interval_sec: float):
+        self._interval_sec = interval_sec
+        self._samples = 0
+        self._last_ms = 0.0
+        self._max_ms = 0.0
+        self._total_ms = 0.0
+
+    def record(self, lag_ms: float) -> None:
+        self._samples += 1
+        self._last_ms = lag_ms
+        self._max_ms = max(self._max_ms, lag_ms)
+        self._total_ms += lag_ms
+
+    async def run(self) -> None:
+        """
+        Samples the lag forever, meant to be started as a task
+        """
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self._interval_sec)
+            elapsed_sec = time.perf_counter() - start
+            self.record(max(0.0, elapsed_sec - self._interval_sec) * 1000)
+
+    def snapshot(self) -> dict[str, float]:
+        return {
+            "samples": self._samples,
+            "last_ms": self._last_ms,
+            "max_ms": self._max_ms,
+            "mean_ms": self._total_ms / self._samples if self._samples else 0.0,
+        }
+
+
+loop_lag_monitor = LoopLagMonitor(interval_sec=settings.LOOP_LAG_SAMPLE_INTERVAL_SEC)
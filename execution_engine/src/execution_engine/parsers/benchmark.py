@@ -0,0 +1,35 @@
+from execution_engine.errors.errors import ParseError
+
+
+def parse(file: str) -> list[tuple[int, float, float]]:
+    """
+    Parses the report written by the framework's benchmark and adaptive modes.
+    Every line after the header is one sample "<runs> <user usec> <system usec>", where the CPU
+    times are the total over <runs> runs of the program.
+    :param file: Path to file
+    :return: List of number of runs, user and system CPU time in seconds of every sample
+    :raises ParseError: if the report is malformed or contains no samples
+    """
+    samples: list[tuple[int, float, float]] = []
+
+    with open(file) as report:
+        next(report, None)  # Header
+
+        for line in report:
+            if not line.strip():
+                continue
+
+            try:
+                runs, user_usec, system_usec = (int(value) for value in line.split())
+            except ValueError as e:
+                raise ParseError(f"Malformed benchmark line: '{line.strip()}'") from e
+
+            if runs < 1:
+                raise ParseError(f"Sample without runs: '{line.strip()}'")
+
+            samples.append((runs, user_usec / 1e6, system_usec / 1e6))
+
+    if not samples:
+        raise ParseError("Benchmark report contains no samples")
+
+    return samples
@@ -0,0 +1,37 @@
+from execution_engine.errors.errors import ParseError
+
+
+def parse(file: str) -> tuple[int, float, float]:
+    """
+    Parses the cgroup snapshots written by the framework's cgroup mode.
+    Every line is "<snapshot> <key> <value>": the number of runs as "measured runs <runs>", and the
+    container's cgroup v2 `cpu.stat` before and after the runs.
+    :param file: Path to file
+    :return: Number of runs, and user and system CPU time in seconds of all runs together
+    :raises ParseError: if the report is malformed or a snapshot is missing
+    """
+    snapshots: dict[str, dict[str, int]] = {"measured": {}, "before": {}, "after": {}}
+
+    with open(file) as report:
+        # Blank lines are skipped
+        for line in filter(str.strip, report):
+            try:
+                snapshot, key, value = line.split()
+                snapshots[snapshot][key] = int(value)
+            except (ValueError, KeyError) as e:
+                raise ParseError(f"Malformed cgroup line: '{line.strip()}'") from e
+
+    before, after = snapshots["before"], snapshots["after"]
+    try:
+        runs = snapshots["measured"]["runs"]
+        user_usec = after["user_usec"] - before["user_usec"]
+        system_usec = after["system_usec"] - before["system_usec"]
+    except KeyError as e:
+        raise ParseError(f"Cgroup report without {e}") from e
+
+    if runs < 1:
+        raise ParseError("Cgroup report without runs")
+    if user_usec < 0 or system_usec < 0:
+        raise ParseError("Cgroup CPU time went backwards")
+
+    return runs, user_usec / 1e6, system_usec / 1e6
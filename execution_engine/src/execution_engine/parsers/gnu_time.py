@@ -0,0 +1,70 @@
+import dataclasses
+
+from execution_engine.errors.errors import ParseError
+
+# Fields of `/usr/bin/time -v` that are read, all of them must be present
+_FIELDS = {
+    "User time (seconds)": "user_s",
+    "System time (seconds)": "system_s",
+    "Maximum resident set size (kbytes)": "max_rss_kb",
+    "Voluntary context switches": "voluntary_context_switches",
+    "Involuntary context switches": "involuntary_context_switches",
+    "Major (requiring I/O) page faults": "major_page_faults",
+    "Minor (reclaiming a frame) page faults": "minor_page_faults",
+    "Exit status": "exit_status",
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class TimeReport:  # pylint: disable=too-many-instance-attributes
+    """
+    Resource usage of all runs together, except for the peak memory
+    """
+
+    runs: int
+    user_s: float
+    system_s: float
+    max_rss_kb: int
+    voluntary_context_switches: int
+    involuntary_context_switches: int
+    major_page_faults: int
+    minor_page_faults: int
+
+
+def parse(file: str) -> TimeReport:
+    """
+    Parses the report written by the framework's time mode: the number of runs as "Runs: <runs>",
+    followed by the output of GNU `/usr/bin/time -v` around those runs.
+    Every line is "<field>: <value>"; field names can contain colons, values too.
+    :param file: Path to file
+    :return: Resource usage of the runs
+    :raises ParseError: if a field is missing or malformed, or the program did not exit cleanly
+    """
+    values: dict[str, str] = {}
+
+    with open(file) as report:
+        for line in report:
+            # E.g. "Command terminated by signal 9", printed before the fields
+            if line.startswith(("Command terminated", "Command exited")):
+                raise ParseError(f"Measured program failed: '{line.strip()}'")
+
+            # Field names contain colons ("h:mm:ss"), but never followed by a space
+            field, separator, value = line.strip().partition(": ")
+            if separator:
+                values[field] = value.strip()
+
+    parsed: dict[str, float | int] = {}
+    for field, name in {"Runs": "runs", **_FIELDS}.items():
+        if field not in values:
+            raise ParseError(f"Time report without '{field}'")
+        try:
+            parsed[name] = float(values[field]) if name.endswith("_s") else int(values[field])
+        except ValueError as e:
+            raise ParseError(f"Malformed time field '{field}': '{values[field]}'") from e
+
+    if parsed.pop("exit_status") != 0:
+        raise ParseError("Measured program did not exit cleanly")
+    if parsed["runs"] < 1:
+        raise ParseError("Time report without runs")
+
+    return TimeReport(**parsed)  # type: ignore[arg-type]
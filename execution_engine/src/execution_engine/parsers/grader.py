@@ -1,37 +1,139 @@
+import math
+from itertools import zip_longest
+from typing import Callable, Iterator
+
 from loguru import logger
 
 from execution_engine.errors.errors import TestsFailedError
 
+# Longer inputs and outputs are cut off in the failure message
+_MAX_REPORTED_LINE_LENGTH = 200
+
+Comparator = Callable[[str, str], bool]
+
+
+def _exact(expected: str, actual: str) -> bool:
+    return expected.strip() == actual.strip()
+
+
+def _whitespace_insensitive(expected: str, actual: str) -> bool:
+    return expected.split() == actual.split()
+
 
-def grader(input_file: str, expected_file: str, actual_file: str):
+def _float_tolerant(tolerance: float) -> Comparator:
+    def compare(expected: str, actual: str) -> bool:
+        expected_tokens = expected.split()
+        actual_tokens = actual.split()
+        if len(expected_tokens) != len(actual_tokens):
+            return False
+
+        for expected_token, actual_token in zip(expected_tokens, actual_tokens):
+            if expected_token == actual_token:
+                continue
+            try:
+                expected_value, actual_value = float(expected_token), float(actual_token)
+            except ValueError:
+                return False
+            if not math.isclose(expected_value, actual_value, rel_tol=tolerance, abs_tol=tolerance):
+                return False
+        return True
+
+    return compare
+
+
+def comparator(mode: str, tolerance: float = 0.0) -> Comparator:
+    """
+    :param mode: "exact": lines are equal apart from leading and trailing whitespace
+                 "whitespace": lines have the same words, however they are separated
+                 "float": like "whitespace", but numbers may differ by `tolerance`, relative or
+                          absolute
+    :raises ValueError: on an unknown mode
     """
-    Grades the tests that have been performed by the user program
+    match mode:
+        case "exact":
+            return _exact
+        case "whitespace":
+            return _whitespace_insensitive
+        case "float":
+            return _float_tolerant(tolerance)
+        case _:
+            raise ValueError(f"Unknown comparison mode: {mode}")
+
+
+def _shorten(line: str) -> str:
+    line = line.strip()
+    if len(line) <= _MAX_REPORTED_LINE_LENGTH:
+        return line
+    return line[:_MAX_REPORTED_LINE_LENGTH] + "..."
+
+
+def _report_missing_lines(
+    tested: int,
+    expected_line: str | None,
+    actual_line: str | None,
+    expected: Iterator[str],
+    actual: Iterator[str],
+):
+    """
+    Counts the remaining lines of the longer file, without keeping them
+    :raises TestsFailedError: always
+    """
+    expected_count = tested + (expected_line is not None) + sum(1 for _ in expected)
+    actual_count = tested + (actual_line is not None) + sum(1 for _ in actual)
+    logger.info(f"Expected {expected_count} lines, got {actual_count} lines")
+    raise TestsFailedError("Did not receive all test cases")
+
+
+def grader(  # pylint: disable=too-many-arguments,too-many-locals
+    input_file: str,
+    expected_file: str,
+    actual_file: str,
+    *,
+    mode: str = "exact",
+    tolerance: float = 0.0,
+    max_failures: int = 10,
+    complete: bool = True,
+):
+    """
+    Grades the tests that have been performed by the user program. The files are compared line by
+    line while they are read, so memory use doesn't grow with their size; grading stops at the
+    first `max_failures` failing tests, which are the only ones reported
+    :param input_file: Path to the test inputs
+    :param expected_file: Path to the expected output
+    :param actual_file: Path to the output of the user program
+    :param mode: How lines are compared, see `comparator`
+    :param complete: False if the program was stopped early, its output is then only graded as far
+        as it goes
     :returns: None
     :raises TestsFailedError: if any test fails
     """
-    tests_passed = True
-    tests_failed_msgs = []
-
-    input_lines = input_file.splitlines()
-    expected_lines = expected_file.splitlines()
-    actual_lines = actual_file.splitlines()
-
-    if not len(expected_lines) == len(actual_lines):
-        logger.info(f"Expected {len(expected_lines)} lines, got {len(actual_lines)} lines")
-        raise TestsFailedError("Did not receive all test cases")
-
-    # For _ in range is on purpose here (prevents 150-length line), hence pylint ignore
-    for i in range(len(expected_lines)):  # pylint: disable=consider-using-enumerate
-        input_line = input_lines[i].strip()
-        expected_line = expected_lines[i].strip()
-        actual_line = actual_lines[i].strip()
-
-        if not expected_line == actual_line:
-            tests_failed_msgs.append(
-                f"Test {i}: Input: {input_line}, Expected: {expected_line} but got: {actual_line}"
-            )
-            tests_passed = False
-
-    if not tests_passed:
-        error_msg = "\n".join(tests_failed_msgs)
-        raise TestsFailedError("Tests failed:\n" + error_msg)
+    compare = comparator(mode, tolerance)
+    tests_failed_msgs: list[str] = []
+
+    with (
+        open(input_file) as inputs,
+        open(expected_file) as expected,
+        open(actual_file) as actual,
+    ):
+        for i, (expected_line, actual_line) in enumerate(zip_longest(expected, actual)):
+            # Inputs are only read along for the failure messages
+            input_line = next(inputs, "")
+
+            if actual_line is None and not complete:
+                break
+            if expected_line is None or actual_line is None:
+                _report_missing_lines(i, expected_line, actual_line, expected, actual)
+
+            if not compare(expected_line, actual_line):
+                tests_failed_msgs.append(
+                    f"Test {i}: Input: {_shorten(input_line)}, "
+                    f"Expected: {_shorten(expected_line)} but got: {_shorten(actual_line)}"
+                )
+                if len(tests_failed_msgs) >= max_failures:
+                    raise TestsFailedError(
+                        f"Tests failed, stopped after {max_failures} failures:\n"
+                        + "\n".join(tests_failed_msgs)
+                    )
+
+    if tests_failed_msgs:
+        raise TestsFailedError("Tests failed:\n" + "\n".join(tests_failed_msgs))
@@ -0,0 +1,44 @@
+import re
+
+from common.schemas import PhaseTiming
+from execution_engine.errors.errors import ParseError
+
+# Format of the shell's `times` builtin, e.g. "0m1.250000s"
+_SHELL_TIME_PATTERN = re.compile(r"^(\d+)m(\d+(?:\.\d+)?)s$")
+
+
+def _shell_time_to_s(value: str) -> float:
+    match = _SHELL_TIME_PATTERN.match(value)
+    if match is None:
+        raise ParseError(f"Malformed shell time: '{value}'")
+    return int(match.group(1)) * 60 + float(match.group(2))
+
+
+def parse(file: str) -> dict[str, PhaseTiming]:
+    """
+    Parses the phase timings written by the framework's run script.
+    Every line is "<phase> <start ns> <end ns> <children user time> <children system time>", where
+    the CPU times are cumulative over all phases so far.
+    :param file: Path to file
+    :return: Wall-clock and CPU time of every phase
+    :raises ParseError: if a line is malformed
+    """
+    timings: dict[str, PhaseTiming] = {}
+    previous_cpu_s = 0.0
+
+    with open(file) as report:
+        for line in report:
+            if not line.strip():
+                continue
+
+            try:
+                phase, start_ns, end_ns, user, system = line.split()
+                wall_ms = (int(end_ns) - int(start_ns)) / 1e6
+            except ValueError as e:
+                raise ParseError(f"Malformed phase line: '{line.strip()}'") from e
+
+            cpu_s = _shell_time_to_s(user) + _shell_time_to_s(system)
+            timings[phase] = PhaseTiming(wall_ms=wall_ms, cpu_ms=(cpu_s - previous_cpu_s) * 1000)
+            previous_cpu_s = cpu_s
+
+    return timings
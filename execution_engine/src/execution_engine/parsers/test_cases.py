@@ -0,0 +1,32 @@
+from common.schemas import TestCaseResult
+from execution_engine.errors.errors import ParseError
+
+_PASSED = {"pass": True, "fail": False, "timeout": False, "unchecked": None}
+
+
+def parse(file: str) -> list[TestCaseResult]:
+    """
+    Parses the test case report written by the framework's correctness run.
+    Every line after the header is one test case "<index> <status> <user usec> <system usec>",
+    where the status is "pass", "fail", "timeout" or "unchecked" (the framework did not compare the
+    output itself). A timed out test case reports its limit as its CPU time.
+    :param file: Path to file
+    :return: Result of every test case that ran, in order
+    :raises ParseError: if a line is malformed
+    """
+    cases: list[TestCaseResult] = []
+
+    with open(file) as report:
+        report.readline()  # Header
+
+        # Blank lines are skipped
+        for line in filter(str.strip, report):
+            try:
+                index, status, user_usec, system_usec = line.split()
+                cpu_ms = (int(user_usec) + int(system_usec)) / 1000
+                passed = _PASSED[status]
+                cases.append(TestCaseResult(index=int(index), passed=passed, cpu_ms=cpu_ms))
+            except (ValueError, KeyError) as e:
+                raise ParseError(f"Malformed test case line: '{line.strip()}'") from e
+
+    return cases
@@ -0,0 +1,176 @@
+"""
+Policies that decide which waiting job gets the next free CPU.
+- fifo: in order of arrival
+- fair: round robin over users, so a user with many submissions can't starve the others
+- sjf: shortest expected job first, based on the history of the problem's run times
+Jobs with a higher priority always go before jobs with a lower one, the policy decides within a
+priority.
+"""
+
+import abc
+import asyncio
+import collections
+import dataclasses
+import heapq
+import itertools
+from uuid import UUID
+
+# Weight of the newest run time in the moving average per problem
+_HISTORY_ALPHA = 0.2
+
+_sequence = itertools.count()
+
+
+# Jobs of the same problem and language are expected to take about as long
+JobKind = tuple[int, str]
+
+
+@dataclasses.dataclass
+class Waiter:
+    """
+    A job waiting for a CPU, which is set as the result of `future`
+    """
+
+    user_uuid: UUID
+    priority: int
+    kind: JobKind
+    future: asyncio.Future[int]
+    sequence: int = dataclasses.field(default_factory=lambda: next(_sequence))
+
+
+class RuntimeHistory:
+    """
+    Moving average of the run time per problem and language
+    """
+
+    def __init__(self):
+        self._averages: dict[JobKind, float] = {}
+
+    def record(self, key: JobKind, seconds: float) -> None:
+        average = self._averages.get(key, seconds)
+        self._averages[key] = _HISTORY_ALPHA * seconds + (1 - _HISTORY_ALPHA) * average
+
+    def expected(self, key: JobKind) -> float:
+        """
+        Unknown problems are expected to take 0 seconds, so they run soon and get a history
+        """
+        return self._averages.get(key, 0.0)
+
+
+class SchedulingPolicy(abc.ABC):
+    @abc.abstractmethod
+    def push(self, waiter: Waiter) -> None:
+        """
+        Adds a job that waits for a CPU
+        """
+
+    @abc.abstractmethod
+    def pop(self) -> Waiter:
+        """
+        Removes and returns the job that gets the next free CPU. Only called if a job is waiting
+        """
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        """
+        Number of waiting jobs
+        """
+
+
+class FifoPolicy(SchedulingPolicy):
+    def __init__(self):
+        self._waiters: collections.deque[Waiter] = collections.deque()
+
+    def push(self, waiter: Waiter) -> None:
+        self._waiters.append(waiter)
+
+    def pop(self) -> Waiter:
+        return self._waiters.popleft()
+
+    def __len__(self) -> int:
+        return len(self._waiters)
+
+
+class FairSharePolicy(SchedulingPolicy):
+    def __init__(self):
+        # Users in the order they are served, each with their own queue
+        self._users: collections.OrderedDict[UUID, collections.deque[Waiter]] = (
+            collections.OrderedDict()
+        )
+        self._size = 0
+
+    def push(self, waiter: Waiter) -> None:
+        self._users.setdefault(waiter.user_uuid, collections.deque()).append(waiter)
+        self._size += 1
+
+    def pop(self) -> Waiter:
+        user, waiters = next(iter(self._users.items()))
+        waiter = waiters.popleft()
+        self._size -= 1
+
+        # The user goes to the back of the line
+        del self._users[user]
+        if waiters:
+            self._users[user] = waiters
+
+        return waiter
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class ShortestJobFirstPolicy(SchedulingPolicy):
+    def __init__(self, history: RuntimeHistory):
+        self._history = history
+        self._heap: list[tuple[float, int, Waiter]] = []
+
+    def push(self, waiter: Waiter) -> None:
+        expected = self._history.expected(waiter.kind)
+        heapq.heappush(self._heap, (expected, waiter.sequence, waiter))
+
+    def pop(self) -> Waiter:
+        return heapq.heappop(self._heap)[2]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+class PriorityLanes:
+    """
+    One policy instance per priority, higher priorities are served first
+    """
+
+    def __init__(self, policy: str, history: RuntimeHistory):
+        self._policy = policy
+        self._history = history
+        self._lanes: dict[int, SchedulingPolicy] = {}
+
+    def _new_lane(self) -> SchedulingPolicy:
+        match self._policy:
+            case "fifo":
+                return FifoPolicy()
+            case "fair":
+                return FairSharePolicy()
+            case "sjf":
+                return ShortestJobFirstPolicy(self._history)
+            case _:
+                raise ValueError(f"Unknown scheduler policy: {self._policy}")
+
+    def push(self, waiter: Waiter) -> None:
+        lane = self._lanes.get(waiter.priority)
+        if lane is None:
+            lane = self._lanes[waiter.priority] = self._new_lane()
+        lane.push(waiter)
+
+    def pop(self) -> Waiter:
+        """
+        :raises IndexError: if no job is waiting
+        """
+        for priority in sorted(self._lanes, reverse=True):
+            lane = self._lanes[priority]
+            if lane:
+                return lane.pop()
+        raise IndexError("No waiting jobs")
+
+    def __len__(self) -> int:
+        return sum(len(lane) for lane in self._lanes.values())
@@ -0,0 +1,126 @@
+"""
+Decides which logical CPUs jobs run on.
+Only CPUs in the engine's cgroup cpuset (or WORKER_CPUS, if set) are used. Cores reserved for the
+platform services (Postgres, DB handler, server) are left alone, and by default only one logical
+CPU per physical core runs jobs, while its SMT siblings stay idle so they don't interfere with the
+measurement.
+"""
+
+import dataclasses
+import functools
+import os
+
+from loguru import logger
+
+from execution_engine.config import settings
+
+SYSFS_CPU_PATH = "/sys/devices/system/cpu"
+CGROUP_CPUSET_PATH = "/sys/fs/cgroup/cpuset.cpus.effective"
+
+
+@dataclasses.dataclass
+class CpuLayout:
+    worker_cpus: list[int]  # Logical CPUs that run jobs, at most one job each
+    idle_siblings: list[int]  # SMT siblings of worker CPUs, kept idle
+    reserved_cpus: list[int]  # Left for the platform services
+    # Logical CPUs per physical core, keyed by "<package>:<core>"
+    cores: dict[str, list[int]]
+
+
+def parse_cpu_list(cpu_list: str) -> list[int]:
+    """
+    Parses the kernel's CPU list format, e.g. "0-3,8,10-11"
+    """
+    cpus: list[int] = []
+    for part in cpu_list.strip().split(","):
+        if not part:
+            continue
+        start, _, end = part.partition("-")
+        cpus.extend(range(int(start), int(end or start) + 1))
+    return sorted(set(cpus))
+
+
+def _read(path: str) -> str | None:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def allowed_cpus(cgroup_cpuset_path: str = CGROUP_CPUSET_PATH) -> list[int]:
+    """
+    CPUs in our cgroup cpuset, or all CPUs we may run on if there is no cgroup v2 cpuset
+    """
+    cpuset = _read(cgroup_cpuset_path)
+    if cpuset:
+        return parse_cpu_list(cpuset)
+    return sorted(os.sched_getaffinity(0))
+
+
+def physical_cores(cpus: list[int], sysfs_cpu_path: str = SYSFS_CPU_PATH) -> dict[str, list[int]]:
+    """
+    Groups logical CPUs by the physical core they belong to. CPUs without topology information
+    are treated as a core of their own
+    """
+    cores: dict[str, list[int]] = {}
+    for cpu in cpus:
+        topology = os.path.join(sysfs_cpu_path, f"cpu{cpu}", "topology")
+        package = _read(os.path.join(topology, "physical_package_id"))
+        core = _read(os.path.join(topology, "core_id"))
+        key = f"{package}:{core}" if package is not None and core is not None else f"cpu{cpu}"
+        cores.setdefault(key, []).append(cpu)
+
+    return {key: sorted(siblings) for key, siblings in sorted(cores.items(), key=lambda c: c[1])}
+
+
+def plan_layout(cores: dict[str, list[int]], reserved: list[int], idle_siblings: bool) -> CpuLayout:
+    """
+    A core with a reserved CPU is reserved as a whole, since its siblings share its caches and
+    execution units. If that leaves no core to run jobs on, as on a single core machine, nothing is
+    reserved
+    :raises ValueError: if there are no CPUs at all
+    """
+    layout = CpuLayout(worker_cpus=[], idle_siblings=[], reserved_cpus=[], cores=cores)
+    reserved_set = set(reserved)
+
+    for siblings in cores.values():
+        if reserved_set.intersection(siblings):
+            layout.reserved_cpus.extend(siblings)
+        elif idle_siblings:
+            layout.worker_cpus.append(siblings[0])
+            layout.idle_siblings.extend(siblings[1:])
+        else:
+            layout.worker_cpus.extend(siblings)
+
+    if not layout.worker_cpus:
+        if not reserved_set:
+            raise ValueError("No CPUs to run jobs on, check WORKER_CPUS")
+        logger.warning(
+            f"Reserving CPUs {sorted(reserved_set)} leaves no CPUs to run jobs on, "
+            "running jobs on all cores instead"
+        )
+        return plan_layout(cores, reserved=[], idle_siblings=idle_siblings)
+
+    return layout
+
+
+@functools.cache
+def detect_layout() -> CpuLayout:
+    """
+    Layout of this machine according to the settings, detected once
+    """
+    cpus = parse_cpu_list(settings.WORKER_CPUS) if settings.WORKER_CPUS else allowed_cpus()
+    if not settings.CPU_TOPOLOGY_AWARE:
+        return CpuLayout(worker_cpus=cpus, idle_siblings=[], reserved_cpus=[], cores={})
+
+    layout = plan_layout(
+        physical_cores(cpus),
+        reserved=parse_cpu_list(settings.RESERVED_CPUS),
+        idle_siblings=settings.SMT_SIBLINGS_IDLE,
+    )
+    logger.info(
+        f"Running jobs on CPUs {layout.worker_cpus}, idle siblings {layout.idle_siblings}, "
+        f"reserved {layout.reserved_cpus}"
+    )
+    return layout
@@ -0,0 +1,41 @@
+"""
+Base of the engine's own SQLite stores (job queue, result store), kept on the engine data volume.
+"""
+
+import abc
+import os
+import sqlite3
+import threading
+
+
+class SqliteStore(abc.ABC):
+    """
+    Thread-safe; all methods do blocking I/O and should be run off the event loop
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    @abc.abstractmethod
+    def _create_tables(self, conn: sqlite3.Connection) -> None:
+        """
+        Creates the tables of the store, called once when the database is opened
+        """
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Opens the database on first use. Requires the lock
+        """
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self._path, check_same_thread=False)
+            self._create_tables(self._conn)
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
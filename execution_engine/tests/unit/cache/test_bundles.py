@@ -0,0 +1,32 @@
+from execution_engine.cache.bundles import BundleIndex
+
+
+def test_put_and_get():
+    """Test that bundles are kept per problem and language"""
+    index = BundleIndex(max_age_sec=0)
+    index.put(1, "c", '"v1"', "/layers/a")
+    index.put(2, "c", '"v2"', "/layers/b")
+
+    bundle = index.get(1, "c")
+    assert bundle is not None
+    assert (bundle.etag, bundle.layer) == ('"v1"', "/layers/a")
+    assert index.get(1, "python") is None
+
+
+def test_without_etag_not_cached():
+    """Test that a bundle served without ETag replaces the cached one but isn't kept"""
+    index = BundleIndex(max_age_sec=0)
+    index.put(1, "c", '"v1"', "/layers/a")
+    index.put(1, "c", None, "/layers/b")
+    assert index.get(1, "c") is None
+
+
+def test_freshness():
+    """Test that a bundle only skips revalidation within the max age"""
+    fresh = BundleIndex(max_age_sec=60)
+    fresh.put(1, "c", '"v1"', "/layers/a")
+    assert fresh.is_fresh(fresh.get(1, "c"))
+
+    stale = BundleIndex(max_age_sec=0)
+    stale.put(1, "c", '"v1"', "/layers/a")
+    assert not stale.is_fresh(stale.get(1, "c"))
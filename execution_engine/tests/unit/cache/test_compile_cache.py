@@ -0,0 +1,101 @@
+import os
+
+import pytest
+
+from common.languages import Language
+from execution_engine.cache.compile_cache import CompileCache
+
+C = Language.C.info
+
+
+@pytest.fixture(name="job_dir")
+def job_dir_fixture(tmp_path):
+    def create(name: str, code: str = "int main() {}", binary: bytes = b"binary") -> str:
+        path = tmp_path / name
+        path.mkdir()
+        (path / "submission.c").write_text(code)
+        (path / "Makefile").write_text("CFLAGS = -O3")
+        (path / "input.txt").write_text(name)
+        (path / "main").write_bytes(binary)
+        return str(path)
+
+    return create
+
+
+@pytest.fixture(name="cache")
+def cache_fixture(tmp_path):
+    return CompileCache(str(tmp_path / "cache"), max_bytes=1024)
+
+
+def test_key_ignores_test_data(job_dir):
+    """Test that jobs that only differ in test data share a key"""
+    assert CompileCache.key(job_dir("a"), C, "toolchain") == CompileCache.key(
+        job_dir("b"), C, "toolchain"
+    )
+
+
+def test_key_depends_on_code_and_toolchain(job_dir):
+    """Test that different code or a different toolchain gives a different key"""
+    key = CompileCache.key(job_dir("a"), C, "toolchain")
+
+    assert key != CompileCache.key(job_dir("b", code="int main() { return 1; }"), C, "toolchain")
+    assert key != CompileCache.key(job_dir("c"), C, "other toolchain")
+
+
+def test_store_and_restore(cache, job_dir):
+    """Test that a stored build is restored together with the marker file"""
+    cache.store("key", "main", job_dir("a", binary=b"compiled"))
+    target = job_dir("b", binary=b"")
+    os.remove(os.path.join(target, "main"))
+
+    assert cache.restore("key", "main", target)
+    with open(os.path.join(target, "main"), "rb") as f:
+        assert f.read() == b"compiled"
+    assert os.path.exists(os.path.join(target, "compile_cached"))
+
+
+def test_restore_miss(cache, job_dir):
+    """Test that an unknown key is a miss"""
+    assert not cache.restore("key", "main", job_dir("a"))
+
+
+def test_restore_tampered(cache, job_dir, tmp_path):
+    """Test that a modified cache entry is discarded"""
+    cache.store("key", "main", job_dir("a"))
+    (tmp_path / "cache" / "key").write_bytes(b"malicious")
+
+    target = job_dir("b")
+    assert not cache.restore("key", "main", target)
+    assert not os.path.exists(os.path.join(target, "compile_cached"))
+    assert not cache.restore("key", "main", target)
+
+
+def test_evicts_least_recently_used(cache, job_dir):
+    """Test that the least recently used entry is evicted once the cache is full"""
+    cache.store("first", "main", job_dir("a", binary=b"x" * 400))
+    cache.store("second", "main", job_dir("b", binary=b"x" * 400))
+    assert cache.restore("first", "main", job_dir("c"))
+
+    cache.store("third", "main", job_dir("d", binary=b"x" * 400))
+
+    assert cache.restore("first", "main", job_dir("e"))
+    assert not cache.restore("second", "main", job_dir("f"))
+    assert cache.restore("third", "main", job_dir("g"))
+
+
+def test_key_with_framework_layer(job_dir, tmp_path):
+    """Test that a job with separate framework files has the key of the merged job directory"""
+    merged = job_dir("merged")
+
+    layer = tmp_path / "layer"
+    layer.mkdir()
+    (layer / "Makefile").write_text("CFLAGS = -O3")
+    (layer / "input.txt").write_text("layer")
+    upper = tmp_path / "upper"
+    upper.mkdir()
+    (upper / "submission.c").write_text("int main() {}")
+    (upper / "main").write_bytes(b"binary")
+
+    assert CompileCache.key(str(upper), C, "toolchain", lower=str(layer)) == CompileCache.key(
+        merged, C, "toolchain"
+    )
@@ -0,0 +1,148 @@
+import hashlib
+import io
+import os
+import tarfile
+
+import pytest
+
+from common.schemas import FrameworkFile
+from execution_engine.cache.framework_layers import FrameworkLayers, copy_layer
+
+
+@pytest.fixture(name="layers")
+def layers_fixture(tmp_path):
+    return FrameworkLayers(str(tmp_path / "layers"), max_layers=1)
+
+
+@pytest.fixture(name="tarball")
+def tarball_fixture(tmp_path):
+    def create(name: str, files: dict[str, str]) -> str:
+        path = tmp_path / f"{name}.tar.gz"
+        with tarfile.open(path, "w:gz") as tar:
+            for filename, content in files.items():
+                data = content.encode()
+                info = tarfile.TarInfo(filename)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+        return str(path)
+
+    return create
+
+
+def test_extract_once(layers, tarball):
+    """Test that identical tarballs share one layer, with the run script made executable"""
+    files = {"run.sh": "#!/bin/sh", "input.txt": "1 2"}
+    first = tarball("first", files)
+    layer = layers.acquire(first)
+
+    assert not os.path.exists(first)
+    assert os.access(os.path.join(layer, "run.sh"), os.X_OK)
+    with open(os.path.join(layer, "input.txt")) as f:
+        assert f.read() == "1 2"
+
+    assert layers.acquire(tarball("second", files)) == layer
+
+
+def test_modified_layer_extracted_again(layers, tarball):
+    """Test that a layer that was written to is replaced by a fresh copy"""
+    files = {"output.txt": "expected"}
+    layer = layers.acquire(tarball("first", files))
+    layers.release(layer)
+
+    with open(os.path.join(layer, "output.txt"), "w") as f:
+        f.write("tampered")
+
+    assert layers.acquire(tarball("second", files)) == layer
+    with open(os.path.join(layer, "output.txt")) as f:
+        assert f.read() == "expected"
+
+
+def test_evict_unused_only(layers, tarball):
+    """Test that layers are evicted once unused, and never while a job uses them"""
+    first = layers.acquire(tarball("first", {"input.txt": "1"}))
+    second = layers.acquire(tarball("second", {"input.txt": "2"}))
+    assert os.path.isdir(first) and os.path.isdir(second)
+
+    layers.release(first)
+    layers.release(second)
+    third = layers.acquire(tarball("third", {"input.txt": "3"}))
+
+    assert not os.path.exists(first) and not os.path.exists(second)
+    assert os.path.isdir(third)
+
+
+def test_acquire_existing(layers, tarball):
+    """Test that a layer can be acquired again until it is modified"""
+    layer = layers.acquire(tarball("first", {"input.txt": "1"}))
+    layers.release(layer)
+    assert layers.acquire_existing(layer)
+    layers.release(layer)
+
+    with open(os.path.join(layer, "input.txt"), "w") as f:
+        f.write("2")
+    assert not layers.acquire_existing(layer)
+
+
+def test_verify_test_data(layers, tarball):
+    """Test that a layer is only trusted for grading while its files are unchanged"""
+    layer = layers.acquire(tarball("first", {"input.txt": "1", "output.txt": "2"}))
+    assert layers.verify(layer, ["input.txt", "output.txt"])
+    assert not layers.verify(layer, ["missing.txt"])
+
+    with open(os.path.join(layer, "output.txt"), "w") as f:
+        f.write("3")
+    assert not layers.verify(layer, ["input.txt", "output.txt"])
+
+
+def test_copy_layer(layers, tarball, tmp_path):
+    """Test that a copy of a layer has the same files and permissions"""
+    layer = layers.acquire(tarball("first", {"run.sh": "#!/bin/sh", "data/input.txt": "1 2"}))
+    job_dir = tmp_path / "job"
+    job_dir.mkdir()
+
+    copy_layer(layer, str(job_dir))
+
+    assert (job_dir / "data" / "input.txt").read_text() == "1 2"
+    assert os.access(job_dir / "run.sh", os.X_OK)
+
+
+def _stored_files(storage, files: dict[str, str]) -> list[FrameworkFile]:
+    stored = []
+    for filename, content in files.items():
+        (storage / filename).write_text(content)
+        stored.append(
+            FrameworkFile(
+                name=filename,
+                path=filename,
+                size=len(content),
+                sha256=hashlib.sha256(content.encode()).hexdigest(),
+            )
+        )
+    return stored
+
+
+def test_acquire_files_shares_layer_with_tarball(layers, tarball, tmp_path):
+    """Test that files copied from the storage volume give the same layer as their tarball"""
+    files = {"run.sh": "#!/bin/sh", "input.txt": "1 2"}
+    storage = tmp_path / "storage"
+    storage.mkdir()
+
+    layer = layers.acquire_files(_stored_files(storage, files), str(storage))
+
+    assert os.access(os.path.join(layer, "run.sh"), os.X_OK)
+    assert layers.acquire(tarball("first", files)) == layer
+
+
+def test_acquire_files_checks_manifest(layers, tmp_path):
+    """Test that a stored file that changed after the manifest was made is refused"""
+    storage = tmp_path / "storage"
+    storage.mkdir()
+    stored = _stored_files(storage, {"input.txt": "1 2"})
+    (storage / "input.txt").write_text("3 4")
+
+    with pytest.raises(ValueError):
+        layers.acquire_files(stored, str(storage))
+
+    escaping = stored[0].model_copy(update={"path": "../outside.txt"})
+    with pytest.raises(ValueError):
+        layers.acquire_files([escaping], str(storage))
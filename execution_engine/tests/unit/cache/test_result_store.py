@@ -0,0 +1,72 @@
+from uuid import uuid4
+
+import pytest
+
+from common.languages import Language
+from common.schemas import PhaseTiming, SubmissionResult
+from execution_engine.cache.result_store import ResultStore, confirms
+
+C = Language.C.info
+
+
+@pytest.fixture(name="store")
+def store_fixture(tmp_path):
+    store = ResultStore(str(tmp_path / "data" / "results.sqlite3"))
+    yield store
+    store.close()
+
+
+def _result(runtime_ms: float = 10.0, successful: bool = True) -> SubmissionResult:
+    return SubmissionResult(
+        submission_uuid=uuid4(),
+        runtime_ms=runtime_ms,
+        emissions_kg=1e-9,
+        energy_usage_kwh=1e-8,
+        successful=successful,
+        error_reason=None,
+        error_msg="",
+        phase_timings={"setup": PhaseTiming(wall_ms=1.0, cpu_ms=1.0)},
+    )
+
+
+def test_put_and_get(store):
+    """Test that a successful result is stored without its phase timings"""
+    result = _result()
+    store.put("key", result)
+
+    stored = store.get("key")
+
+    assert stored == result.model_copy(update={"phase_timings": {}})
+
+
+def test_failed_result_not_stored(store):
+    """Test that failed results are not memoized"""
+    store.put("key", _result(successful=False))
+
+    assert store.get("key") is None
+
+
+def test_discard(store):
+    """Test that a discarded result is gone"""
+    store.put("key", _result())
+    store.discard("key")
+
+    assert store.get("key") is None
+
+
+def test_key_includes_test_data(tmp_path):
+    """Test that changing the test data of a problem changes the key"""
+    (tmp_path / "submission.c").write_text("int main() {}")
+    (tmp_path / "input.txt").write_text("1")
+    key = ResultStore.key(str(tmp_path), C, "toolchain")
+
+    (tmp_path / "input.txt").write_text("2")
+
+    assert ResultStore.key(str(tmp_path), C, "toolchain") != key
+
+
+def test_confirms():
+    """Test that a sample within tolerance confirms the stored runtime"""
+    assert confirms(_result(10.0), _result(10.5))
+    assert not confirms(_result(10.0), _result(20.0))
+    assert not confirms(_result(10.0), _result(10.0, successful=False))
@@ -0,0 +1,109 @@
+import asyncio
+from uuid import uuid4
+
+import httpx
+
+from common.languages import Language
+from common.schemas import SubmissionCreate
+from execution_engine.cluster.coordinator import Coordinator
+
+
+def _request() -> SubmissionCreate:
+    return SubmissionCreate(
+        submission_uuid=uuid4(),
+        problem_id=1,
+        user_uuid=uuid4(),
+        language=Language.C,
+        timestamp=0.0,
+        code="int main() {}",
+    )
+
+
+class FakeWorkers:
+    """
+    Answers the coordinator's requests as a set of worker engines would
+    """
+
+    def __init__(self, capacity: dict[str, dict], failing: set[str] = frozenset()):
+        self.capacity = capacity
+        self.failing = failing
+        self.executed: list[str] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        if request.url.path == "/api/capacity":
+            return httpx.Response(200, json=self.capacity[host])
+
+        if host in self.failing:
+            raise httpx.ConnectError("connection refused", request=request)
+        self.executed.append(host)
+        return httpx.Response(201)
+
+
+def _capacity(worker_cpus: int, running: int = 0) -> dict:
+    return {
+        "worker_cpus": worker_cpus,
+        "free_cpus": worker_cpus - running,
+        "free_slots": worker_cpus - running,
+        "pending": 0,
+        "running": running,
+    }
+
+
+def _coordinator(workers: FakeWorkers) -> Coordinator:
+    return Coordinator(
+        ["http://a:8080", "http://b:8080/"],
+        poll_interval_sec=0.01,
+        request_timeout_sec=1.0,
+        node_backoff_sec=60.0,
+        transport=httpx.MockTransport(workers),
+    )
+
+
+def test_forward_to_least_loaded():
+    """Test that jobs go to the worker with the fewest jobs per CPU"""
+    workers = FakeWorkers({"a": _capacity(4, running=3), "b": _capacity(4, running=1)})
+    coordinator = _coordinator(workers)
+
+    async def forward():
+        await coordinator.refresh()
+        await coordinator.forward(_request())
+        await coordinator.close()
+
+    asyncio.run(forward())
+    assert workers.executed == ["b"]
+
+
+def test_retry_on_failed_worker():
+    """Test that a job moves on to another worker if the chosen one fails"""
+    workers = FakeWorkers({"a": _capacity(4), "b": _capacity(2, running=1)}, failing={"a"})
+    coordinator = _coordinator(workers)
+
+    async def forward():
+        await coordinator.refresh()
+        await coordinator.forward(_request())
+        await coordinator.close()
+
+    asyncio.run(forward())
+    assert workers.executed == ["b"]
+    assert [node["last_error"] is not None for node in coordinator.snapshot()] == [True, False]
+
+
+def test_wait_for_free_slot():
+    """Test that a job waits while every worker is busy, and is sent once a slot frees up"""
+    workers = FakeWorkers({"a": _capacity(1, running=1), "b": _capacity(1, running=1)})
+    coordinator = _coordinator(workers)
+
+    async def forward():
+        poller = asyncio.create_task(coordinator.run())
+        job = asyncio.create_task(coordinator.forward(_request()))
+        await asyncio.sleep(0.05)
+        assert not job.done()
+
+        workers.capacity["b"] = _capacity(1)
+        await asyncio.wait_for(job, timeout=1.0)
+        poller.cancel()
+        await coordinator.close()
+
+    asyncio.run(forward())
+    assert workers.executed == ["b"]
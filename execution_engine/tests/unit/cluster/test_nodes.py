@@ -0,0 +1,56 @@
+from execution_engine.cluster.nodes import Node, choose_node
+
+
+def _node(url: str, worker_cpus: int, pending: int = 0, running: int = 0) -> Node:
+    node = Node(url=url)
+    node.update(
+        {
+            "worker_cpus": worker_cpus,
+            "free_slots": max(0, worker_cpus - pending - running),
+            "pending": pending,
+            "running": running,
+        }
+    )
+    return node
+
+
+def test_choose_least_loaded():
+    """Test that the node with the fewest jobs per CPU is chosen"""
+    busy = _node("http://a", worker_cpus=4, running=3)
+    idle = _node("http://b", worker_cpus=2, running=1)
+    assert choose_node([busy, idle], now=0.0) is idle
+
+
+def test_choose_none_when_full():
+    """Test that no node is chosen when none has a free slot"""
+    nodes = [
+        _node("http://a", worker_cpus=2, running=2),
+        _node("http://b", worker_cpus=1, pending=1),
+    ]
+    assert choose_node(nodes, now=0.0) is None
+
+
+def test_reserve_spreads_jobs():
+    """Test that reserving a slot sends the next job to another node"""
+    a = _node("http://a", worker_cpus=2)
+    b = _node("http://b", worker_cpus=2)
+
+    chosen = []
+    for _ in range(4):
+        node = choose_node([a, b], now=0.0)
+        node.reserve()
+        chosen.append(node.url)
+
+    assert sorted(chosen) == ["http://a", "http://a", "http://b", "http://b"]
+    assert choose_node([a, b], now=0.0) is None
+
+
+def test_down_node_skipped_until_backoff():
+    """Test that a failed node is skipped until its backoff ends and it reports capacity again"""
+    node = _node("http://a", worker_cpus=2)
+    node.mark_down("connection refused", now=10.0, backoff_sec=5.0)
+    assert choose_node([node], now=11.0) is None
+
+    node.update({"worker_cpus": 2, "free_slots": 2, "pending": 0, "running": 0})
+    assert choose_node([node], now=12.0) is None
+    assert choose_node([node], now=15.0) is node
@@ -8,3 +8,10 @@ if target_path not in sys.path:
     sys.path.insert(0, target_path)
 
 print(f"Added '{target_path}' to sys.path for pytest.")
+
+# `execution_engine.docker_handler.state` connects to the Docker daemon on import. Unit tests run
+# without one, so the client is a mock; tests that talk to Docker inject fakes of their own
+import docker  # noqa: E402  pylint: disable=wrong-import-position
+from unittest import mock  # noqa: E402  pylint: disable=wrong-import-position
+
+docker.from_env = mock.MagicMock(name="docker.from_env")
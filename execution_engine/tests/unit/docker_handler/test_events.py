@@ -0,0 +1,177 @@
+import asyncio
+import queue
+
+import pytest
+
+from execution_engine.docker_handler import events
+from execution_engine.docker_handler.events import ContainerEvents, ContainerExit
+
+_CLOSED = object()
+
+
+class FakeStream:
+    """
+    Blocks like the Docker event stream until events are fed or it is closed
+    """
+
+    def __init__(self, fail_after: int | None = None):
+        self.events: queue.Queue = queue.Queue()
+        self.fail_after = fail_after
+
+    def __iter__(self):
+        delivered = 0
+        while True:
+            if self.fail_after is not None and delivered >= self.fail_after:
+                raise ConnectionError("stream broke")
+            event = self.events.get()
+            if event is _CLOSED:
+                return
+            delivered += 1
+            yield event
+
+    def close(self):
+        self.events.put(_CLOSED)
+
+
+class FakeClient:
+    """
+    Hands out the prepared streams in order, and records from when each was requested
+    """
+
+    def __init__(self, *streams: FakeStream):
+        self.streams = list(streams)
+        self.since: list[int] = []
+
+    def events(self, decode: bool, since: int, filters: dict) -> FakeStream:
+        assert decode and filters["type"] == "container"
+        self.since.append(since)
+        return self.streams.pop(0) if self.streams else FakeStream()
+
+
+@pytest.fixture(name="container_events")
+def container_events_fixture():
+    container_events = ContainerEvents(FakeClient())
+    yield container_events
+    container_events.stop()
+
+
+def _die(container_id: str, exit_code: int, time: int = 0) -> dict:
+    return {
+        "Type": "container",
+        "Action": "die",
+        "Actor": {"ID": container_id, "Attributes": {"exitCode": str(exit_code)}},
+        "time": time,
+    }
+
+
+def _exec_die(container_id: str, exec_id: str, exit_code: int) -> dict:
+    return {
+        "Type": "container",
+        "Action": "exec_die",
+        "Actor": {
+            "ID": container_id,
+            "Attributes": {"execID": exec_id, "exitCode": str(exit_code)},
+        },
+        "time": 0,
+    }
+
+
+def _oom(container_id: str) -> dict:
+    return {"Type": "container", "Action": "oom", "Actor": {"ID": container_id}, "time": 0}
+
+
+def test_container_exit(container_events):
+    """Test that the exit code of a container resolves its waiter"""
+
+    async def wait():
+        exited = container_events.expect("c1", "c1")
+        container_events.handle(_die("c1", 3))
+        return await asyncio.wait_for(exited, 5)
+
+    assert asyncio.run(wait()) == ContainerExit(exit_code=3, oom=False)
+
+
+def test_exec_exit_is_keyed_by_exec_id(container_events):
+    """Test that an exec is resolved by its exec ID, not by the container it ran in"""
+
+    async def wait():
+        container_exited = container_events.expect("c1", "c1")
+        exec_exited = container_events.expect("e1", "c1")
+        container_events.handle(_exec_die("c1", "e2", 1))
+        container_events.handle(_exec_die("c1", "e1", 0))
+        result = await asyncio.wait_for(exec_exited, 5)
+        return result, container_exited.done()
+
+    result, container_done = asyncio.run(wait())
+    assert result == ContainerExit(exit_code=0, oom=False)
+    assert not container_done
+
+
+def test_oom_is_reported_with_the_exit(container_events):
+    """Test that an OOM kill is flagged on every waiter of that container only"""
+
+    async def wait():
+        oom_exited = container_events.expect("e1", "c1")
+        other_exited = container_events.expect("e2", "c2")
+        container_events.handle(_oom("c1"))
+        container_events.handle(_exec_die("c1", "e1", 137))
+        container_events.handle(_exec_die("c2", "e2", 0))
+        return await asyncio.gather(oom_exited, other_exited)
+
+    assert asyncio.run(wait()) == [
+        ContainerExit(exit_code=137, oom=True),
+        ContainerExit(exit_code=0, oom=False),
+    ]
+
+
+def test_exit_before_expect_is_not_delivered(container_events):
+    """Test that only exits after `expect` count, which is why it is called before starting"""
+
+    async def wait():
+        container_events.handle(_die("c1", 1))
+        exited = container_events.expect("c1", "c1")
+        await asyncio.sleep(0.05)
+        assert not exited.done()
+
+        container_events.handle(_die("c1", 0))
+        return await asyncio.wait_for(exited, 5)
+
+    assert asyncio.run(wait()).exit_code == 0
+
+
+def test_discarded_waiter_is_not_resolved(container_events):
+    """Test that an exit after `discard` is ignored and the waiter is gone"""
+
+    async def wait():
+        exited = container_events.expect("c1", "c1")
+        container_events.discard("c1")
+        container_events.handle(_die("c1", 0))
+        await asyncio.sleep(0.05)
+        return exited.done()
+
+    assert not asyncio.run(wait())
+    assert container_events.stats()["waiting"] == 0
+
+
+def test_reconnect_replays_from_last_event(monkeypatch):
+    """Test that a broken stream is reconnected from the time of the last event it delivered"""
+    monkeypatch.setattr(events, "_RECONNECT_DELAY_SEC", 0.01)
+    broken = FakeStream(fail_after=1)
+    replayed = FakeStream()
+    client = FakeClient(broken, replayed)
+    container_events = ContainerEvents(client)
+
+    async def wait():
+        exited = container_events.expect("c2", "c2")
+        broken.events.put(_die("c1", 0, time=10**10))
+        # The exit of c2 happened while the stream was down, the new stream replays it
+        replayed.events.put(_die("c2", 5, time=10**10 + 1))
+        return await asyncio.wait_for(exited, 5)
+
+    try:
+        assert asyncio.run(wait()).exit_code == 5
+    finally:
+        container_events.stop()
+
+    assert client.since[1] == 10**10
+    assert container_events.stats()["reconnects"] == 1
@@ -0,0 +1,219 @@
+import threading
+
+import docker.errors
+import pytest
+
+from common.languages import Language
+from execution_engine.docker_handler import images
+
+
+class FakeImage:
+    def __init__(self, labels: dict[str, str] | None):
+        self.labels = labels
+
+
+class FakeImages:
+    """
+    Stands in for `client.images`: knows which images exist and which labels they carry
+    """
+
+    def __init__(self):
+        self.labels: dict[str, dict[str, str] | None] = {}
+        self.lookups = 0
+
+    def get(self, tag: str) -> FakeImage:
+        self.lookups += 1
+        if tag not in self.labels:
+            raise docker.errors.ImageNotFound(tag)
+        return FakeImage(self.labels[tag])
+
+
+class FakeClient:
+    def __init__(self):
+        self.images = FakeImages()
+
+
+class FakeBuilder:
+    """
+    Replaces `build_image`, records the builds and tags the fake image like Docker would
+    """
+
+    def __init__(self, fake_images: FakeImages):
+        self.images = fake_images
+        self.built: list[tuple[str, dict[str, str]]] = []
+        self.before_build = lambda language: None
+        self.error: Exception | None = None
+
+    def __call__(self, language, labels=None):
+        self.before_build(language)
+        if self.error is not None:
+            raise self.error
+        self.built.append((language.name, labels))
+        self.images.labels[language.image] = labels
+
+
+@pytest.fixture
+def dockerfiles(tmp_path, monkeypatch):
+    def path(language):
+        return str(tmp_path / f"{language.name}.Dockerfile")
+
+    for language in Language:
+        with open(path(language.info), "w", encoding="utf-8") as f:
+            f.write(f"FROM {language.value}\n")
+
+    monkeypatch.setattr(images, "dockerfile_path", path)
+    return path
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake = FakeClient()
+    monkeypatch.setattr(images, "client", fake)
+    monkeypatch.setattr(images, "_status", {})
+    monkeypatch.setattr(images, "_locks", {})
+    return fake
+
+
+@pytest.fixture
+def builder(client, monkeypatch):
+    fake = FakeBuilder(client.images)
+    monkeypatch.setattr(images, "build_image", fake)
+    return fake
+
+
+@pytest.mark.usefixtures("dockerfiles")
+def test_missing_image_is_built_with_the_dockerfile_hash(builder):
+    """Test that a missing image is built and labelled with the hash of its Dockerfile"""
+    language = Language.C.info
+
+    images.ensure_image(language)
+
+    assert builder.built == [
+        (language.name, {images.DOCKERFILE_HASH_LABEL: images.dockerfile_hash(language)})
+    ]
+    status = images.image_statuses()[0]
+    assert status.ready and status.error is None
+
+
+@pytest.mark.usefixtures("dockerfiles")
+def test_image_with_matching_label_is_not_rebuilt(client, builder):
+    """Test that an image surviving a restart is reused when its label matches the Dockerfile"""
+    language = Language.C.info
+    client.images.labels[language.image] = {
+        images.DOCKERFILE_HASH_LABEL: images.dockerfile_hash(language)
+    }
+
+    images.ensure_image(language)
+
+    assert not builder.built
+
+
+@pytest.mark.usefixtures("dockerfiles")
+@pytest.mark.parametrize("labels", [None, {}, {images.DOCKERFILE_HASH_LABEL: "stale"}])
+def test_image_with_stale_or_missing_label_is_rebuilt(client, builder, labels):
+    """Test that an existing image without the current Dockerfile hash is rebuilt"""
+    language = Language.C.info
+    client.images.labels[language.image] = labels
+
+    images.ensure_image(language)
+
+    assert len(builder.built) == 1
+
+
+@pytest.mark.usefixtures("dockerfiles")
+def test_ready_image_does_not_ask_docker(client, builder):
+    """Test that a ready image only costs a Dockerfile hash"""
+    language = Language.C.info
+    images.ensure_image(language)
+    lookups = client.images.lookups
+
+    images.ensure_image(language)
+
+    assert client.images.lookups == lookups
+    assert len(builder.built) == 1
+
+
+def test_dockerfile_change_rebuilds_the_image(dockerfiles, builder):
+    """Test that editing the Dockerfile of a ready image triggers a rebuild"""
+    language = Language.C.info
+    images.ensure_image(language)
+    old_hash = images.dockerfile_hash(language)
+    with open(dockerfiles(language), "a", encoding="utf-8") as f:
+        f.write("RUN true\n")
+
+    images.ensure_image(language)
+
+    new_hash = images.dockerfile_hash(language)
+    assert new_hash != old_hash
+    assert [labels for _, labels in builder.built] == [
+        {images.DOCKERFILE_HASH_LABEL: old_hash},
+        {images.DOCKERFILE_HASH_LABEL: new_hash},
+    ]
+    assert images.image_statuses()[0].dockerfile_hash == new_hash
+
+
+@pytest.mark.usefixtures("dockerfiles")
+def test_failed_build_is_reported_and_retried(builder):
+    """Test that a failed build is recorded in the status and retried on the next use"""
+    language = Language.C.info
+    builder.error = docker.errors.BuildError("no space left on device", build_log=[])
+
+    with pytest.raises(docker.errors.BuildError):
+        images.ensure_image(language)
+
+    status = images.image_statuses()[0]
+    assert not status.ready and "no space left" in status.error
+
+    builder.error = None
+    images.ensure_image(language)
+    assert status.ready and status.error is None
+
+
+@pytest.mark.usefixtures("dockerfiles")
+def test_concurrent_requests_build_once(builder):
+    """Test that threads waiting for the same language share a single build"""
+    language = Language.C.info
+    building = threading.Event()
+    release = threading.Event()
+
+    def slow_build(_):
+        building.set()
+        assert release.wait(5)
+
+    builder.before_build = slow_build
+    first = threading.Thread(target=images.ensure_image, args=(language,))
+    first.start()
+    assert building.wait(5)
+    second = threading.Thread(target=images.ensure_image, args=(language,))
+    second.start()
+    release.set()
+    first.join(5)
+    second.join(5)
+
+    assert len(builder.built) == 1
+
+
+@pytest.mark.usefixtures("dockerfiles")
+def test_languages_build_in_parallel(builder):
+    """Test that a slow build of one language does not block the build of another"""
+    c_building = threading.Event()
+    python_built = threading.Event()
+
+    def build(language):
+        if language.name == Language.C.info.name:
+            c_building.set()
+            # Only finishes if Python could build while C holds its lock
+            assert python_built.wait(5)
+
+    builder.before_build = build
+    c = threading.Thread(target=images.ensure_image, args=(Language.C.info,))
+    c.start()
+    assert c_building.wait(5)
+
+    images.ensure_image(Language.PYTHON.info)
+    python_built.set()
+    c.join(5)
+
+    assert sorted(name for name, _ in builder.built) == sorted(
+        [Language.C.info.name, Language.PYTHON.info.name]
+    )
@@ -0,0 +1,85 @@
+from uuid import uuid4
+
+import pytest
+
+from common.languages import Language
+from common.schemas import SubmissionCreate
+from execution_engine.config import settings
+from execution_engine.docker_handler import options
+from execution_engine.docker_handler.runconfig import RunConfig
+
+_MOUNTPOINTS = {
+    options.RUNTIMES_VOLUME_NAME: "/var/lib/docker/volumes/runtimes/_data",
+    options.FRAMEWORKS_VOLUME_NAME: "/var/lib/docker/volumes/frameworks/_data",
+}
+
+
+@pytest.fixture(autouse=True)
+def volumes(monkeypatch):
+    monkeypatch.setattr(options, "_volume_mountpoint", _MOUNTPOINTS.__getitem__)
+    monkeypatch.setattr(settings, "TMP_DIR_PATH_BASE", "/runtimes")
+    monkeypatch.setattr(settings, "FRAMEWORK_LAYERS_VOLUME_PATH", "/frameworks")
+    monkeypatch.setattr(settings, "FRAMEWORK_LAYERS_DIR", "/frameworks/w1")
+
+
+def _config(framework_dir: str | None = None) -> RunConfig:
+    return RunConfig(
+        tmp_dir="/runtimes/execution_run_abc",
+        cpu=0,
+        language=Language.C.info,
+        origin_request=SubmissionCreate(
+            submission_uuid=uuid4(),
+            problem_id=1,
+            user_uuid=uuid4(),
+            language=Language.C,
+            timestamp=0.0,
+            code="int main() {}",
+        ),
+        framework_dir=framework_dir,
+    )
+
+
+def test_job_mounts_only_its_directory():
+    """Test that a job container gets its own directory and nothing else of the runtimes volume"""
+    assert options.job_volumes(_config()) == {
+        "/var/lib/docker/volumes/runtimes/_data/execution_run_abc": {
+            "bind": "/app/execution_run_abc",
+            "mode": "rw",
+        }
+    }
+
+
+def test_job_mounts_its_layer_read_only():
+    """Test that only the layer of the job is mounted, read-only, where the job command looks"""
+    config = _config(framework_dir="/frameworks/w1/0123abcd")
+
+    volumes = options.job_volumes(config)
+
+    assert volumes["/var/lib/docker/volumes/frameworks/_data/w1/0123abcd"] == {
+        "bind": "/frameworks/0123abcd",
+        "mode": "ro",
+    }
+    assert "/frameworks/0123abcd" in options.job_command(config)
+
+
+@pytest.mark.parametrize("tmpfs", [False, True])
+def test_pool_mounts_its_slot_and_layers_read_only(monkeypatch, tmpfs):
+    """Test that a warm container gets its own directory, and the layers read-only with tmpfs"""
+    monkeypatch.setattr(settings, "TMPFS_WORK_DIRS", tmpfs)
+
+    volumes = options.pool_volumes("/runtimes/pool/c_xyz")
+
+    assert volumes.pop("/var/lib/docker/volumes/runtimes/_data/pool/c_xyz") == {
+        "bind": "/app",
+        "mode": "rw",
+    }
+    expected = {
+        "/var/lib/docker/volumes/frameworks/_data/w1": {"bind": "/frameworks", "mode": "ro"}
+    }
+    assert volumes == (expected if tmpfs else {})
+
+
+def test_paths_off_the_volumes_are_refused():
+    """Test that a directory that is not on one of the engine's volumes is never mounted"""
+    with pytest.raises(ValueError):
+        options.job_volumes(_config(framework_dir="/etc"))
@@ -0,0 +1,315 @@
+import itertools
+import os
+import time
+
+import docker.errors
+import pytest
+
+from common.languages import Language
+from execution_engine.config import settings
+from execution_engine.docker_handler import pool as pool_module
+from execution_engine.docker_handler.pool import ContainerPool
+
+_ids = itertools.count()
+
+
+class FakeContainer:
+    def __init__(self, cpu: int, labels: dict[str, str] | None = None):
+        self.id = f"container-{next(_ids)}"
+        self.cpu = cpu
+        self.labels = labels or {}
+        self.status = "running"
+        self.processes = [["sleep infinity"]]
+        self.updates: list[str] = []
+        self.removed = False
+        self.killed = False
+
+    def update(self, cpuset_cpus: str):
+        self.updates.append(cpuset_cpus)
+        self.cpu = int(cpuset_cpus)
+
+    def reload(self):
+        pass
+
+    def top(self) -> dict:
+        return {"Processes": self.processes}
+
+    def remove(self, force: bool = False):
+        assert force
+        self.removed = True
+
+    def kill(self):
+        self.killed = True
+
+
+class FakeContainers:
+    """
+    Stands in for `client.containers`, remembers every container the pool created
+    """
+
+    def __init__(self):
+        self.created: list[FakeContainer] = []
+        self.leftovers: list[FakeContainer] = []
+
+    def run(self, cpuset_cpus: str, labels: dict[str, str], volumes: dict, **_) -> FakeContainer:
+        container = FakeContainer(int(cpuset_cpus), labels)
+        container.volumes = volumes
+        self.created.append(container)
+        return container
+
+    def list(self, **kwargs) -> list[FakeContainer]:
+        assert kwargs == {"all": True, "filters": {"label": pool_module.POOL_LABEL}}
+        return self.leftovers
+
+
+class FakeClient:
+    def __init__(self):
+        self.containers = FakeContainers()
+
+
+@pytest.fixture(autouse=True)
+def pool_settings(monkeypatch):
+    monkeypatch.setattr(pool_module, "ensure_image", lambda language: None)
+    monkeypatch.setattr(
+        pool_module,
+        "container_options",
+        lambda language, cpu, volumes: {
+            "image": language.image,
+            "cpuset_cpus": str(cpu),
+            "volumes": volumes,
+        },
+    )
+    monkeypatch.setattr(
+        pool_module, "pool_volumes", lambda slot: {slot: {"bind": "/app", "mode": "rw"}}
+    )
+    monkeypatch.setattr(settings, "CONTAINER_POOL_SIZE", 2)
+    monkeypatch.setattr(settings, "CONTAINER_POOL_RECYCLE_AFTER_JOBS", 3)
+    monkeypatch.setattr(settings, "CONTAINER_POOL_IDLE_TIMEOUT_SEC", 60)
+
+
+@pytest.fixture
+def client() -> FakeClient:
+    return FakeClient()
+
+
+@pytest.fixture
+def pool(client, tmp_path) -> ContainerPool:
+    return ContainerPool(client, str(tmp_path / "slots"))
+
+
+def _idle(pool: ContainerPool, language: Language) -> list:
+    return pool._idle.get(language.info.name, [])  # pylint: disable=protected-access
+
+
+def test_acquire_creates_a_pinned_container_when_empty(pool, client):
+    """Test that an empty pool creates a container pinned to the requested CPU"""
+    pooled = pool.acquire(Language.C.info, cpu=3)
+
+    assert client.containers.created == [pooled.container]
+    assert pooled.cpu == 3 and pooled.container.cpu == 3
+    assert pooled.container.labels == {
+        pool_module.POOL_LABEL: Language.C.info.name,
+        pool_module.POOL_SLOT_LABEL: pooled.slot,
+    }
+
+
+def test_containers_only_mount_their_own_directory(pool):
+    """Test that every container gets an empty directory of its own as its app directory"""
+    first = pool.acquire(Language.C.info, cpu=0)
+    second = pool.acquire(Language.C.info, cpu=1)
+
+    assert first.slot != second.slot
+    for pooled in (first, second):
+        assert os.path.isdir(pooled.slot) and not os.listdir(pooled.slot)
+        assert pooled.container.volumes == {pooled.slot: {"bind": "/app", "mode": "rw"}}
+
+
+def test_acquire_prefers_a_container_on_the_same_cpu(pool, client):
+    """Test that an idle container already pinned to the CPU is handed out without re-pinning"""
+    first = pool.acquire(Language.C.info, cpu=1)
+    second = pool.acquire(Language.C.info, cpu=2)
+    pool.release(first, reusable=True)
+    pool.release(second, reusable=True)
+
+    pooled = pool.acquire(Language.C.info, cpu=2)
+
+    assert pooled is second
+    assert not pooled.container.updates
+    assert len(client.containers.created) == 2
+
+
+def test_acquire_repins_a_container_from_another_cpu(pool, client):
+    """Test that an idle container on another CPU is moved with `container.update`"""
+    pool.release(pool.acquire(Language.C.info, cpu=1), reusable=True)
+
+    pooled = pool.acquire(Language.C.info, cpu=5)
+
+    assert pooled.cpu == 5
+    assert pooled.container.updates == ["5"]
+    assert len(client.containers.created) == 1
+
+
+def test_acquire_does_not_mix_languages(pool, client):
+    """Test that an idle container of another language is never handed out"""
+    pool.release(pool.acquire(Language.C.info, cpu=1), reusable=True)
+
+    pooled = pool.acquire(Language.PYTHON.info, cpu=1)
+
+    assert pooled.language == Language.PYTHON.info
+    assert len(client.containers.created) == 2
+
+
+def test_release_keeps_clean_containers(pool):
+    """Test that a clean container goes back to the idle list"""
+    pooled = pool.acquire(Language.C.info, cpu=0)
+
+    pool.release(pooled, reusable=True)
+
+    assert _idle(pool, Language.C) == [pooled]
+    assert pooled.jobs_run == 1 and not pooled.container.removed
+
+
+def test_release_destroys_unusable_containers(pool):
+    """Test that a container is destroyed when the job says it can't be reused"""
+    pooled = pool.acquire(Language.C.info, cpu=0)
+
+    pool.release(pooled, reusable=False)
+
+    assert not _idle(pool, Language.C)
+    assert pooled.container.removed
+    assert not os.path.exists(pooled.slot)
+
+
+def test_release_destroys_containers_with_files_left_behind(pool):
+    """Test that a container is not reused if the job left files the next job could read"""
+    pooled = pool.acquire(Language.C.info, cpu=0)
+    with open(os.path.join(pooled.slot, "answers.txt"), "w", encoding="utf-8") as f:
+        f.write("42")
+
+    pool.release(pooled, reusable=True)
+
+    assert not _idle(pool, Language.C)
+    assert pooled.container.removed and not os.path.exists(pooled.slot)
+
+
+@pytest.mark.parametrize(
+    "status, processes",
+    [("exited", [["sleep infinity"]]), ("running", [["sleep infinity"], ["./a.out"]])],
+)
+def test_release_destroys_dirty_containers(pool, status, processes):
+    """Test that a stopped container or one with leftover processes is not reused"""
+    pooled = pool.acquire(Language.C.info, cpu=0)
+    pooled.container.status = status
+    pooled.container.processes = processes
+
+    pool.release(pooled, reusable=True)
+
+    assert not _idle(pool, Language.C)
+    assert pooled.container.removed
+
+
+def test_release_destroys_containers_docker_can_not_inspect(pool):
+    """Test that a container whose state can't be checked is not reused"""
+    pooled = pool.acquire(Language.C.info, cpu=0)
+
+    def reload():
+        raise docker.errors.APIError("no such container")
+
+    pooled.container.reload = reload
+    pool.release(pooled, reusable=True)
+
+    assert pooled.container.removed
+
+
+def test_release_recycles_after_configured_jobs(pool):
+    """Test that a container is replaced once it ran the configured number of jobs"""
+    pooled = pool.acquire(Language.C.info, cpu=0)
+    for _ in range(settings.CONTAINER_POOL_RECYCLE_AFTER_JOBS - 1):
+        pool.release(pooled, reusable=True)
+        assert pool.acquire(Language.C.info, cpu=0) is pooled
+
+    pool.release(pooled, reusable=True)
+
+    assert pooled.container.removed
+    assert not _idle(pool, Language.C)
+
+
+def test_release_caps_the_pool_size(pool):
+    """Test that containers beyond the pool size are destroyed instead of kept idle"""
+    acquired = [pool.acquire(Language.C.info, cpu=cpu) for cpu in range(3)]
+
+    for pooled in acquired:
+        pool.release(pooled, reusable=True)
+
+    assert _idle(pool, Language.C) == acquired[:2]
+    assert acquired[2].container.removed
+
+
+def test_kill_targets_the_container_on_that_cpu(pool):
+    """Test that `kill` only kills the container running a job on the given CPU"""
+    busy = pool.acquire(Language.C.info, cpu=0)
+    other = pool.acquire(Language.C.info, cpu=1)
+
+    pool.kill(0)
+    pool.kill(7)
+
+    assert busy.container.killed and not other.container.killed
+
+
+def test_kill_after_release_does_nothing(pool):
+    """Test that a released container is no longer killed for its old CPU"""
+    pooled = pool.acquire(Language.C.info, cpu=0)
+    pool.release(pooled, reusable=True)
+
+    pool.kill(0)
+
+    assert not pooled.container.killed
+
+
+def test_maintain_without_demand_creates_nothing(pool, client):
+    """Test that languages nobody asked for are not warmed up"""
+    pool.maintain([0, 1])
+
+    assert not client.containers.created
+
+
+def test_maintain_tops_up_languages_in_demand(pool, client):
+    """Test that a recently used language is filled up to the pool size, round-robin over CPUs"""
+    pool.release(pool.acquire(Language.C.info, cpu=0), reusable=False)
+
+    pool.maintain([4, 5])
+
+    idle = _idle(pool, Language.C)
+    assert [pooled.cpu for pooled in idle] == [4, 5]
+    assert not _idle(pool, Language.PYTHON)
+    assert len(client.containers.created) == 3
+
+
+def test_maintain_evicts_idle_containers(pool):
+    """Test that containers idle for longer than the timeout are removed"""
+    stale = pool.acquire(Language.C.info, cpu=0)
+    fresh = pool.acquire(Language.C.info, cpu=1)
+    pool.release(stale, reusable=True)
+    pool.release(fresh, reusable=True)
+    stale.last_used = time.monotonic() - settings.CONTAINER_POOL_IDLE_TIMEOUT_SEC - 1
+    # Demand is old as well, so the evicted container isn't replaced
+    pool._last_demand.clear()  # pylint: disable=protected-access
+
+    pool.maintain([0])
+
+    assert _idle(pool, Language.C) == [fresh]
+    assert stale.container.removed and not fresh.container.removed
+
+
+def test_warm_up_removes_leftovers_and_fills_all_pools(pool, client, tmp_path):
+    """Test that warm-up cleans containers of a previous run and warms every language"""
+    leftover_slot = tmp_path / "leftover"
+    leftover_slot.mkdir()
+    leftover = FakeContainer(cpu=0, labels={pool_module.POOL_SLOT_LABEL: str(leftover_slot)})
+    client.containers.leftovers = [leftover]
+
+    pool.warm_up([0])
+
+    assert leftover.removed and not leftover_slot.exists()
+    for language in Language:
+        assert len(_idle(pool, language)) == settings.CONTAINER_POOL_SIZE
@@ -0,0 +1,72 @@
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+FRAMEWORK_DIR = Path(__file__).parents[4] / "storage-example" / "frameworks" / "c"
+
+# Prints the input plus one, and nothing at all for 0
+_WRAPPER = """
+#include "wrapper.h"
+
+#include <stdbool.h>
+
+#include "deserialiser.h"
+#include "serialiser.h"
+
+bool wrapper() {
+    int input;
+    if (!try_deserialise_single_int(&input)) return false;
+    if (input != 0) serialise_single_int(input + 1);
+    return true;
+}
+"""
+
+pytestmark = pytest.mark.skipif(
+    not FRAMEWORK_DIR.exists() or shutil.which("make") is None or shutil.which("gcc") is None,
+    reason="Needs the framework sources, make and gcc",
+)
+
+
+@pytest.fixture(name="run_cases", scope="module")
+def run_cases_fixture(tmp_path_factory):
+    """
+    Builds the framework, and runs its correctness mode on the given input and expected output
+    """
+    build_dir = tmp_path_factory.mktemp("framework")
+    shutil.copytree(FRAMEWORK_DIR, build_dir, dirs_exist_ok=True)
+    (build_dir / "wrapper.c").write_text(_WRAPPER)
+    subprocess.run(["make"], cwd=build_dir, check=True, capture_output=True)
+
+    def run(inputs: str, expected: str) -> tuple[int, list[str]]:
+        (build_dir / "input.txt").write_text(inputs)
+        (build_dir / "output.txt").write_text(expected)
+        process = subprocess.run(
+            ["./main", "--cases", "cases.txt", "0", "output.txt", "-"],
+            cwd=build_dir,
+            input=inputs,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        # Below the header, "<case> <status> <user usec> <system usec>"
+        report = (build_dir / "cases.txt").read_text().splitlines()[1:]
+        return process.returncode, [line.split()[1] for line in report]
+
+    return run
+
+
+def test_cases_pass(run_cases):
+    """Test that matching output passes every case"""
+    assert run_cases("1\n2\n", "2\n3\n") == (0, ["pass", "pass"])
+
+
+def test_case_without_output_fails(run_cases):
+    """Test that a case that prints nothing is a wrong answer"""
+    assert run_cases("1\n0\n2\n", "2\n1\n3\n") == (3, ["pass", "fail"])
+
+
+def test_wrong_case_fails(run_cases):
+    """Test that the first wrong case stops the run"""
+    assert run_cases("1\n2\n", "2\n4\n") == (3, ["pass", "fail"])
@@ -0,0 +1,186 @@
+import asyncio
+import sqlite3
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from common.languages import Language
+from common.schemas import SubmissionCreate
+from execution_engine.api import endpoints
+from execution_engine.config import settings
+from execution_engine.jobs.dispatcher import Dispatcher
+from execution_engine.jobs.store import JobStore, QueueFullError
+
+
+@pytest.fixture(name="store")
+def store_fixture(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"), max_pending=10)
+    yield store
+    store.close()
+
+
+def _request() -> SubmissionCreate:
+    return SubmissionCreate(
+        submission_uuid=uuid4(),
+        problem_id=1,
+        user_uuid=uuid4(),
+        language=Language.C,
+        timestamp=0.0,
+        code="int main() {}",
+    )
+
+
+async def _until(condition, timeout_sec: float = 5.0) -> None:
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(poll(), timeout_sec)
+
+
+async def _stop(task: asyncio.Task) -> None:
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+def test_jobs_in_flight_are_bounded(store):
+    """Test that no more than `max_in_flight` jobs run at once, and the rest follow"""
+    started: list[SubmissionCreate] = []
+    finish = asyncio.Event()
+
+    async def execute(request: SubmissionCreate):
+        started.append(request)
+        await finish.wait()
+
+    async def dispatch():
+        dispatcher = Dispatcher(store, max_in_flight=2, execute=execute)
+        for _ in range(4):
+            await dispatcher.submit(_request())
+        task = asyncio.create_task(dispatcher.run())
+
+        await _until(lambda: len(started) == 2)
+        await asyncio.sleep(0.1)
+        assert len(started) == 2
+        assert await dispatcher.depth() == (2, 2)
+
+        finish.set()
+        await _until(lambda: len(started) == 4)
+        await _until(lambda: store.depth() == (0, 0))
+        await _stop(task)
+
+    asyncio.run(dispatch())
+
+
+def test_cancelled_job_releases_its_slot(store):
+    """Test that a cancelled job frees its slot and stays in the queue to be replayed"""
+    executed: list[SubmissionCreate] = []
+    cancelled, other = _request(), _request()
+
+    async def execute(request: SubmissionCreate):
+        if request == cancelled:
+            raise asyncio.CancelledError
+        executed.append(request)
+
+    async def dispatch():
+        dispatcher = Dispatcher(store, max_in_flight=1, execute=execute)
+        await dispatcher.submit(cancelled)
+        await dispatcher.submit(other)
+        task = asyncio.create_task(dispatcher.run())
+
+        await _until(lambda: executed == [other])
+        await _until(lambda: store.depth() == (0, 1))
+        await _stop(task)
+
+    asyncio.run(dispatch())
+
+    # Picked up again by the next engine start
+    assert store.requeue_running() == 1
+    assert store.claim().request == cancelled
+
+
+def test_failed_job_is_completed(store):
+    """Test that a job whose execution raised is removed and frees its slot"""
+    executed: list[SubmissionCreate] = []
+    failing, other = _request(), _request()
+
+    async def execute(request: SubmissionCreate):
+        executed.append(request)
+        if request == failing:
+            raise RuntimeError("boom")
+
+    async def dispatch():
+        dispatcher = Dispatcher(store, max_in_flight=1, execute=execute)
+        await dispatcher.submit(failing)
+        await dispatcher.submit(other)
+        task = asyncio.create_task(dispatcher.run())
+
+        await _until(lambda: store.depth() == (0, 0) and len(executed) == 2)
+        await _stop(task)
+
+    asyncio.run(dispatch())
+
+
+def test_interrupted_jobs_are_replayed_on_startup(store):
+    """Test that jobs left running by a previous engine process are executed again"""
+    interrupted = _request()
+    store.enqueue(interrupted)
+    assert store.claim().request == interrupted
+    executed: list[SubmissionCreate] = []
+
+    async def execute(request: SubmissionCreate):
+        executed.append(request)
+
+    async def dispatch():
+        dispatcher = Dispatcher(store, max_in_flight=1, execute=execute)
+        task = asyncio.create_task(dispatcher.run())
+
+        await _until(lambda: executed == [interrupted])
+        await _until(lambda: store.depth() == (0, 0))
+        await _stop(task)
+
+    asyncio.run(dispatch())
+
+
+class FailingDispatcher:
+    def __init__(self, error: Exception):
+        self.error = error
+
+    async def submit(self, _request: SubmissionCreate) -> None:
+        raise self.error
+
+
+@pytest.fixture(name="api")
+def api_fixture():
+    app = FastAPI()
+    app.include_router(endpoints.router, prefix="/api")
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    "error, status_code",
+    [(QueueFullError(), 429), (sqlite3.OperationalError("disk I/O error"), 503)],
+)
+def test_execute_refuses_jobs_it_can_not_queue(api, monkeypatch, error, status_code):
+    """Test that /api/execute answers 429 on a full queue and 503 if the queue is broken"""
+    monkeypatch.setattr(endpoints, "dispatcher", FailingDispatcher(error))
+
+    response = api.post("/api/execute", json=_request().model_dump(mode="json"))
+
+    assert response.status_code == status_code
+    assert response.headers["Retry-After"] == str(settings.JOB_QUEUE_RETRY_AFTER_SEC)
+
+
+def test_execute_queues_the_job(api, monkeypatch, store):
+    """Test that /api/execute stores the job and answers 201"""
+    request = _request()
+    monkeypatch.setattr(
+        endpoints, "dispatcher", Dispatcher(store, max_in_flight=1, execute=lambda _: None)
+    )
+
+    response = api.post("/api/execute", json=request.model_dump(mode="json"))
+
+    assert response.status_code == 201
+    assert store.claim().request == request
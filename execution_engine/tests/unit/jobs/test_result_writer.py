@@ -0,0 +1,91 @@
+import asyncio
+from uuid import UUID, uuid4
+
+import httpx
+import pytest
+
+from common.schemas import SubmissionResult
+from execution_engine.jobs.result_writer import ResultWriter
+from execution_engine.jobs.result_spool import ResultSpool
+
+
+class FakeDB:
+    def __init__(self, down: bool = False):
+        self.down = down
+        self.batches: list[list[UUID]] = []
+
+    async def __call__(self, results: list[SubmissionResult]) -> list[UUID]:
+        if self.down:
+            raise httpx.ConnectError("connection refused")
+        self.batches.append([result.submission_uuid for result in results])
+        return []
+
+
+@pytest.fixture(name="spool")
+def spool_fixture(tmp_path):
+    spool = ResultSpool(str(tmp_path / "data" / "result_spool.sqlite3"))
+    yield spool
+    spool.close()
+
+
+def _writer(spool: ResultSpool, db: FakeDB) -> ResultWriter:
+    return ResultWriter(
+        spool,
+        max_items=2,
+        max_delay_sec=0.05,
+        retry_interval_sec=0.01,
+        max_retry_interval_sec=0.01,
+        send=db,
+    )
+
+
+def _result() -> SubmissionResult:
+    return SubmissionResult(
+        submission_uuid=uuid4(),
+        runtime_ms=1.0,
+        emissions_kg=0.0,
+        energy_usage_kwh=0.0,
+        successful=True,
+        error_reason=None,
+        error_msg=None,
+    )
+
+
+def test_batches_by_size_and_delay(spool):
+    """Test that results are sent in full batches, and the remainder after the delay"""
+    db = FakeDB()
+    writer = _writer(spool, db)
+    results = [_result() for _ in range(3)]
+
+    async def write():
+        task = asyncio.create_task(writer.run())
+        for result in results:
+            await writer.submit(result)
+        await asyncio.sleep(0.2)
+        task.cancel()
+
+    asyncio.run(write())
+    assert db.batches == [
+        [results[0].submission_uuid, results[1].submission_uuid],
+        [results[2].submission_uuid],
+    ]
+    assert spool.depth() == 0
+
+
+def test_kept_while_db_down(spool):
+    """Test that results stay spooled while the DB handler is down, and are written afterwards"""
+    db = FakeDB(down=True)
+    writer = _writer(spool, db)
+    result = _result()
+
+    async def write():
+        await writer.submit(result)
+        assert not await writer.flush()
+        assert spool.depth() == 1
+
+        db.down = False
+        assert await writer.flush()
+
+    asyncio.run(write())
+    assert db.batches == [[result.submission_uuid]]
+    assert spool.depth() == 0
@@ -0,0 +1,114 @@
+from uuid import UUID, uuid4
+
+import pytest
+
+from common.languages import Language
+from common.schemas import SubmissionCreate
+from execution_engine.jobs.store import JobStore, QueueFullError
+
+
+@pytest.fixture(name="store")
+def store_fixture(tmp_path):
+    store = JobStore(str(tmp_path / "data" / "jobs.sqlite3"), max_pending=2)
+    yield store
+    store.close()
+
+
+def _request(user: UUID | None = None, priority: int = 0) -> SubmissionCreate:
+    return SubmissionCreate(
+        submission_uuid=uuid4(),
+        problem_id=1,
+        user_uuid=user or uuid4(),
+        language=Language.C,
+        timestamp=0.0,
+        code="int main() {}",
+        priority=priority,
+    )
+
+
+def test_claim_in_order(store):
+    """Test that jobs are claimed oldest first and only once"""
+    first, second = _request(), _request()
+    store.enqueue(first)
+    store.enqueue(second)
+
+    assert store.claim().request == first
+    assert store.claim().request == second
+    assert store.claim() is None
+
+
+def test_claim_priority(store):
+    """Test that a job with a higher priority is claimed first"""
+    first, urgent = _request(), _request(priority=1)
+    store.enqueue(first)
+    store.enqueue(urgent)
+
+    assert store.claim().request == urgent
+
+
+def test_claim_fair(tmp_path):
+    """Test that a user without running jobs goes before a user with running jobs"""
+    store = JobStore(str(tmp_path / "jobs.sqlite3"), max_pending=10)
+    spammer = uuid4()
+    store.enqueue(_request(user=spammer))
+    store.enqueue(_request(user=spammer))
+    other = _request()
+    store.enqueue(other)
+
+    store.claim(fair=True)
+
+    assert store.claim(fair=True).request == other
+    store.close()
+
+
+def test_enqueue_full(store):
+    """Test that a job is refused once the maximum number of pending jobs is reached"""
+    store.enqueue(_request())
+    store.enqueue(_request())
+
+    with pytest.raises(QueueFullError):
+        store.enqueue(_request())
+
+
+def test_running_jobs_free_space(store):
+    """Test that claimed jobs don't count towards the maximum"""
+    store.enqueue(_request())
+    store.enqueue(_request())
+    store.claim()
+
+    store.enqueue(_request())
+
+    assert store.depth() == (2, 1)
+
+
+def test_duplicate_ignored(store):
+    """Test that submitting the same submission twice queues it once"""
+    request = _request()
+    store.enqueue(request)
+    store.enqueue(request)
+
+    assert store.depth() == (1, 0)
+
+
+def test_complete(store):
+    """Test that a completed job is removed"""
+    store.enqueue(_request())
+    job = store.claim()
+    store.complete(job.job_id)
+
+    assert store.depth() == (0, 0)
+
+
+def test_replay_after_restart(tmp_path):
+    """Test that a job that was running when the engine stopped is pending again after restart"""
+    path = str(tmp_path / "jobs.sqlite3")
+    store = JobStore(path, max_pending=2)
+    request = _request()
+    store.enqueue(request)
+    store.claim()
+    store.close()
+
+    restarted = JobStore(path, max_pending=2)
+    assert restarted.requeue_running() == 1
+    assert restarted.claim().request == request
+    restarted.close()
@@ -0,0 +1,164 @@
+import asyncio
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from execution_engine.measurement import calibration
+from execution_engine.measurement.calibration import (
+    Calibrator,
+    baseline,
+    plan,
+    reference,
+    run_kernel,
+)
+from execution_engine.measurement.measurement import Measurement
+
+
+def test_baseline_noise():
+    """Test that the noise is the coefficient of variation of the samples"""
+    b = baseline(3, [1.0, 1.2, 0.8])
+
+    assert b.cpu == 3
+    assert b.mean_s == pytest.approx(1.0)
+    assert b.noise == pytest.approx(0.2)
+    assert b.samples == 3
+
+
+def test_baseline_without_samples():
+    """Test that a calibration without samples is refused"""
+    with pytest.raises(ValueError):
+        baseline(0, [])
+
+
+def test_plan_factors_and_exclusions():
+    """Test that factors are relative to the median quiet core and noisy cores are excluded"""
+    baselines = {
+        0: baseline(0, [1.0, 1.0, 1.0]),
+        1: baseline(1, [1.1, 1.1, 1.1]),
+        2: baseline(2, [0.9, 0.9, 0.9]),
+        3: baseline(3, [0.5, 1.0, 1.5]),
+    }
+    plan(baselines, max_noise=0.05, reference_s=reference(baselines, max_noise=0.05))
+
+    assert baselines[0].factor == pytest.approx(1.0)
+    assert baselines[1].factor == pytest.approx(1.1)
+    assert baselines[2].factor == pytest.approx(0.9)
+    assert [cpu for cpu, b in baselines.items() if b.excluded] == [3]
+
+
+def test_plan_keeps_all_cores_if_all_noisy():
+    """Test that there is always a core left to run jobs on"""
+    baselines = {0: baseline(0, [0.5, 1.5]), 1: baseline(1, [1.0, 3.0])}
+    plan(baselines, max_noise=0.05, reference_s=reference(baselines, max_noise=0.05))
+
+    assert not any(b.excluded for b in baselines.values())
+
+
+def test_normalize():
+    """Test that time based parts of a measurement are divided by the factor of its core"""
+    calibrator = Calibrator(max_noise=0.05, normalize=True, epoch_sec=3600)
+    calibrator.record({0: [1.0, 1.0], 1: [2.0, 2.0], 2: [3.0, 3.0]}, complete=True)
+
+    measurement = Measurement(
+        runtime_s=4.0,
+        energy_kwh=2.0,
+        emissions_kg=1.0,
+        cpu_time_s=4.0,
+        runtime_stddev_s=0.4,
+        memory_peak_bytes=1024,
+    )
+    normalized = calibrator.normalize(2, measurement)
+
+    assert normalized.runtime_s == pytest.approx(4.0 / 1.5)
+    assert normalized.energy_kwh == pytest.approx(2.0 / 1.5)
+    assert normalized.emissions_kg == pytest.approx(1.0 / 1.5)
+    assert normalized.cpu_time_s == pytest.approx(4.0 / 1.5)
+    assert normalized.runtime_stddev_s == pytest.approx(0.4 / 1.5)
+    assert normalized.memory_peak_bytes == 1024
+
+    # Not calibrated
+    assert calibrator.normalize(5, measurement) == measurement
+    disabled = Calibrator(max_noise=0.05, normalize=False, epoch_sec=3600)
+    assert disabled.normalize(2, measurement) == measurement
+
+
+def test_normalize_within_noise():
+    """Test that a core is not corrected for a difference within the noise of the kernel"""
+    calibrator = Calibrator(max_noise=0.1, normalize=True, epoch_sec=3600)
+    # Core 1 is 2% slower, with 5.5% noise
+    calibrator.record({0: [1.0, 1.0], 1: [0.98, 1.06]}, complete=True)
+
+    measurement = Measurement(runtime_s=4.0, energy_kwh=2.0, emissions_kg=1.0)
+
+    assert calibrator.normalize(1, measurement) == measurement
+
+
+def test_reference_is_fixed_within_an_epoch():
+    """Test that recalibrating cores doesn't move the reference until the next epoch"""
+    calibrator = Calibrator(max_noise=0.05, normalize=True, epoch_sec=3600)
+    calibrator.record({0: [1.0, 1.0], 1: [2.0, 2.0], 2: [3.0, 3.0]}, complete=True)
+
+    # Core 0 and 1 got slower, the median of the quiet cores would now be 3.0
+    calibrator.record({0: [4.0, 4.0], 1: [3.0, 3.0]}, complete=False)
+    calibrator.record({0: [4.0, 4.0], 1: [3.0, 3.0], 2: [3.0, 3.0]}, complete=True)
+
+    assert calibrator.epoch()["reference_s"] == pytest.approx(2.0)
+    assert [b["factor"] for b in calibrator.snapshot()] == pytest.approx([2.0, 1.5, 1.5])
+
+
+def test_complete_round_starts_a_new_epoch(monkeypatch):
+    """Test that the reference is replaced by the first complete calibration after an epoch"""
+    now = [1000.0]
+    monkeypatch.setattr(calibration.time, "time", lambda: now[0])
+    calibrator = Calibrator(max_noise=0.05, normalize=True, epoch_sec=3600)
+    calibrator.record({0: [1.0, 1.0], 1: [2.0, 2.0], 2: [3.0, 3.0]}, complete=True)
+
+    now[0] += 3600
+    calibrator.record({0: [4.0, 4.0], 1: [3.0, 3.0]}, complete=False)
+    assert calibrator.epoch()["reference_s"] == pytest.approx(2.0)
+
+    calibrator.record({0: [4.0, 4.0], 1: [3.0, 3.0], 2: [3.0, 3.0]}, complete=True)
+    assert calibrator.epoch() == {"reference_s": pytest.approx(3.0), "started_at": now[0]}
+
+
+def test_first_round_starts_an_epoch_even_if_incomplete():
+    """Test that there is a reference as soon as some core was calibrated"""
+    calibrator = Calibrator(max_noise=0.05, normalize=True, epoch_sec=3600)
+    calibrator.record({}, complete=False)
+    assert calibrator.epoch()["reference_s"] is None
+
+    calibrator.record({1: [2.0, 2.0]}, complete=False)
+    assert calibrator.epoch()["reference_s"] == pytest.approx(2.0)
+
+
+@pytest.fixture(name="kernel", scope="module")
+def kernel_fixture(tmp_path_factory) -> str:
+    if shutil.which("gcc") is None:
+        pytest.skip("gcc is not available")
+    kernel = str(tmp_path_factory.mktemp("kernel") / "calibration_kernel")
+    source = os.path.join(os.path.dirname(calibration.__file__), "kernel.c")
+    subprocess.run(["gcc", "-O2", "-o", kernel, source], check=True)
+    return kernel
+
+
+def test_run_kernel(kernel):
+    """Test that the reference kernel runs pinned and reports every sample but the warm-up"""
+    cpu = min(os.sched_getaffinity(0))
+    samples = asyncio.run(run_kernel(kernel, cpu, samples=3, iterations=1000, timeout_sec=30))
+
+    assert len(samples) == 3
+    assert all(sample >= 0 for sample in samples)
+
+
+def test_run_kernel_unknown_cpu(kernel):
+    """Test that pinning to a CPU that doesn't exist fails"""
+    with pytest.raises(RuntimeError):
+        asyncio.run(run_kernel(kernel, 100000, samples=1, iterations=10, timeout_sec=30))
+
+
+def test_run_kernel_missing():
+    """Test that a kernel that isn't built fails to start"""
+    with pytest.raises(OSError):
+        asyncio.run(run_kernel("/nonexistent/kernel", 0, samples=1, iterations=10, timeout_sec=30))
@@ -0,0 +1,31 @@
+import math
+
+import pytest
+
+from execution_engine.measurement.statistics import summarize
+
+
+def test_summarize_per_run():
+    """Test that batched samples are averaged per run"""
+    stats = summarize([(2, 4.0, 0.0), (1, 2.0, 1.0), (4, 8.0, 0.0)])
+
+    assert stats.mean == pytest.approx(2.0)
+    assert stats.stddev == pytest.approx(0.0)
+    assert stats.count == 3
+
+
+def test_summarize_spread():
+    """Test the sample standard deviation and relative error"""
+    stats = summarize([(1, 1.0, 0.0), (1, 3.0, 0.0)])
+
+    assert stats.mean == pytest.approx(2.0)
+    assert stats.stddev == pytest.approx(math.sqrt(2))
+    assert stats.relative_error == pytest.approx(1.96 * math.sqrt(2) / math.sqrt(2) / 2.0)
+
+
+def test_summarize_single_sample():
+    """Test that a single sample has no spread and an unknown error"""
+    stats = summarize([(1, 1.0, 0.0)])
+
+    assert stats.stddev == 0.0
+    assert stats.relative_error == math.inf
@@ -0,0 +1,32 @@
+import asyncio
+import time
+
+from execution_engine.metrics.loop_lag import LoopLagMonitor
+
+
+def test_snapshot_empty():
+    """Test the snapshot before any sample was taken"""
+    assert LoopLagMonitor(interval_sec=0.01).snapshot() == {
+        "samples": 0,
+        "last_ms": 0.0,
+        "max_ms": 0.0,
+        "mean_ms": 0.0,
+    }
+
+
+def test_blocking_call_shows_as_lag():
+    """Test that blocking the event loop is measured as lag"""
+    monitor = LoopLagMonitor(interval_sec=0.01)
+
+    async def block_loop():
+        task = asyncio.create_task(monitor.run())
+        await asyncio.sleep(0)  # Let the monitor start sleeping
+        time.sleep(0.1)  # Blocks the loop
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    asyncio.run(block_loop())
+
+    snapshot = monitor.snapshot()
+    assert snapshot["samples"] >= 1
+    assert snapshot["max_ms"] >= 50
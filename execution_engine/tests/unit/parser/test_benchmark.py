@@ -0,0 +1,39 @@
+import pytest
+
+from execution_engine.errors.errors import ParseError
+from execution_engine.parsers.benchmark import parse
+
+
+@pytest.fixture(name="report_file")
+def report_file_fixture(tmp_path):
+    def write(content: str) -> str:
+        path = tmp_path / "benchmark.txt"
+        path.write_text(content)
+        return str(path)
+
+    return write
+
+
+def test_parse_samples(report_file):
+    """Test that every sample is parsed to seconds"""
+    samples = parse(report_file("runs user_usec system_usec\n1 30 0\n4 13 2\n"))
+
+    assert samples == [(1, 30e-6, 0.0), (4, 13e-6, 2e-6)]
+
+
+def test_parse_no_samples(report_file):
+    """Test that a report with only a header is rejected"""
+    with pytest.raises(ParseError):
+        parse(report_file("runs user_usec system_usec\n"))
+
+
+def test_parse_malformed_line(report_file):
+    """Test that a malformed line is rejected"""
+    with pytest.raises(ParseError):
+        parse(report_file("runs user_usec system_usec\n1 thirty 0\n"))
+
+
+def test_parse_sample_without_runs(report_file):
+    """Test that a sample over zero runs is rejected"""
+    with pytest.raises(ParseError):
+        parse(report_file("runs user_usec system_usec\n0 30 0\n"))
@@ -0,0 +1,54 @@
+import pytest
+
+from execution_engine.errors.errors import ParseError
+from execution_engine.parsers.cgroup import parse
+
+_CPU_STAT = (
+    "{snapshot} usage_usec {usage}\n"
+    "{snapshot} user_usec {user}\n"
+    "{snapshot} system_usec {system}\n"
+    "{snapshot} nr_periods 0\n"
+)
+
+
+@pytest.fixture(name="cgroup_file")
+def cgroup_file_fixture(tmp_path):
+    def write(content: str) -> str:
+        path = tmp_path / "cgroup.txt"
+        path.write_text(content)
+        return str(path)
+
+    return write
+
+
+def test_parse_cgroup(cgroup_file):
+    """Test that CPU time is the difference between the snapshots"""
+    runs, user_s, system_s = parse(
+        cgroup_file(
+            "measured runs 100\n"
+            + _CPU_STAT.format(snapshot="before", usage=1_200_000, user=1_000_000, system=200_000)
+            + _CPU_STAT.format(snapshot="after", usage=4_700_000, user=4_000_000, system=700_000)
+        )
+    )
+
+    assert runs == 100
+    assert user_s == pytest.approx(3.0)
+    assert system_s == pytest.approx(0.5)
+
+
+@pytest.mark.parametrize("content", [
+    # Program failed before the second snapshot
+    "measured runs 1\n" + _CPU_STAT.format(snapshot="before", usage=0, user=0, system=0),
+    # Unknown snapshot
+    "measured runs 1\nduring user_usec 5\n",
+    "measured runs 0\n"
+    + _CPU_STAT.format(snapshot="before", usage=0, user=0, system=0)
+    + _CPU_STAT.format(snapshot="after", usage=10, user=5, system=5),
+    "measured runs 1\n"
+    + _CPU_STAT.format(snapshot="before", usage=10, user=5, system=5)
+    + _CPU_STAT.format(snapshot="after", usage=0, user=0, system=0),
+])
+def test_parse_malformed(cgroup_file, content):
+    """Test that incomplete or inconsistent reports are refused"""
+    with pytest.raises(ParseError):
+        parse(cgroup_file(content))
@@ -0,0 +1,83 @@
+import pytest
+
+from execution_engine.errors.errors import ParseError
+from execution_engine.parsers.gnu_time import parse
+
+_TIME_OUTPUT = """\
+\tCommand being timed: "./main --benchmark 100 /dev/null"
+\tUser time (seconds): 0.52
+\tSystem time (seconds): 0.01
+\tPercent of CPU this job got: 99%
+\tElapsed (wall clock) time (h:mm:ss or m:ss): 0:00.53
+\tAverage shared text size (kbytes): 0
+\tAverage unshared data size (kbytes): 0
+\tAverage stack size (kbytes): 0
+\tAverage total size (kbytes): 0
+\tMaximum resident set size (kbytes): 1664
+\tAverage resident set size (kbytes): 0
+\tMajor (requiring I/O) page faults: 2
+\tMinor (reclaiming a frame) page faults: 76
+\tVoluntary context switches: 1
+\tInvoluntary context switches: 3
+\tSwaps: 0
+\tFile system inputs: 0
+\tFile system outputs: 0
+\tSocket messages sent: 0
+\tSocket messages received: 0
+\tSignals delivered: 0
+\tPage size (bytes): 4096
+\tExit status: {exit_status}
+"""
+
+
+@pytest.fixture(name="time_file")
+def time_file_fixture(tmp_path):
+    def write(content: str) -> str:
+        path = tmp_path / "time.txt"
+        path.write_text(content)
+        return str(path)
+
+    return write
+
+
+def test_parse_time(time_file):
+    """Test that all fields are read"""
+    report = parse(time_file("Runs: 100\n" + _TIME_OUTPUT.format(exit_status=0)))
+
+    assert report.runs == 100
+    assert report.user_s == pytest.approx(0.52)
+    assert report.system_s == pytest.approx(0.01)
+    assert report.max_rss_kb == 1664
+    assert report.voluntary_context_switches == 1
+    assert report.involuntary_context_switches == 3
+    assert report.major_page_faults == 2
+    assert report.minor_page_faults == 76
+
+
+def test_parse_failed_program(time_file):
+    """Test that the report of a program that failed is refused"""
+    with pytest.raises(ParseError):
+        parse(
+            time_file(
+                "Runs: 100\nCommand exited with non-zero status 1\n"
+                + _TIME_OUTPUT.format(exit_status=1)
+            )
+        )
+
+
+def test_parse_killed_program(time_file):
+    """Test that the report of a program that was killed is refused"""
+    with pytest.raises(ParseError):
+        parse(time_file("Runs: 100\nCommand terminated by signal 9\n"))
+
+
+@pytest.mark.parametrize("content", [
+    _TIME_OUTPUT.format(exit_status=0),  # No runs
+    "Runs: 0\n" + _TIME_OUTPUT.format(exit_status=0),
+    "Runs: 100\n" + _TIME_OUTPUT.format(exit_status=0).replace("1664", "lots"),
+    "Runs: 100\n\tUser time (seconds): 0.52\n",
+])
+def test_parse_malformed(time_file, content):
+    """Test that incomplete or malformed reports are refused"""
+    with pytest.raises(ParseError):
+        parse(time_file(content))
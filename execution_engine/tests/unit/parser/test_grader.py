@@ -1,7 +1,21 @@
 import pytest
 
 from execution_engine.errors.errors import TestsFailedError
-from execution_engine.parsers.grader import grader
+from execution_engine.parsers.grader import comparator, grader
+
+
+@pytest.fixture(name="grade")
+def grade_fixture(tmp_path):
+    """Writes the inputs and outputs to files and grades them"""
+    def grade(inputs: str, expected: str, actual: str, **kwargs):
+        paths = []
+        for name, content in (("input", inputs), ("expected", expected), ("actual", actual)):
+            path = tmp_path / f"{name}.txt"
+            path.write_text(content)
+            paths.append(str(path))
+        grader(*paths, **kwargs)
+
+    return grade
 
 
 @pytest.fixture(name="perfect_match")
@@ -40,16 +54,16 @@ def whitespace_variation_fixture():
     }
 
 
-def test_perfect_match(perfect_match):
+def test_perfect_match(grade, perfect_match):
     """Test when actual output matches expected exactly"""
-    grader(perfect_match["input"], perfect_match["expected"], perfect_match["actual"])
+    grade(perfect_match["input"], perfect_match["expected"], perfect_match["actual"])
     # No exception should be raised
 
 
-def test_length_mismatch(length_mismatch):
+def test_length_mismatch(grade, length_mismatch):
     """Test when line counts don't match"""
     with pytest.raises(TestsFailedError) as exc_info:
-        grader(length_mismatch["input"], length_mismatch["expected"], length_mismatch["actual"])
+        grade(length_mismatch["input"], length_mismatch["expected"], length_mismatch["actual"])
 
     assert "Did not receive all test cases" in str(exc_info.value)
 
@@ -57,22 +71,85 @@ def test_length_mismatch(length_mismatch):
 @pytest.mark.parametrize("line_num, expected_msg", [
     (1, "Test 1: Input: test2, Expected: result2 but got: wrong2"),
 ])
-def test_content_mismatch(content_mismatch, line_num, expected_msg):
+def test_content_mismatch(grade, content_mismatch, line_num, expected_msg):
     """Test when some lines don't match"""
     with pytest.raises(TestsFailedError) as exc_info:
-        grader(content_mismatch["input"], content_mismatch["expected"], content_mismatch["actual"])
+        grade(content_mismatch["input"], content_mismatch["expected"], content_mismatch["actual"])
 
     assert expected_msg in str(exc_info.value)
 
 
-def test_whitespace_handling(whitespace_variation):
+def test_whitespace_handling(grade, whitespace_variation):
     """Test that whitespace is properly handled with strip()"""
-    grader(whitespace_variation["input"], whitespace_variation["expected"], whitespace_variation["actual"])
+    grade(whitespace_variation["input"], whitespace_variation["expected"], whitespace_variation["actual"])
     # No exception should be raised
 
 
-def test_empty_inputs():
+def test_empty_inputs(grade):
     """Test with empty inputs"""
-    grader("", "", "")  # Should pass
+    grade("", "", "")  # Should pass
     with pytest.raises(TestsFailedError):
-        grader("test", "", "actual")  # Length mismatch
+        grade("test", "", "actual")  # Length mismatch
+
+
+def test_trailing_newline(grade):
+    """Test that a final newline doesn't count as an extra test case"""
+    grade("test1\ntest2\n", "result1\nresult2\n", "result1\nresult2")
+
+
+def test_stops_after_max_failures(grade):
+    """Test that grading stops and only the first failures are reported"""
+    count = 1000
+    inputs = "".join(f"test{i}\n" for i in range(count))
+    expected = "".join(f"result{i}\n" for i in range(count))
+    actual = "".join(f"wrong{i}\n" for i in range(count))
+
+    with pytest.raises(TestsFailedError) as exc_info:
+        grade(inputs, expected, actual, max_failures=3)
+
+    msg = exc_info.value.msg
+    assert "stopped after 3 failures" in msg
+    assert "Test 2: Input: test2, Expected: result2 but got: wrong2" in msg
+    assert "Test 3:" not in msg
+
+
+def test_incomplete_output(grade):
+    """Test that the output of a program stopped at a failed test is graded as far as it goes"""
+    with pytest.raises(TestsFailedError) as exc_info:
+        grade("test1\ntest2\ntest3", "result1\nresult2\nresult3", "result1\nwrong2", complete=False)
+
+    assert "Test 1: Input: test2, Expected: result2 but got: wrong2" in exc_info.value.msg
+
+    grade("test1\ntest2", "result1\nresult2", "result1", complete=False)
+
+
+def test_long_lines_are_shortened(grade):
+    """Test that huge lines don't end up in the failure message in full"""
+    with pytest.raises(TestsFailedError) as exc_info:
+        grade("x" * 10000, "1", "2" * 10000)
+
+    assert len(exc_info.value.msg) < 1000
+
+
+@pytest.mark.parametrize("mode, expected, actual, passes", [
+    ("exact", "1 2", "1  2", False),
+    ("whitespace", "1 2", "1  2", True),
+    ("whitespace", "1 2", "1 3", False),
+    ("float", "0.1 abc", "0.10000001  abc", True),
+    ("float", "0.1 abc", "0.1 abd", False),
+    ("float", "0.1", "0.2", False),
+    ("float", "0.1 0.2", "0.1", False),
+])
+def test_comparison_modes(grade, mode, expected, actual, passes):
+    """Test the comparison of lines in every mode"""
+    if passes:
+        grade("test", expected, actual, mode=mode, tolerance=1e-6)
+    else:
+        with pytest.raises(TestsFailedError):
+            grade("test", expected, actual, mode=mode, tolerance=1e-6)
+
+
+def test_unknown_comparison_mode():
+    """Test that an unknown mode is refused"""
+    with pytest.raises(ValueError):
+        comparator("fuzzy")
@@ -0,0 +1,51 @@
+import pytest
+
+from execution_engine.errors.errors import ParseError
+from execution_engine.parsers.phases import parse
+
+
+@pytest.fixture(name="phases_file")
+def phases_file_fixture(tmp_path):
+    def write(content: str) -> str:
+        path = tmp_path / "phases.txt"
+        path.write_text(content)
+        return str(path)
+
+    return write
+
+
+def test_parse_phases(phases_file):
+    """Test that wall time is per phase and cumulative CPU time is split over phases"""
+    timings = parse(
+        phases_file(
+            "compile 1000000000 1500000000 0m0.300000s 0m0.100000s\n"
+            "correctness 1500000000 1520000000 0m0.310000s 0m0.100000s\n"
+            "measurement 1520000000 3520000000 1m0.310000s 0m0.200000s\n"
+        )
+    )
+
+    assert list(timings) == ["compile", "correctness", "measurement"]
+    assert timings["compile"].wall_ms == pytest.approx(500)
+    assert timings["compile"].cpu_ms == pytest.approx(400)
+    assert timings["correctness"].wall_ms == pytest.approx(20)
+    assert timings["correctness"].cpu_ms == pytest.approx(10)
+    assert timings["measurement"].cpu_ms == pytest.approx(60100)
+
+
+def test_parse_bash_times(phases_file):
+    """Test that the shorter `times` format of bash is accepted"""
+    timings = parse(phases_file("compile 0 1000000 0m0.012s 0m0.004s\n"))
+
+    assert timings["compile"].cpu_ms == pytest.approx(16)
+
+
+def test_parse_malformed_line(phases_file):
+    """Test that a malformed line is rejected"""
+    with pytest.raises(ParseError):
+        parse(phases_file("compile 0 1000000 0m0.012s\n"))
+
+
+def test_parse_malformed_time(phases_file):
+    """Test that a malformed CPU time is rejected"""
+    with pytest.raises(ParseError):
+        parse(phases_file("compile 0 1000000 0.012 0m0.004s\n"))
@@ -0,0 +1,50 @@
+import pytest
+
+from execution_engine.errors.errors import ParseError
+from execution_engine.parsers.test_cases import parse
+
+
+@pytest.fixture(name="cases_file")
+def cases_file_fixture(tmp_path):
+    def write(content: str) -> str:
+        path = tmp_path / "cases.txt"
+        path.write_text(content)
+        return str(path)
+
+    return write
+
+
+def test_parse_test_cases(cases_file):
+    """Test that every case gets its outcome and CPU time"""
+    cases = parse(
+        cases_file(
+            "case status user_usec system_usec\n"
+            "0 pass 1500 500\n"
+            "1 unchecked 30 0\n"
+            "2 fail 10 0\n"
+        )
+    )
+
+    assert [case.index for case in cases] == [0, 1, 2]
+    assert [case.passed for case in cases] == [True, None, False]
+    assert cases[0].cpu_ms == pytest.approx(2)
+
+
+def test_parse_timeout(cases_file):
+    """Test that a timed out case failed and reports its limit"""
+    cases = parse(cases_file("case status user_usec system_usec\n3 timeout 5000000 0\n"))
+
+    assert cases[0].passed is False
+    assert cases[0].cpu_ms == pytest.approx(5000)
+
+
+def test_parse_no_cases(cases_file):
+    """Test that a report of a program that crashed on the first case is empty"""
+    assert parse(cases_file("case status user_usec system_usec\n")) == []
+
+
+@pytest.mark.parametrize("line", ["0 pass 10", "0 maybe 10 0", "0 pass ten 0"])
+def test_parse_malformed(cases_file, line):
+    """Test that malformed lines are refused"""
+    with pytest.raises(ParseError):
+        parse(cases_file(f"case status user_usec system_usec\n{line}\n"))
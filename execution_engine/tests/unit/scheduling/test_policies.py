@@ -0,0 +1,91 @@
+import asyncio
+from uuid import UUID, uuid4
+
+import pytest
+
+from execution_engine.scheduling.policies import PriorityLanes, RuntimeHistory, Waiter
+
+
+@pytest.fixture(name="loop")
+def loop_fixture():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(name="waiter")
+def waiter_fixture(loop):
+    def create(user: UUID | None = None, problem_id: int = 1, priority: int = 0) -> Waiter:
+        return Waiter(
+            user_uuid=user or uuid4(),
+            priority=priority,
+            kind=(problem_id, "c"),
+            future=loop.create_future(),
+        )
+
+    return create
+
+
+def _drain(lanes: PriorityLanes) -> list[Waiter]:
+    return [lanes.pop() for _ in range(len(lanes))]
+
+
+def test_fifo(waiter):
+    """Test that jobs are served in order of arrival"""
+    lanes = PriorityLanes("fifo", RuntimeHistory())
+    waiters = [waiter() for _ in range(3)]
+    for w in waiters:
+        lanes.push(w)
+
+    assert _drain(lanes) == waiters
+
+
+def test_fair_share(waiter):
+    """Test that a user with many jobs does not starve another user"""
+    lanes = PriorityLanes("fair", RuntimeHistory())
+    spammer, other = uuid4(), uuid4()
+    spam = [waiter(user=spammer) for _ in range(3)]
+    for w in spam:
+        lanes.push(w)
+    single = waiter(user=other)
+    lanes.push(single)
+
+    assert _drain(lanes) == [spam[0], single, spam[1], spam[2]]
+
+
+def test_shortest_job_first(waiter):
+    """Test that jobs of problems that ran faster before go first"""
+    history = RuntimeHistory()
+    lanes = PriorityLanes("sjf", history)
+    slow, fast, unknown = waiter(problem_id=1), waiter(problem_id=2), waiter(problem_id=3)
+    history.record(slow.kind, 10.0)
+    history.record(fast.kind, 1.0)
+    for w in (slow, fast, unknown):
+        lanes.push(w)
+
+    assert _drain(lanes) == [unknown, fast, slow]
+
+
+def test_priority_lane(waiter):
+    """Test that higher priority jobs always go first"""
+    lanes = PriorityLanes("fifo", RuntimeHistory())
+    bulk, normal, urgent = waiter(priority=-1), waiter(priority=0), waiter(priority=5)
+    for w in (bulk, normal, urgent):
+        lanes.push(w)
+
+    assert _drain(lanes) == [urgent, normal, bulk]
+
+
+def test_pop_empty():
+    """Test that popping without waiting jobs raises"""
+    with pytest.raises(IndexError):
+        PriorityLanes("fifo", RuntimeHistory()).pop()
+
+
+def test_history_moving_average():
+    """Test that the expected run time follows recent runs"""
+    history = RuntimeHistory()
+    history.record((1, "c"), 10.0)
+    history.record((1, "c"), 20.0)
+
+    assert history.expected((1, "c")) == pytest.approx(12.0)
@@ -0,0 +1,92 @@
+import pytest
+
+from execution_engine.scheduling.topology import (
+    allowed_cpus,
+    parse_cpu_list,
+    physical_cores,
+    plan_layout,
+)
+
+
+@pytest.fixture(name="sysfs")
+def sysfs_fixture(tmp_path):
+    """
+    Fake sysfs of 1 package with 4 cores and 2 threads per core, where CPU n and n + 4 are
+    siblings
+    """
+    for cpu in range(8):
+        topology = tmp_path / f"cpu{cpu}" / "topology"
+        topology.mkdir(parents=True)
+        (topology / "physical_package_id").write_text("0\n")
+        (topology / "core_id").write_text(f"{cpu % 4}\n")
+    return str(tmp_path)
+
+
+def test_parse_cpu_list():
+    """Test the kernel's CPU list format"""
+    assert parse_cpu_list("0-3,8,10-11\n") == [0, 1, 2, 3, 8, 10, 11]
+    assert parse_cpu_list("") == []
+
+
+def test_allowed_cpus_from_cgroup(tmp_path):
+    """Test that the cgroup cpuset limits the CPUs"""
+    cpuset = tmp_path / "cpuset.cpus.effective"
+    cpuset.write_text("2-5\n")
+
+    assert allowed_cpus(str(cpuset)) == [2, 3, 4, 5]
+
+
+def test_physical_cores(sysfs):
+    """Test that SMT siblings are grouped by core"""
+    assert physical_cores(list(range(8)), sysfs) == {
+        "0:0": [0, 4],
+        "0:1": [1, 5],
+        "0:2": [2, 6],
+        "0:3": [3, 7],
+    }
+
+
+def test_physical_cores_without_topology(tmp_path):
+    """Test that a CPU without topology information is a core of its own"""
+    assert physical_cores([0, 1], str(tmp_path)) == {"cpu0": [0], "cpu1": [1]}
+
+
+def test_layout_idle_siblings(sysfs):
+    """Test that one CPU per core runs jobs and the core of a reserved CPU is left alone"""
+    layout = plan_layout(physical_cores(list(range(8)), sysfs), reserved=[4], idle_siblings=True)
+
+    assert layout.worker_cpus == [1, 2, 3]
+    assert layout.idle_siblings == [5, 6, 7]
+    assert layout.reserved_cpus == [0, 4]
+
+
+def test_layout_all_siblings(sysfs):
+    """Test that siblings also run jobs if they don't have to be idle"""
+    layout = plan_layout(physical_cores(list(range(8)), sysfs), reserved=[], idle_siblings=False)
+
+    assert layout.worker_cpus == [0, 4, 1, 5, 2, 6, 3, 7]
+
+
+def test_layout_cpuset_subset(sysfs):
+    """Test that only CPUs in the cpuset are used"""
+    layout = plan_layout(physical_cores([2, 3, 6], sysfs), reserved=[], idle_siblings=True)
+
+    assert layout.worker_cpus == [2, 3]
+    assert layout.idle_siblings == [6]
+
+
+def test_layout_nothing_left(sysfs):
+    """Test that the reservation is dropped if it would leave no core to run jobs on"""
+    layout = plan_layout(physical_cores([0, 4], sysfs), reserved=[0], idle_siblings=True)
+
+    assert layout.worker_cpus == [0]
+    assert layout.idle_siblings == [4]
+    assert layout.reserved_cpus == []
+
+
+def test_layout_single_core(tmp_path):
+    """Test that a single core machine runs jobs with the default reservation of CPU 0"""
+    layout = plan_layout(physical_cores([0], str(tmp_path)), reserved=[0], idle_siblings=True)
+
+    assert layout.worker_cpus == [0]
+    assert layout.reserved_cpus == []
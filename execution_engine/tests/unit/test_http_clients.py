@@ -0,0 +1,35 @@
+import asyncio
+
+import httpx
+
+from common.http import PooledClient
+
+
+def _pooled_client() -> PooledClient:
+    return PooledClient(
+        "db_handler",
+        max_connections=4,
+        max_keepalive_connections=2,
+        keepalive_expiry_sec=30.0,
+        timeout_sec=1.0,
+        transport=httpx.MockTransport(lambda request: httpx.Response(200)),
+    )
+
+
+def test_client_reused():
+    """Test that every request goes through the same client until it is closed"""
+    pooled = _pooled_client()
+
+    async def requests():
+        pooled.open()
+        client = pooled.client
+        await client.get("http://db/api/health")
+        await pooled.client.get("http://db/api/health", timeout=5.0)
+        assert pooled.client is client
+        await pooled.close()
+
+    asyncio.run(requests())
+    stats = pooled.stats()
+    assert stats["requests"] == 2
+    assert not stats["open"]
+    assert stats["max_connections"] == 4
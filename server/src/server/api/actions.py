@@ -1,12 +1,16 @@
 from datetime import datetime
+from typing import NoReturn
 from uuid import uuid4
 
 import httpx
+from fastapi import HTTPException, status
 
 from common.auth import jwt_to_data
 from common.schemas import ProblemRequest, SubmissionIdentifier, SubmissionRequest
+from common.typing import ErrorReason, HTTPErrorTypeDescription, PermissionLevel
 from server.api.proxy import db_request
 from server.config import settings
+from server.http_clients import engine_client
 
 
 async def get_problem_by_id(problem_request: ProblemRequest, auth_header: dict[str, str]):
@@ -21,13 +25,20 @@ async def get_problem_by_id(problem_request: ProblemRequest, auth_header: dict[s
 
 
 async def post_submission(submission: SubmissionRequest, auth_header: dict[str, str], token: str):
+    submission_uuid = str(uuid4())
+    token_data = jwt_to_data(token, settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM)
     sub_create = {
-        "submission_uuid": str(uuid4()),
+        "submission_uuid": submission_uuid,
         "problem_id": submission.problem_id,
-        "user_uuid": jwt_to_data(token, settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM).uuid,
+        "user_uuid": token_data.uuid,
         "language": submission.language,
         "timestamp": float(datetime.now().timestamp()),
         "code": submission.code,
+        "priority": (
+            settings.ADMIN_SUBMISSION_PRIORITY
+            if token_data.permission_level == PermissionLevel.ADMIN
+            else 0
+        ),
     }
 
     # Send initial submission to DB
@@ -39,18 +50,60 @@ async def post_submission(submission: SubmissionRequest, auth_header: dict[str,
     )
 
     # Send submission to engine
-    async with httpx.AsyncClient() as client:
-        res = await client.post(
+    try:
+        res = await engine_client.client.post(
             f"{settings.ENGINE_URL}/api/execute",
             json=sub_create,
             timeout=settings.NETWORK_TIMEOUT,
         )
+    except httpx.RequestError:
+        # Marked as failed, so it doesn't stay pending forever
+        await _fail_submission(submission_uuid, auth_header, "Execution engine is unreachable")
+        _engine_unavailable(HTTPErrorTypeDescription.ERROR_ENGINE_UNREACHABLE, retry_after=None)
+
+    if res.status_code in (
+        status.HTTP_429_TOO_MANY_REQUESTS,
+        status.HTTP_503_SERVICE_UNAVAILABLE,
+    ):
+        # Only a temporary state of the engine, so no result is stored and the client tries again
+        _engine_unavailable(
+            HTTPErrorTypeDescription.ERROR_ENGINE_BUSY, res.headers.get("Retry-After")
+        )
 
     res.raise_for_status()
 
     return submission_res.json()
 
 
+async def _fail_submission(submission_uuid: str, auth_header: dict[str, str], error_msg: str):
+    await db_request(
+        "post",
+        "/write-submission-result",
+        headers=auth_header,
+        json_payload={
+            "submission_uuid": submission_uuid,
+            "runtime_ms": 0.0,
+            "emissions_kg": 0.0,
+            "energy_usage_kwh": 0.0,
+            "successful": False,
+            "error_reason": ErrorReason.INTERNAL_ERROR,
+            "error_msg": error_msg,
+        },
+    )
+
+
+def _engine_unavailable(error: HTTPErrorTypeDescription, retry_after: str | None) -> NoReturn:
+    """
+    Tells the client the engine could not accept the submission, and when to try again
+    """
+    status_code, error_type, description = error
+    raise HTTPException(
+        status_code=int(status_code),
+        detail={"type": error_type, "description": description},
+        headers={"Retry-After": retry_after} if retry_after else None,
+    )
+
+
 async def get_submission_result(submission: SubmissionIdentifier, auth_header: dict[str, str]):
     sub_result = {"submission_uuid": str(submission.submission_uuid)}
 
@@ -35,6 +35,7 @@ from common.schemas import (
     UserProfileResponse,
 )
 from server.api import actions, proxy
+from server.http_clients import clients
 
 router = APIRouter()
 
@@ -351,3 +352,11 @@ async def remove_problem(
 @router.get("/health", status_code=200)
 async def health_check():
     return {"status": "ok", "message": "DB service is running"}
+
+
+@router.get("/metrics", status_code=200)
+async def metrics():
+    """
+    Connections of the shared HTTP clients, to size their pools
+    """
+    return {"http_clients": {client.name: client.stats() for client in clients}}
@@ -30,6 +30,17 @@ class Settings(BaseSettings):
 
     NETWORK_TIMEOUT: int = 5
 
+    # Priority of submissions by admins in the engine's job queue, higher runs first. Lets admins
+    # check a newly added problem without waiting behind the submissions of all users
+    ADMIN_SUBMISSION_PRIORITY: int = 1
+
+    # Shared HTTP clients for the DB handler and the engine, kept open for the lifetime of the
+    # server. Limits are per client. HTTP/2 needs both other services to serve it
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY_SEC: float = 30.0
+    HTTP2_ENABLED: bool = False
+
     # JWT
     # These values are overwritten at deployment; this is not a security vulnerability
     JWT_SECRET_KEY: str = "0123456789abcdef"
@@ -0,0 +1,22 @@
+"""
+Shared HTTP clients of the server, opened and closed in the app's lifespan
+"""
+
+from common.http import PooledClient
+from server.config import settings
+
+
+def _pooled_client(name: str) -> PooledClient:
+    return PooledClient(
+        name,
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry_sec=settings.HTTP_KEEPALIVE_EXPIRY_SEC,
+        timeout_sec=settings.NETWORK_TIMEOUT,
+        http2=settings.HTTP2_ENABLED,
+    )
+
+
+db_client = _pooled_client("db_handler")
+engine_client = _pooled_client("execution_engine")
+clients = (db_client, engine_client)
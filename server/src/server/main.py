@@ -6,6 +6,7 @@ from loguru import logger
 
 from server.api import endpoints, endpoints_dev
 from server.config import settings
+from server.http_clients import clients
 
 
 @asynccontextmanager
@@ -16,9 +17,14 @@ async def lifespan(_app: FastAPI):
     """
 
     logger.info(f"Server started on {settings.SERVER_HOST}:{settings.SERVER_PORT}")
+    for client in clients:
+        client.open()
 
     yield
 
+    for client in clients:
+        await client.close()
+
     logger.info("Server stopped")
 
 
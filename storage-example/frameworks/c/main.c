@@ -1,18 +1,373 @@
 // main.c
 
-/** 
+/**
  * Entry point for code submission framework.
  * We can do setup or other preparations here, or start a timer.
  * Calls submission_wrapper.
+ *
+ * Usage:
+ *   ./main < input.txt
+ *     Runs the wrapper over all input once, output goes to stdout.
+ *   ./main --cases <report file> <limit ms> <expected file> <limits file> < input.txt
+ *     Like the above, but runs and times every test case (wrapper call) on
+ *     its own, and writes "<case> <status> <user usec> <system usec>" to the
+ *     report for each. Every case gets <limit ms> of CPU time, or the limit
+ *     on its line of <limits file>; 0 means no limit. If <expected file> is
+ *     given, the output of every case is compared with it as it runs, and the
+ *     run stops at the first wrong answer. Pass "-" to leave a file out.
+ *     Exits with EXIT_WRONG_ANSWER or EXIT_CASE_TIMEOUT if it stopped early.
+ *   ./main --benchmark <iterations> <report file> < input.txt
+ *     Loads all input in memory and runs the wrapper over it <iterations>
+ *     times inside this process.
+ *   ./main --adaptive <report file> <relative error> <budget ms>
+ *          <min samples> <max samples> <min batch ms> < input.txt
+ *     Like --benchmark, but keeps taking samples until the 95% confidence
+ *     interval of the CPU time per run is within <relative error> of the
+ *     mean, or until the budget or <max samples> is reached. Runs are batched
+ *     so a single sample takes at least <min batch ms> of CPU time.
+ *
+ * In both measuring modes output is discarded, and every sample is written
+ * to the report as "<runs> <user usec> <system usec>".
  */
 
+// fmemopen, open_memstream, getline, clock_gettime
+#define _POSIX_C_SOURCE 200809L
+
+#include <ctype.h>
+#include <math.h>
+#include <signal.h>
 #include <stdbool.h>
 #include <stdio.h>
 #include <stdlib.h>
+#include <string.h>
+#include <sys/resource.h>
+#include <sys/time.h>
+#include <time.h>
+#include <unistd.h>
 
 #include "wrapper.h"
 
-int main() {
+// z-value of a two-sided 95% confidence interval
+#define Z_95 1.96
+
+#define EXIT_WRONG_ANSWER 3
+#define EXIT_CASE_TIMEOUT 4
+
+// Report line of the running test case, written by the SIGPROF handler if
+// it runs out of CPU time. Prepared in advance, since only write() may be
+// used in a signal handler
+static char _timeout_line[64];
+static size_t _timeout_line_length;
+static int _report_fd = -1;
+
+/**
+ * Reads the entire stream into a newly allocated buffer
+ */
+char *_read_all(FILE *stream, size_t *size) {
+    size_t capacity = 4096;
+    char *buffer = malloc(capacity);
+    *size = 0;
+
+    size_t n;
+    while (buffer && (n = fread(buffer + *size, 1, capacity - *size, stream)) > 0) {
+        *size += n;
+        if (*size == capacity) {
+            capacity *= 2;
+            buffer = realloc(buffer, capacity);
+        }
+    }
+
+    return buffer;
+}
+
+long _usec(struct timeval tv) {
+    return tv.tv_sec * 1000000L + tv.tv_usec;
+}
+
+long _elapsed_ms(struct timespec start) {
+    struct timespec now;
+    clock_gettime(CLOCK_MONOTONIC, &now);
+    return (now.tv_sec - start.tv_sec) * 1000L + (now.tv_nsec - start.tv_nsec) / 1000000L;
+}
+
+/**
+ * Runs the wrapper over the in-memory input `runs` times and stores the
+ * user and system CPU time it took. Returns false on failure.
+ */
+bool _timed_runs(char *input, size_t size, long runs, long *user_usec, long *system_usec) {
+    struct rusage before, after;
+    getrusage(RUSAGE_SELF, &before);
+
+    for (long i = 0; i < runs; i++) {
+        // glibc allows reassigning stdin, so the deserialiser keeps reading
+        // from stdin while we feed it the in-memory input
+        FILE *in = size > 0 ? fmemopen(input, size, "r") : fopen("/dev/null", "r");
+        if (!in) {
+            fprintf(stderr, "could not open input buffer\n");
+            return false;
+        }
+        stdin = in;
+
+        while (wrapper());
+
+        fclose(in);
+    }
+
+    getrusage(RUSAGE_SELF, &after);
+    *user_usec = _usec(after.ru_utime) - _usec(before.ru_utime);
+    *system_usec = _usec(after.ru_stime) - _usec(before.ru_stime);
+    return true;
+}
+
+/**
+ * Loads stdin in memory, discards stdout and opens the report
+ */
+FILE *_prepare_measurement(const char *report_path, char **input, size_t *size) {
+    *input = _read_all(stdin, size);
+    if (!*input) {
+        fprintf(stderr, "could not read input\n");
+        return NULL;
+    }
+
+    FILE *report = fopen(report_path, "w");
+    if (!report) {
+        fprintf(stderr, "could not open report %s\n", report_path);
+        return NULL;
+    }
+
+    // Output is checked in a separate run, only measure the work here
+    if (!freopen("/dev/null", "w", stdout)) {
+        fprintf(stderr, "could not discard stdout\n");
+        return NULL;
+    }
+
+    fprintf(report, "runs user_usec system_usec\n");
+    return report;
+}
+
+void _on_case_timeout(int signal) {
+    (void) signal;
+    // Nothing left to do if this fails, the engine then still sees the exit code
+    ssize_t written = write(_report_fd, _timeout_line, _timeout_line_length);
+    (void) written;
+    _exit(EXIT_CASE_TIMEOUT);
+}
+
+/**
+ * Arms the CPU timer of the process, 0 disarms it
+ */
+void _set_cpu_limit(long limit_ms) {
+    struct itimerval timer = {0};
+    timer.it_value.tv_sec = limit_ms / 1000;
+    timer.it_value.tv_usec = (limit_ms % 1000) * 1000;
+    setitimer(ITIMER_PROF, &timer, NULL);
+}
+
+/**
+ * Trims leading and trailing whitespace in place
+ */
+char *_trim(char *line, size_t length) {
+    while (length > 0 && isspace((unsigned char) line[length - 1])) length--;
+    line[length] = '\0';
+    while (isspace((unsigned char) *line)) line++;
+    return line;
+}
+
+/**
+ * Compares the output of one test case with the next lines of the expected
+ * output, apart from leading and trailing whitespace like the engine's
+ * "exact" comparison. Modifies the output. No output is compared as an empty
+ * line, so a case that printed nothing doesn't pass by default.
+ */
+bool _matches_expected(char *output, size_t size, FILE *expected) {
+    char *line = NULL;
+    size_t capacity = 0;
+    bool matches;
+
+    char *start = output;
+    char *end = output + size;
+    do {
+        char *newline = memchr(start, '\n', end - start);
+        char *next = newline ? newline + 1 : end;
+
+        ssize_t length = getline(&line, &capacity, expected);
+        // open_memstream keeps a null byte after the output, so the last
+        // line can be trimmed in place as well
+        matches = length >= 0
+            && strcmp(_trim(start, next - start), _trim(line, length)) == 0;
+        start = next;
+    } while (matches && start < end);
+
+    free(line);
+    return matches;
+}
+
+/**
+ * Runs a single test case with its output captured, and stores the user and
+ * system CPU time it took. Returns false when the input is exhausted.
+ */
+bool _run_case(char **output, size_t *size, long *user_usec, long *system_usec) {
+    FILE *out = stdout;
+    FILE *capture = open_memstream(output, size);
+    if (!capture) {
+        fprintf(stderr, "could not capture output\n");
+        exit(1);
+    }
+    // Like stdin above, glibc allows reassigning stdout
+    stdout = capture;
+
+    struct rusage before, after;
+    getrusage(RUSAGE_SELF, &before);
+    bool more = wrapper();
+    getrusage(RUSAGE_SELF, &after);
+
+    stdout = out;
+    fclose(capture);
+
+    *user_usec = _usec(after.ru_utime) - _usec(before.ru_utime);
+    *system_usec = _usec(after.ru_stime) - _usec(before.ru_stime);
+    return more;
+}
+
+int _cases(const char *report_path, long default_limit_ms, const char *expected_path,
+           const char *limits_path) {
+    FILE *report = fopen(report_path, "w");
+    FILE *expected = strcmp(expected_path, "-") == 0 ? NULL : fopen(expected_path, "r");
+    FILE *limits = strcmp(limits_path, "-") == 0 ? NULL : fopen(limits_path, "r");
+    if (!report || (!expected && strcmp(expected_path, "-") != 0)
+            || (!limits && strcmp(limits_path, "-") != 0)) {
+        fprintf(stderr, "could not open test case files\n");
+        return 1;
+    }
+
+    _report_fd = fileno(report);
+    struct sigaction action = {0};
+    action.sa_handler = _on_case_timeout;
+    sigaction(SIGPROF, &action, NULL);
+
+    fprintf(report, "case status user_usec system_usec\n");
+
+    for (long i = 0;; i++) {
+        long limit_ms = default_limit_ms, case_limit_ms;
+        if (limits && fscanf(limits, "%ld", &case_limit_ms) == 1 && case_limit_ms > 0) {
+            limit_ms = case_limit_ms;
+        }
+        _timeout_line_length = snprintf(_timeout_line, sizeof(_timeout_line),
+                                        "%ld timeout %ld 0\n", i, limit_ms * 1000);
+        // Everything before must be in the report when the handler writes to it
+        fflush(report);
+
+        char *output;
+        size_t size;
+        long user_usec, system_usec;
+        _set_cpu_limit(limit_ms);
+        bool more = _run_case(&output, &size, &user_usec, &system_usec);
+        _set_cpu_limit(0);
+
+        if (!more) {
+            free(output);
+            break;
+        }
+
+        fwrite(output, 1, size, stdout);
+        fflush(stdout);
+
+        const char *status = "unchecked";
+        if (expected) status = _matches_expected(output, size, expected) ? "pass" : "fail";
+        fprintf(report, "%ld %s %ld %ld\n", i, status, user_usec, system_usec);
+        free(output);
+
+        if (strcmp(status, "fail") == 0) {
+            fclose(report);
+            return EXIT_WRONG_ANSWER;
+        }
+    }
+
+    fclose(report);
+    if (expected) fclose(expected);
+    if (limits) fclose(limits);
+    return 0;
+}
+
+int _benchmark(long iterations, const char *report_path) {
+    char *input;
+    size_t size;
+    FILE *report = _prepare_measurement(report_path, &input, &size);
+    if (!report) return 1;
+
+    for (long i = 0; i < iterations; i++) {
+        long user_usec, system_usec;
+        if (!_timed_runs(input, size, 1, &user_usec, &system_usec)) return 1;
+        fprintf(report, "1 %ld %ld\n", user_usec, system_usec);
+    }
+
+    fclose(report);
+    free(input);
+    return 0;
+}
+
+int _adaptive(const char *report_path, double relative_error, long budget_ms,
+              long min_samples, long max_samples, long min_batch_ms) {
+    struct timespec start;
+    clock_gettime(CLOCK_MONOTONIC, &start);
+
+    char *input;
+    size_t size;
+    FILE *report = _prepare_measurement(report_path, &input, &size);
+    if (!report) return 1;
+
+    long user_usec, system_usec;
+
+    // Grow the batch until a single sample takes long enough to be measured
+    long batch = 1;
+    while (true) {
+        if (!_timed_runs(input, size, batch, &user_usec, &system_usec)) return 1;
+        if (user_usec + system_usec >= min_batch_ms * 1000 || _elapsed_ms(start) >= budget_ms)
+            break;
+        batch *= 2;
+    }
+
+    // Welford's online mean and variance of the user CPU time per run
+    long n = 0;
+    double mean = 0.0, m2 = 0.0;
+
+    while (n < max_samples) {
+        if (!_timed_runs(input, size, batch, &user_usec, &system_usec)) return 1;
+        fprintf(report, "%ld %ld %ld\n", batch, user_usec, system_usec);
+
+        double x = (double) user_usec / batch;
+        n++;
+        double delta = x - mean;
+        mean += delta / n;
+        m2 += delta * (x - mean);
+
+        if (_elapsed_ms(start) >= budget_ms) break;
+
+        if (n >= min_samples) {
+            double half_width = Z_95 * sqrt(m2 / (n - 1)) / sqrt(n);
+            if (half_width <= relative_error * mean) break;
+        }
+    }
+
+    fclose(report);
+    free(input);
+    return 0;
+}
+
+int main(int argc, char **argv) {
+    if (argc == 6 && strcmp(argv[1], "--cases") == 0) {
+        return _cases(argv[2], atol(argv[3]), argv[4], argv[5]);
+    }
+
+    if (argc == 4 && strcmp(argv[1], "--benchmark") == 0) {
+        return _benchmark(atol(argv[2]), argv[3]);
+    }
+
+    if (argc == 8 && strcmp(argv[1], "--adaptive") == 0) {
+        return _adaptive(argv[2], atof(argv[3]), atol(argv[4]),
+                         atol(argv[5]), atol(argv[6]), atol(argv[7]));
+    }
+
     while (wrapper());
     return 0;
 }
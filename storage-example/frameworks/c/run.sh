@@ -2,41 +2,136 @@
 
 # Touch all files to prevent errors in Engine
 echo "Creating empty files"
-touch failed.txt compile_stdout.txt compile_stderr.txt run_stdout.txt run_stderr.txt
+touch failed.txt compile_stdout.txt compile_stderr.txt run_stdout.txt run_stderr.txt phases.txt cases.txt
 
-# Compile
-echo "Compiling"
-if ! make > compile_stdout.txt 2> compile_stderr.txt
+# Every phase appends "<phase> <start ns> <end ns> <children user time> <children system time>"
+# to phases.txt. The CPU times come from `times` and are cumulative over all phases
+phase_start() {
+  PHASE_START=$(date +%s%N)
+}
+
+phase_end() {
+  times > .phase_times
+  echo "$1 $PHASE_START $(date +%s%N) $(tail -n 1 .phase_times)" >> phases.txt
+}
+
+# Compile, unless the engine dropped in a cached build
+phase_start
+if [ -f compile_cached ]
 then
-  echo "compile" > failed.txt
-  exit 1
+  echo "Using cached build"
+else
+  echo "Compiling"
+  if ! make > compile_stdout.txt 2> compile_stderr.txt
+  then
+    phase_end compile
+    echo "compile" > failed.txt
+    exit 1
+  fi
+fi
+phase_end compile
+
+# Run the program with input, one test case at a time
+# TEST_CASE_FAIL_FAST and TEST_CASE_TIME_LIMIT_MS are passed in by the engine
+TEST_CASE_TIME_LIMIT_MS="${TEST_CASE_TIME_LIMIT_MS:-0}"
+EXPECTED=-
+if [ "${TEST_CASE_FAIL_FAST:-0}" = 1 ]
+then
+  # Stop at the first wrong answer, before measuring
+  EXPECTED=output.txt
+fi
+LIMITS=-
+if [ -f limits.txt ]
+then
+  # Time limits of single test cases, given by the problem
+  LIMITS=limits.txt
 fi
 
-# Run the program with input
 echo "Running"
-if ! ./main < input.txt > run_stdout.txt 2> run_stderr.txt
+phase_start
+./main --cases cases.txt "$TEST_CASE_TIME_LIMIT_MS" "$EXPECTED" "$LIMITS" \
+    < input.txt > run_stdout.txt 2> run_stderr.txt
+status=$?
+if [ $status -ne 0 ]
 then
-  echo "runtime" > failed.txt
+  phase_end correctness
+  case $status in
+    3) echo "tests" > failed.txt ;;
+    4) echo "timeout" > failed.txt ;;
+    *) echo "runtime" > failed.txt ;;
+  esac
   exit 1
 fi
+phase_end correctness
 
 
 # Running measurements
-echo "Measuring"
-python3 - <<'PYCODE'
-import subprocess, shlex, time
-from codecarbon import OfflineEmissionsTracker
-
-tracker = OfflineEmissionsTracker(country_iso_code="NLD",
-                                  tracking_mode="machine",
-                                  output_file="emissions.csv")
-
-# Measurement
-tracker.start()
-for i in range(1000):
-    subprocess.run("./main < input.txt", shell=True)
-tracker.stop()
-PYCODE
+# MEASUREMENT_MODE, BENCHMARK_ITERATIONS and ADAPTIVE_* are passed in by the engine
+MEASUREMENT_MODE="${MEASUREMENT_MODE:-adaptive}"
+BENCHMARK_ITERATIONS="${BENCHMARK_ITERATIONS:-1000}"
+ADAPTIVE_TARGET_RELATIVE_ERROR="${ADAPTIVE_TARGET_RELATIVE_ERROR:-0.02}"
+ADAPTIVE_TIME_BUDGET_MS="${ADAPTIVE_TIME_BUDGET_MS:-10000}"
+ADAPTIVE_MIN_SAMPLES="${ADAPTIVE_MIN_SAMPLES:-10}"
+ADAPTIVE_MAX_SAMPLES="${ADAPTIVE_MAX_SAMPLES:-1000}"
+ADAPTIVE_MIN_BATCH_MS="${ADAPTIVE_MIN_BATCH_MS:-10}"
+
+echo "Measuring ($MEASUREMENT_MODE)"
+phase_start
+case "$MEASUREMENT_MODE" in
+  adaptive)
+    # Samples until the runtime per run is known precisely enough, or the budget runs out
+    if ! ./main --adaptive benchmark.txt "$ADAPTIVE_TARGET_RELATIVE_ERROR" \
+        "$ADAPTIVE_TIME_BUDGET_MS" "$ADAPTIVE_MIN_SAMPLES" "$ADAPTIVE_MAX_SAMPLES" \
+        "$ADAPTIVE_MIN_BATCH_MS" < input.txt 2> run_stderr.txt
+    then
+      phase_end measurement
+      echo "runtime" > failed.txt
+      exit 1
+    fi
+    ;;
+  benchmark)
+    # Runs the whole input BENCHMARK_ITERATIONS times inside a single process
+    if ! ./main --benchmark "$BENCHMARK_ITERATIONS" benchmark.txt < input.txt 2> run_stderr.txt
+    then
+      phase_end measurement
+      echo "runtime" > failed.txt
+      exit 1
+    fi
+    ;;
+  cgroup)
+    # Runs the whole input BENCHMARK_ITERATIONS times inside a single process, and takes the CPU
+    # time of the whole container from its cgroup. With cgroup v2, a container sees its own
+    # cgroup at /sys/fs/cgroup
+    echo "measured runs $BENCHMARK_ITERATIONS" > cgroup.txt
+    sed "s/^/before /" /sys/fs/cgroup/cpu.stat >> cgroup.txt
+    if ! ./main --benchmark "$BENCHMARK_ITERATIONS" /dev/null < input.txt 2> run_stderr.txt
+    then
+      phase_end measurement
+      echo "runtime" > failed.txt
+      exit 1
+    fi
+    sed "s/^/after /" /sys/fs/cgroup/cpu.stat >> cgroup.txt
+    # No peak memory: the cgroup's memory.peak also covers the build, the work directory on tmpfs
+    # and the earlier jobs of a pooled container. The time mode reports it for the program alone
+    ;;
+  time)
+    # Runs the whole input BENCHMARK_ITERATIONS times inside a single process under GNU time,
+    # which also reports the peak memory, context switches and page faults of the process
+    echo "Runs: $BENCHMARK_ITERATIONS" > time.txt
+    if ! /usr/bin/time -v -a -o time.txt ./main --benchmark "$BENCHMARK_ITERATIONS" /dev/null \
+        < input.txt 2> run_stderr.txt
+    then
+      phase_end measurement
+      echo "runtime" > failed.txt
+      exit 1
+    fi
+    ;;
+  *)
+    echo "Unknown measurement mode $MEASUREMENT_MODE"
+    exit 1
+    ;;
+esac
+phase_end measurement
 
 
 